@@ -1,4 +1,10 @@
-import pickle, sys
+from Data_Converters import ContainerFormat
+import sys
+
+
+# Lookup tables used with bytes.translate to switch between the characters '0'/'1' and the bit values 0/1
+ASCII_TO_BIT_TABLE = bytes.maketrans(b'01', b'\x00\x01')
+BIT_TO_ASCII_TABLE = bytes.maketrans(b'\x00\x01', b'01')
 
 
 def convertBytesToBinaryByteArray(byte_data):
@@ -7,13 +13,13 @@ def convertBytesToBinaryByteArray(byte_data):
     :param byte_data: Value of type 'bytes' that will be converted.
     :return: Byte data converted to binary data stored in a bytearray.
     """
-    zeroes_ones = bytearray()
+    if len(byte_data) == 0:
+        return bytearray()
 
-    for byte in byte_data:
-        binary_representation = bin(byte)[2:].zfill(8)
-        zeroes_ones.extend(map(int, binary_representation))
+    # Formatting the data as one big integer converts every byte at once instead of one byte at a time
+    binary_string = format(int.from_bytes(byte_data, 'big'), '0' + str(len(byte_data) * 8) + 'b')
 
-    return zeroes_ones
+    return bytearray(binary_string.encode('ascii').translate(ASCII_TO_BIT_TABLE))
 
 
 def convertBinaryByteArrayToBytes(binary_data):
@@ -22,12 +28,16 @@ def convertBinaryByteArrayToBytes(binary_data):
     :param binary_data: The binary data that'll be converted to bytes.
     :return: The binary data in byte format.
     """
-    byte_string = "".join(map(str, binary_data))
+    num_full_bytes = len(binary_data) // 8
     byte_data = bytearray()
 
-    for i in range(0, len(byte_string), 8):
-        byte_value = int(byte_string[i:i+8], 2)
-        byte_data.append(byte_value)
+    if num_full_bytes > 0:
+        byte_string = bytes(binary_data[:num_full_bytes * 8]).translate(BIT_TO_ASCII_TABLE)
+        byte_data += int(byte_string, 2).to_bytes(num_full_bytes, 'big')
+
+    # Any leftover bits that don't make up a full byte are stored in one last byte
+    if len(binary_data) % 8 != 0:
+        byte_data.append(int(bytes(binary_data[num_full_bytes * 8:]).translate(BIT_TO_ASCII_TABLE), 2))
 
     return bytes(byte_data)
 
@@ -35,24 +45,79 @@ def convertBinaryByteArrayToBytes(binary_data):
 def convertByteDataListToFullBinary(byte_data_list):
     """
     Converts a dictionary representation of an entire directory's contents, including all files in all/any subfolders
-    and their names into a full string of zeroes and ones.
+    and their names into a full string of zeroes and ones. The contents are stored in the container format (see
+    ContainerFormat), which also holds the digest of every file so that the files can be verified once extracted.
     :param byte_data_list: The dictionary representation of an entire directory's contents.
     :return: The dictionary representation, represented as binary data stored in a bytearray.
     """
-    return convertBytesToBinaryByteArray(pickle.dumps(byte_data_list))
+    return convertBytesToBinaryByteArray(ContainerFormat.createContainer(byte_data_list))
+
+
+def convertFullBinaryToCheckedByteDataList(binary_data, allow_legacy_pickle=False):
+    """
+    Converts binary data stored in a bytearray into the dictionary representation of a directory's contents, and
+    checks every file against its stored digest.
+    :param binary_data: The binary data that will end up getting converted.
+    :param allow_legacy_pickle: Whether data hidden by older versions of this program (stored with pickle) may be
+    loaded. Loading pickle data can run arbitrary code, so this must only be allowed for photos that are trusted.
+    :return: A tuple containing the dictionary representation of an entire directory's contents and a list of the
+    paths of all files that don't match their stored digests. Legacy pickle data has no digests, in which case the
+    list is None.
+    """
+    byte_data = convertBinaryByteArrayToBytes(binary_data)
+
+    if ContainerFormat.isContainer(byte_data):
+        return ContainerFormat.parseContainer(byte_data)
+
+    return (convertLegacyBytesToByteDataList(byte_data, allow_legacy_pickle), None)
 
 
-def convertFullBinaryToByteDataList(binary_data):
+def convertFullBinaryToByteDataList(binary_data, allow_legacy_pickle=False):
     """
     Converts binary data stored in a bytearray into a dictionary representation of an entire directory's contents.
+    Every file is checked against its stored digest, and the program stops if any of them don't match.
     :param binary_data: The binary data that will end up getting converted.
+    :param allow_legacy_pickle: Whether data hidden by older versions of this program (stored with pickle) may be
+    loaded (see convertFullBinaryToCheckedByteDataList).
     :return: The dictionary representation of an entire directory's contents, which was created from 'binary_data'.
     """
-    byte_data_list = pickle.loads(convertBinaryByteArrayToBytes(binary_data))
+    byte_data_list, mismatched_files = convertFullBinaryToCheckedByteDataList(binary_data, allow_legacy_pickle)
+
+    # Legacy pickle data has no digests to check against
+    if mismatched_files is not None and len(mismatched_files) > 0:
+        print("Error - The following extracted file(s) do not match their stored digests:")
+        for path in mismatched_files:
+            print("-> " + path)
+        sys.exit(1)
+
+    return byte_data_list
+
+
+def convertLegacyBytesToByteDataList(byte_data, allow_legacy_pickle):
+    """
+    Loads data hidden by older versions of this program, which stored a directory's contents with pickle.
+    :param byte_data: The hidden data in byte format.
+    :param allow_legacy_pickle: Whether loading pickle data has been explicitly allowed by the user.
+    :return: The dictionary representation of an entire directory's contents.
+    """
+    # Unpickling data from untrusted photos can run arbitrary code, so it is never done unless asked for
+    if not allow_legacy_pickle:
+        print("Error - The hidden data is not in the current format. It may have been hidden by an older version")
+        print("of this program, which stored data with pickle. Loading pickle data can run arbitrary code, so only")
+        print("if you trust these photos, rerun the extraction with '--allow-legacy-pickle'.")
+        sys.exit(1)
+
+    # Only imported when needed, since pickle is never used for data in the current format
+    import pickle
+
+    try:
+        byte_data_list = pickle.loads(byte_data)
+    except Exception:
+        byte_data_list = None
 
     # Data being loaded must load up as a variable of type dictionary, containing all stored data
     if type(byte_data_list) != type(dict()):
         print("Error - Unable to extract data from the given image(s)")
         sys.exit(1)
 
-    return byte_data_list
\ No newline at end of file
+    return byte_data_list
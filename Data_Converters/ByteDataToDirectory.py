@@ -12,11 +12,13 @@ def writeByteDataToFile(destination_file, byte_data):
         destination.write(byte_data)
 
 
-def createDirectoryFromByteData(folder_path, byte_data_list):
+def createDirectoryFromByteData(folder_path, byte_data_list, reuse_existing=False):
     """
     Creates a directory inside 'folder_path', containing all the data in 'byte_data_list'.
     :param folder_path: The location where all the data will be recreated.
     :param byte_data_list: The dictionary representation of an entire directory's contents.
+    :param reuse_existing: Whether files and folders that already exist may be kept (when resuming an interrupted
+    extraction). A file is only kept if its contents are exactly the same as the data.
     """
     # Specified path must lead to a folder
     if not os.path.isdir(folder_path):
@@ -29,13 +31,30 @@ def createDirectoryFromByteData(folder_path, byte_data_list):
             sub_dir_path = os.path.join(folder_path, key.decode('utf-8'))
 
             # Otherwise, a FileExistsError exception would be thrown
-            if sub_dir_path != folder_path + "/":
+            if sub_dir_path != folder_path + "/" and not (reuse_existing and os.path.isdir(sub_dir_path)):
                 os.mkdir(sub_dir_path)
             
-            createDirectoryFromByteData(sub_dir_path, value)
+            createDirectoryFromByteData(sub_dir_path, value, reuse_existing)
             continue
         
         file_path = os.path.join(folder_path, key.decode('utf-8'))
+
+        if reuse_existing and isFileContentsEqual(file_path, value):
+            continue
         
         # Creates a file at the specified path if one does not exist and then writes the byte data to it
-        writeByteDataToFile(file_path, value)
\ No newline at end of file
+        writeByteDataToFile(file_path, value)
+
+
+def isFileContentsEqual(file_path, byte_data):
+    """
+    Checks whether a file already exists with exactly the given contents. Files of a different size are never read.
+    :param file_path: The path to the file.
+    :param byte_data: The expected contents of the file in byte format.
+    :return: True if the file exists and holds exactly 'byte_data'.
+    """
+    if not os.path.isfile(file_path) or os.path.getsize(file_path) != len(byte_data):
+        return False
+
+    with open(file_path, 'rb') as file:
+        return file.read() == byte_data
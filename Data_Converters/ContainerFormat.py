@@ -0,0 +1,312 @@
+from Data_Converters import FileDigests
+from array import array
+from itertools import accumulate
+import hashlib, struct, sys
+
+
+# The container is the byte format that a directory's contents get stored in before being hidden. Unlike pickle,
+# reading a container can never run code, and every length is checked against the size of the data before use.
+#
+# Layout (big-endian):
+#   header:  magic, version, number of records, size of the name table, number of files at the top level and the
+#            SHA-256 digest of everything that follows the header (records, names and bodies)
+#   records: one record per file/folder, stored column by column: all kinds (1 byte each), all indexes of parent
+#            folder records (4 bytes each), all sizes (8 bytes each) and all BLAKE2b digests (32 bytes each).
+#            For a file, the size is the length of its contents. For a folder, the size is the number of files
+#            directly inside of it, and those files' records directly follow the folder's record. The top level
+#            files come first, and every folder comes after its parent folder.
+#   names:   the utf-8 names of all records, each one followed by a zero byte (which names can't contain)
+#   bodies:  the contents of all files, concatenated in record order
+#
+# Because the records are stored as columns and the files of a folder form one run of records, a whole folder is
+# read with a handful of calls that each process the entire run, rather than with Python code for every single
+# file. Intact data is checked with a single call that hashes everything after the header at once, and the digests
+# of the individual files are only compared when that fails, to find the files that were damaged. Hashing every
+# small file on its own costs more than unpickling it, so this is what keeps parsing trees of many small files
+# faster than unpickling them along with a digest for every file. The container digest is SHA-256 rather than
+# BLAKE2b, since processors with SHA extensions (most current x86 and ARM processors) compute it about twice as
+# fast, which matters for large files. Version 1 containers have no container digest, and every file is always
+# checked against its own digest.
+CONTAINER_MAGIC = b'PXSC'
+CONTAINER_VERSION = 2
+CONTAINER_HEADER_STRUCT = struct.Struct('>4sBIQI')
+DIGEST_SIZE = FileDigests.DIGEST_SIZE
+CONTAINER_DIGEST_SIZE = 32
+HEADER_SIZE = CONTAINER_HEADER_STRUCT.size + CONTAINER_DIGEST_SIZE
+RECORD_SIZE = 1 + 4 + 8 + DIGEST_SIZE
+NAME_SEPARATOR = b'\x00'
+
+RECORD_KIND_FOLDER = 0
+RECORD_KIND_FILE = 1
+
+# Parent index used by records that sit at the very top of the stored directory
+NO_PARENT = 2 ** 32 - 1
+
+EMPTY_DIGEST = bytes(DIGEST_SIZE)
+
+
+def isContainer(byte_data):
+    """
+    Checks whether the given data starts like a container.
+    :param byte_data: The data in byte format.
+    :return: True if the data starts with the container's magic bytes.
+    """
+    return bytes(byte_data[:len(CONTAINER_MAGIC)]) == CONTAINER_MAGIC
+
+
+def getContainerSize(record_count, names_size, contents_size):
+    """
+    Gets the size of a container without creating it, which only depends on the number of files and folders, the
+    length of their names and the size of the files.
+    :param record_count: The number of files and folders stored (see DirectoryToByteData.getByteDataSizes).
+    :param names_size: The total length of their utf-8 names.
+    :param contents_size: The total size of the files' contents.
+    :return: The size of the container in bytes.
+    """
+    return HEADER_SIZE + record_count * (RECORD_SIZE + len(NAME_SEPARATOR)) + names_size + contents_size
+
+
+def createContainer(byte_data_list):
+    """
+    Stores the dictionary representation of a directory's contents in the container format.
+    :param byte_data_list: The dictionary representation of an entire directory's contents.
+    :return: The container in byte format.
+    """
+    records = []
+    names = []
+    bodies = []
+
+    addRecordsToContainer(byte_data_list, NO_PARENT, records, names, bodies)
+
+    kinds, parents, sizes, digests = zip(*records) if len(records) > 0 else ((), (), (), ())
+    top_file_count = sum(1 for value in byte_data_list.values() if type(value) != dict)
+    names_table = b''.join(name + NAME_SEPARATOR for name in names)
+
+    columns = [bytes(kinds), struct.pack('>' + str(len(parents)) + 'I', *parents),
+               struct.pack('>' + str(len(sizes)) + 'Q', *sizes), b''.join(digests)]
+    header = CONTAINER_HEADER_STRUCT.pack(CONTAINER_MAGIC, CONTAINER_VERSION, len(records), len(names_table), top_file_count)
+
+    container_hash = hashlib.sha256()
+    for part in columns + [names_table] + bodies:
+        container_hash.update(part)
+
+    return b''.join([header, container_hash.digest()] + columns + [names_table] + bodies)
+
+
+def addRecordsToContainer(byte_data_list, parent_index, records, names, bodies):
+    """
+    Adds the records of all files and folders in a folder to the lists that make up a container, files first and
+    then every subfolder (along with its contents). (Part of createContainer)
+    :param byte_data_list: The dictionary representation of the current folder's contents.
+    :param parent_index: The record index of the current folder (NO_PARENT at the top of the directory).
+    :param records: The list of records created so far, each one a tuple (kind, parent index, size, digest).
+    :param names: The list of names created so far (one per record).
+    :param bodies: The list of file contents created so far (one per file record).
+    """
+    for key, value in byte_data_list.items():
+        if type(value) != dict:
+            records.append((RECORD_KIND_FILE, parent_index, len(value), FileDigests.computeFileDigest(value)))
+            names.append(key)
+            bodies.append(value)
+
+    for key, value in byte_data_list.items():
+        # Current dictionary value is recognized as a folder
+        if type(value) == dict:
+            file_count = sum(1 for item in value.values() if type(item) != dict)
+            records.append((RECORD_KIND_FOLDER, parent_index, file_count, EMPTY_DIGEST))
+            names.append(key)
+            addRecordsToContainer(value, len(records) - 1, records, names, bodies)
+
+
+def parseContainer(byte_data):
+    """
+    Reads a container back into the dictionary representation of a directory's contents, checking every file against
+    its stored digest along the way. File contents are returned as bytes, since copying a small file out of the
+    container takes about half as long as creating a memoryview of it.
+    :param byte_data: The container in byte format.
+    :return: A tuple containing the dictionary representation of an entire directory's contents and a list of the
+    '/' separated paths (as strings) of all files whose contents don't match their stored digests.
+    """
+    byte_data = bytes(byte_data)
+    view = memoryview(byte_data)
+
+    if len(view) < CONTAINER_HEADER_STRUCT.size:
+        reportInvalidContainer("data is too short")
+
+    magic, version, record_count, names_size, top_file_count = CONTAINER_HEADER_STRUCT.unpack_from(view, 0)
+
+    if magic != CONTAINER_MAGIC:
+        reportInvalidContainer("data does not start with a container header")
+
+    if version != CONTAINER_VERSION and version != 1:
+        reportInvalidContainer("unsupported container version " + str(version))
+
+    header_size = HEADER_SIZE if version >= 2 else CONTAINER_HEADER_STRUCT.size
+
+    if len(view) < header_size:
+        reportInvalidContainer("data is too short")
+
+    # When everything after the header matches the container digest, so does every file
+    check_file_digests = True
+    if version >= 2:
+        container_digest = bytes(view[CONTAINER_HEADER_STRUCT.size:header_size])
+        check_file_digests = hashlib.sha256(view[header_size:]).digest() != container_digest
+
+    names_start = header_size + record_count * RECORD_SIZE
+    body_position = names_start + names_size
+
+    if body_position > len(view):
+        reportInvalidContainer("record table is larger than the data")
+
+    names_table = bytes(view[names_start:body_position])
+    names = names_table.split(NAME_SEPARATOR)
+
+    # Every name is followed by a separator, so splitting leaves exactly one empty item at the end
+    if len(names) != record_count + 1 or names.pop() != b'':
+        reportInvalidContainer("name table does not match the record table")
+
+    # Names can never be used to reach outside of the folder data gets extracted to
+    if b'/' in names_table or b'\\' in names_table or b'.' in names or b'..' in names or not isValidUTF8(names_table):
+        reportInvalidContainer("name table contains unsafe names")
+
+    kinds, parents, sizes, digests = readRecordColumns(view, header_size, record_count)
+
+    # Only a single top level folder may have an empty name (it stands for the contents of the hidden folder)
+    if b'' in names:
+        index = names.index(b'')
+        if names.count(b'') != 1 or kinds[index] != RECORD_KIND_FOLDER or parents[index] != NO_PARENT:
+            reportInvalidContainer("name table contains unsafe names")
+
+    byte_data_list = {}
+    mismatched_files = []
+    run = (kinds, parents, sizes, digests, names, byte_data, mismatched_files if check_file_digests else None)
+
+    # Folders (and their paths, ending in '/') by record index, so that later records can find their parent
+    folders = {NO_PARENT: (byte_data_list, b'')}
+
+    body_position = addFileRunToFolder(run, NO_PARENT, 0, top_file_count, byte_data_list, b'', body_position)
+    record_index = top_file_count
+
+    while record_index < record_count:
+        parent_index = parents[record_index]
+
+        # Every record that isn't part of a file run must be a folder whose parent folder appeared earlier
+        if kinds[record_index] != RECORD_KIND_FOLDER or parent_index not in folders:
+            reportInvalidContainer("record " + str(record_index) + " is out of place")
+
+        parent_folder, parent_path = folders[parent_index]
+        name = names[record_index]
+
+        if name in parent_folder:
+            reportInvalidContainer("record " + str(record_index) + " is a duplicate")
+
+        folder = {}
+        folder_path = parent_path + name + b'/' if name else parent_path
+        parent_folder[name] = folder
+        folders[record_index] = (folder, folder_path)
+
+        body_position = addFileRunToFolder(run, record_index, record_index + 1, sizes[record_index], folder, folder_path, body_position)
+        record_index += 1 + sizes[record_index]
+
+    if body_position != len(view):
+        reportInvalidContainer("data contains unexpected trailing bytes")
+
+    # Every file matches its own digest, so the damage is in the names or the records, which can't be trusted
+    if version >= 2 and check_file_digests and len(mismatched_files) == 0:
+        reportInvalidContainer("names or records do not match the container digest")
+
+    return (byte_data_list, mismatched_files)
+
+
+def readRecordColumns(view, position, record_count):
+    """
+    Reads the record table of a container, one column at a time. (Part of parseContainer)
+    :param view: The memoryview of the container.
+    :param position: The position of the record table (the size of the container's header).
+    :param record_count: The number of records in the container.
+    :return: A tuple containing the kinds (bytes), parent indexes (array), sizes (array) and digests (bytes, 32 per
+    record) of all records.
+    """
+    kinds = bytes(view[position:position + record_count])
+    position += record_count
+
+    parents = array('I')
+    parents.frombytes(view[position:position + record_count * 4])
+    position += record_count * 4
+
+    sizes = array('Q')
+    sizes.frombytes(view[position:position + record_count * 8])
+    position += record_count * 8
+
+    # The columns are stored big-endian, while arrays use the machine's byte order
+    if sys.byteorder == 'little':
+        parents.byteswap()
+        sizes.byteswap()
+
+    digests = bytes(view[position:position + record_count * DIGEST_SIZE])
+
+    return (kinds, parents, sizes, digests)
+
+
+def addFileRunToFolder(run, folder_index, start, count, folder, folder_path, body_position):
+    """
+    Adds a run of consecutive file records to the folder they belong to, and checks the files against their stored
+    digests. (Part of parseContainer)
+    :param run: A tuple of the container's record columns (kinds, parents, sizes, digests), names, the container in
+    byte format and the list of files with mismatched digests that is being filled (or None if the files don't need
+    to be checked, since the whole container matches its digest).
+    :param folder_index: The record index of the folder the files belong to (NO_PARENT at the top of the directory).
+    :param start: The record index of the first file in the run.
+    :param count: The number of files in the run.
+    :param folder: The dictionary representation of the folder, which the files get added to.
+    :param folder_path: The path of the folder, ending in '/' (empty at the top of the directory).
+    :param body_position: The position in the container of the first file's contents.
+    :return: The position in the container directly after the last file's contents.
+    """
+    kinds, parents, sizes, digests, names, byte_data, mismatched_files = run
+    end = start + count
+
+    if end > len(kinds) or kinds[start:end].count(RECORD_KIND_FILE) != count or parents[start:end].count(folder_index) != count:
+        reportInvalidContainer("file records of record " + str(folder_index) + " are out of place")
+
+    offsets = list(accumulate(sizes[start:end], initial=body_position))
+
+    if offsets[-1] > len(byte_data):
+        reportInvalidContainer("file contents are larger than the data")
+
+    run_names = names[start:end]
+    contents_list = [byte_data[body_start:body_end] for body_start, body_end in zip(offsets, offsets[1:])]
+    folder.update(zip(run_names, contents_list))
+
+    # The folder was empty, so any name appearing twice leaves it with fewer files than the run
+    if len(folder) != count:
+        reportInvalidContainer("file records of record " + str(folder_index) + " contain duplicates")
+
+    if mismatched_files is not None:
+        for index in FileDigests.getMismatchedDigestIndexes(contents_list, digests[start * DIGEST_SIZE:end * DIGEST_SIZE]):
+            mismatched_files.append((folder_path + run_names[index]).decode('utf-8'))
+
+    return offsets[-1]
+
+
+def isValidUTF8(byte_data):
+    """
+    Checks whether the given data is valid utf-8 text.
+    :param byte_data: The data in byte format.
+    :return: True if the data can be decoded as utf-8.
+    """
+    try:
+        byte_data.decode('utf-8')
+    except UnicodeDecodeError:
+        return False
+
+    return True
+
+
+def reportInvalidContainer(reason):
+    """
+    Stops the program because the hidden data isn't a valid container.
+    :param reason: A short description of what is wrong with the container.
+    """
+    print("Error - Unable to extract data from the given image(s) (" + reason + ").")
+    sys.exit(1)
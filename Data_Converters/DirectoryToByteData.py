@@ -30,12 +30,12 @@ def getByteData(path):
     # True if the path specified leads directly to a file
     if not os.path.isdir(path):
         fileName = os.path.basename(path)
-        byte_data_list[bytes(fileName, 'utf-8')] = extractByteFileData(path)
+        byte_data_list[encodeName(fileName, path)] = extractByteFileData(path)
         return byte_data_list
 
     # Otherwise, the path leads to a folder, which will be examined recursively
     folderName = os.path.basename(path)
-    byte_data_list[bytes(folderName, 'utf-8')] = getByteData_Implementation(path)
+    byte_data_list[encodeName(folderName, path)] = getByteData_Implementation(path)
 
     return byte_data_list
 
@@ -53,10 +53,78 @@ def getByteData_Implementation(folder_path):
 
         # True if the current item being looked at in the folder is itself another folder
         if os.path.isdir(sub_dir_path):
-            byte_data_list[bytes(sub_dir_name, 'utf-8')] = getByteData_Implementation(sub_dir_path)
+            byte_data_list[encodeName(sub_dir_name, sub_dir_path)] = getByteData_Implementation(sub_dir_path)
             continue
         
         # Otherwise, the current item is a file
-        byte_data_list[bytes(sub_dir_name, 'utf-8')] = extractByteFileData(sub_dir_path)
+        byte_data_list[encodeName(sub_dir_name, sub_dir_path)] = extractByteFileData(sub_dir_path)
     
-    return byte_data_list
\ No newline at end of file
+    return byte_data_list
+
+
+def getByteDataSizes(path):
+    """
+    Works out the sizes that matter for storing a path's contents (see getByteData) from the file system alone,
+    without opening a single file. Folders are listed with os.scandir, which usually knows whether an entry is a
+    folder without asking the file system again, so only every file's size has to be looked up.
+    :param path: The path to the content(s) to be stored.
+    :return: A tuple containing the number of files and folders (including the path itself), the total length of
+    their utf-8 names and the total size of the files' contents.
+    """
+    if not os.path.exists(path):
+        print("Error - Specified path to data that you want copied and hidden does not exist. (Path Name: '" + str(path) + "')")
+        sys.exit(1)
+
+    name_size = len(encodeName(os.path.basename(path), path))
+
+    if not os.path.isdir(path):
+        return (1, name_size, os.path.getsize(path))
+
+    record_count = 1
+    names_size = name_size
+    contents_size = 0
+
+    # Folders are listed with byte paths, so every name comes in the byte format it gets stored in, once it's checked
+    folders = [os.fsencode(path)]
+
+    while len(folders) > 0:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                record_count += 1
+                names_size += len(encodeName(entry.name, entry.path))
+
+                if entry.is_dir():
+                    folders.append(entry.path)
+                    continue
+
+                # A broken symbolic link is listed, but has no file behind it to be sized (or read when hiding)
+                try:
+                    contents_size += entry.stat().st_size
+                except OSError:
+                    print("Error - Specified path to data that you want copied and hidden does not exist. (Path Name: '" +
+                          os.fsdecode(entry.path) + "')")
+                    sys.exit(1)
+
+    return (record_count, names_size, contents_size)
+
+
+def encodeName(name, path):
+    """
+    Encodes the name of a file or folder in the utf-8 format it gets stored in. Both hiding and planning use this, so
+    a name that can't be stored is reported the same way by both, before anything gets hidden.
+    :param name: The name, as a string or in byte format (as listed from a byte path).
+    :param path: The path to the file or folder, which is named in the error message.
+    :return: The name in byte format.
+    """
+    # Names that aren't valid utf-8 are listed with their raw bytes escaped, and fsencode turns them back into those bytes
+    name = os.fsencode(name)
+
+    try:
+        name.decode('utf-8')
+    except UnicodeDecodeError:
+        # The bytes that aren't valid can't be printed either, so they are shown replaced
+        printable_path = os.fsencode(path).decode('utf-8', 'replace')
+        print("Error - The name of '" + printable_path + "' is not valid utf-8, so it can't be hidden. Rename it and try again.")
+        sys.exit(1)
+
+    return name
@@ -0,0 +1,191 @@
+import numpy as np
+import sys
+
+
+# Reed-Solomon style erasure coding over the finite field GF(256). The data is split into k equally sized data
+# shards, and m parity shards are computed from them, such that any k of the k + m shards are enough to rebuild
+# the data. The encoding matrix is the k x k identity matrix stacked on top of an m x k Cauchy matrix, which
+# guarantees that every k x k selection of its rows can be inverted.
+#
+# Multiplying a whole shard by a field element is a single table lookup over the shard (MULTIPLICATION_TABLE[c][shard]),
+# so both encoding and decoding process entire shards at once rather than one byte at a time.
+FIELD_SIZE = 256
+FIELD_POLYNOMIAL = 0x11D
+
+# At most 256 shards can exist, since the Cauchy matrix needs a distinct field element for every shard
+MAX_SHARDS = FIELD_SIZE
+
+
+def createFieldTables():
+    """
+    Creates the logarithm, exponent and multiplication tables of GF(256).
+    :return: A tuple containing the exponent table (510 entries, so sums of two logarithms never need wrapping),
+    the logarithm table and the full 256 x 256 multiplication table.
+    """
+    exponents = np.zeros(2 * (FIELD_SIZE - 1), dtype=np.uint8)
+    logarithms = np.zeros(FIELD_SIZE, dtype=np.int32)
+
+    value = 1
+    for power in range(FIELD_SIZE - 1):
+        exponents[power] = value
+        logarithms[value] = power
+
+        value <<= 1
+        if value & FIELD_SIZE:
+            value ^= FIELD_POLYNOMIAL
+
+    exponents[FIELD_SIZE - 1:] = exponents[:FIELD_SIZE - 1]
+
+    # Products are looked up through logarithms, and anything multiplied by zero is zero
+    multiplication_table = exponents[logarithms[:, None] + logarithms[None, :]]
+    multiplication_table[0, :] = 0
+    multiplication_table[:, 0] = 0
+
+    return (exponents, logarithms, multiplication_table)
+
+
+EXPONENTS, LOGARITHMS, MULTIPLICATION_TABLE = createFieldTables()
+
+
+def invertFieldElement(value):
+    """
+    Gets the multiplicative inverse of a nonzero element of GF(256).
+    :param value: The element to invert.
+    :return: The inverse of 'value'.
+    """
+    return int(EXPONENTS[(FIELD_SIZE - 1 - LOGARITHMS[value]) % (FIELD_SIZE - 1)])
+
+
+def createEncodingMatrix(data_shard_count, parity_shard_count):
+    """
+    Creates the encoding matrix, whose rows describe how every shard is computed from the data shards.
+    :param data_shard_count: The number of data shards (k).
+    :param parity_shard_count: The number of parity shards (m).
+    :return: A (k + m) x k matrix of field elements. The first k rows are the identity matrix.
+    """
+    matrix = np.zeros((data_shard_count + parity_shard_count, data_shard_count), dtype=np.uint8)
+    matrix[:data_shard_count] = np.eye(data_shard_count, dtype=np.uint8)
+
+    # Cauchy matrix entry 1 / (x_i + y_j), where x_i = k + i and y_j = j are all distinct (addition is XOR)
+    for i in range(parity_shard_count):
+        for j in range(data_shard_count):
+            matrix[data_shard_count + i, j] = invertFieldElement((data_shard_count + i) ^ j)
+
+    return matrix
+
+
+def multiplyMatrixByShards(matrix, shards):
+    """
+    Multiplies a matrix of field elements by a stack of shards.
+    :param matrix: An r x n matrix of field elements.
+    :param shards: An n x L array containing n shards of L bytes each.
+    :return: An r x L array, where row i is the sum (XOR) of every shard j multiplied by matrix[i][j].
+    """
+    result = np.zeros((matrix.shape[0], shards.shape[1]), dtype=np.uint8)
+
+    for i in range(matrix.shape[0]):
+        for j in range(matrix.shape[1]):
+            if matrix[i, j] != 0:
+                result[i] ^= MULTIPLICATION_TABLE[matrix[i, j]][shards[j]]
+
+    return result
+
+
+def invertMatrix(matrix):
+    """
+    Inverts a square matrix of field elements with Gauss-Jordan elimination. Every elimination step updates all rows
+    at once.
+    :param matrix: An n x n matrix of field elements.
+    :return: The inverse of 'matrix'.
+    """
+    size = matrix.shape[0]
+    augmented = np.concatenate([matrix, np.eye(size, dtype=np.uint8)], axis=1)
+
+    for column in range(size):
+        pivot_rows = np.nonzero(augmented[column:, column])[0]
+
+        # This can't happen for rows of the encoding matrix, but is checked just in case
+        if len(pivot_rows) == 0:
+            print("Error - Unable to rebuild the hidden data from the remaining photos.")
+            sys.exit(1)
+
+        pivot = column + pivot_rows[0]
+        augmented[[column, pivot]] = augmented[[pivot, column]]
+        augmented[column] = MULTIPLICATION_TABLE[invertFieldElement(augmented[column, column])][augmented[column]]
+
+        # Eliminate the current column from every other row
+        factors = augmented[:, column].copy()
+        factors[column] = 0
+        augmented ^= MULTIPLICATION_TABLE[factors[:, None], augmented[column][None, :]]
+
+    return augmented[:, size:]
+
+
+def getShardLength(byte_length, data_shard_count):
+    """
+    Gets the length of every shard that encodeParityShards creates.
+    :param byte_length: The length of the data in bytes.
+    :param data_shard_count: The number of data shards (k).
+    :return: The length of every shard in bytes.
+    """
+    return max(1, -(-byte_length // data_shard_count))
+
+
+def encodeParityShards(byte_data, data_shard_count, parity_shard_count):
+    """
+    Splits data into data shards and computes the parity shards for them.
+    :param byte_data: The data in byte format.
+    :param data_shard_count: The number of data shards (k).
+    :param parity_shard_count: The number of parity shards (m).
+    :return: A list of k + m shards (each one in byte format and of equal length). Joining the first k shards gives
+    back 'byte_data', followed by zero padding.
+    """
+    if data_shard_count + parity_shard_count > MAX_SHARDS:
+        print("Error - At most " + str(MAX_SHARDS) + " photos can be used when parity photos are requested.")
+        sys.exit(1)
+
+    shard_length = getShardLength(len(byte_data), data_shard_count)
+    data_shards = np.zeros(data_shard_count * shard_length, dtype=np.uint8)
+    data_shards[:len(byte_data)] = np.frombuffer(byte_data, dtype=np.uint8)
+    data_shards = data_shards.reshape(data_shard_count, shard_length)
+
+    parity_matrix = createEncodingMatrix(data_shard_count, parity_shard_count)[data_shard_count:]
+    parity_shards = multiplyMatrixByShards(parity_matrix, data_shards)
+
+    return [shard.tobytes() for shard in data_shards] + [shard.tobytes() for shard in parity_shards]
+
+
+def decodeParityShards(shards, data_shard_count, parity_shard_count, byte_length):
+    """
+    Rebuilds the original data from any k of the k + m shards.
+    :param shards: A dictionary mapping shard numbers (0 to k + m - 1) to the shards (in byte format) that are intact.
+    :param data_shard_count: The number of data shards (k).
+    :param parity_shard_count: The number of parity shards (m).
+    :param byte_length: The length of the original data in bytes.
+    :return: The original data in byte format.
+    """
+    if len(shards) < data_shard_count:
+        print("Error - Not enough intact photos remain to rebuild the hidden data.")
+        print("At least " + str(data_shard_count) + " are needed, but only " + str(len(shards)) + " are intact.")
+        sys.exit(1)
+
+    # Data shards are used as they are, and only missing ones are computed from the parity shards
+    available = sorted(shards)[:data_shard_count]
+    if available == list(range(data_shard_count)):
+        return b''.join(shards[index] for index in available)[:byte_length]
+
+    encoding_matrix = createEncodingMatrix(data_shard_count, parity_shard_count)
+    decoding_matrix = invertMatrix(encoding_matrix[available])
+
+    available_shards = np.stack([np.frombuffer(shards[index], dtype=np.uint8) for index in available])
+    missing = [index for index in range(data_shard_count) if index not in shards]
+    rebuilt_shards = multiplyMatrixByShards(decoding_matrix[missing], available_shards)
+
+    data_shards = [None] * data_shard_count
+    for index in range(data_shard_count):
+        if index in shards:
+            data_shards[index] = shards[index]
+    for position, index in enumerate(missing):
+        data_shards[index] = rebuilt_shards[position].tobytes()
+
+    return b''.join(data_shards)[:byte_length]
@@ -0,0 +1,47 @@
+from functools import partial
+import hashlib
+
+
+DIGEST_SIZE = 32
+
+# Creates a new BLAKE2b hash object for the given data (used to hash many files without a Python call per file)
+createDigestHash = partial(hashlib.blake2b, digest_size=DIGEST_SIZE)
+
+# An empty hash object, copied for every file that gets checked. Copying one is much cheaper than setting up a new one,
+# which is most of the cost of hashing a small file.
+EMPTY_DIGEST_HASH = createDigestHash()
+
+
+def computeFileDigest(byte_data):
+    """
+    Computes the digest of a single file's contents.
+    :param byte_data: The contents of the file in byte format.
+    :return: The BLAKE2b digest (32 bytes) of the contents.
+    """
+    return createDigestHash(byte_data).digest()
+
+
+def getMismatchedDigestIndexes(contents_list, digests):
+    """
+    Compares the contents of many files against their previously computed digests.
+    :param contents_list: The contents of every file, each one in byte format.
+    :param digests: The expected digests of all files, concatenated in the same order as 'contents_list'.
+    :return: A list of the indexes (into 'contents_list') of all files whose contents don't match their digest.
+    """
+    current_digests = bytearray()
+    for contents in contents_list:
+        digest_hash = EMPTY_DIGEST_HASH.copy()
+        digest_hash.update(contents)
+        current_digests += digest_hash.digest()
+
+    # The common case of every file matching is settled with a single comparison
+    if current_digests == digests:
+        return []
+
+    mismatched_indexes = []
+    for index in range(len(contents_list)):
+        position = index * DIGEST_SIZE
+        if current_digests[position:position + DIGEST_SIZE] != digests[position:position + DIGEST_SIZE]:
+            mismatched_indexes.append(index)
+
+    return mismatched_indexes
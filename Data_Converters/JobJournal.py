@@ -0,0 +1,212 @@
+from Data_Converters import FileDigests, OutputStaging
+import hashlib, json, os, shutil, sys
+
+
+# A job journal records the progress of a long running job (hiding data in, or extracting data from, a set of
+# photos) that writes its output to a staging folder (see OutputStaging), so that an interrupted job can be resumed
+# from its last completed step instead of starting over.
+#
+# The journal is a hidden folder next to the output folder (such as '.Extracted_Data.journal'), holding
+# JOURNAL_FILE, whose first line describes the job and whose every other line records one completed step (as JSON,
+# with bytes stored in hexadecimal), along with any checkpoint files the steps need. It's kept out of the staging
+# folder, so it can never clash with the output itself (extracted data may hold a folder of any name). Every line
+# is flushed to disk as soon as its step is complete. A line that was cut short by a crash is dropped when the
+# journal is opened again, along with the step it belonged to. The journal is removed before the staging folder
+# replaces the output folder.
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_FILE = 'journal.jsonl'
+
+
+def openJobJournal(output_path, job_description, resume=False):
+    """
+    Opens the journal of a job, before its staging folder is opened. An existing journal is only continued if the job
+    is being resumed and the journal describes the same job. Otherwise, a new journal is started once the user has
+    agreed to discard an existing one (see discardJobJournal), and the staging folder has to be emptied.
+    :param output_path: The path to the job's output folder.
+    :param job_description: A dictionary of everything the job's output depends on (such as the data being hidden
+    and the photos being used). Must only hold values that can be stored as JSON (or bytes).
+    :param resume: Whether the job is being resumed.
+    :return: A dictionary holding the path to the journal folder ('path'), the open journal file ('file'), all
+    completed steps ('steps', a dictionary mapping step names to their records) and whether an interrupted job is
+    being continued ('resumed'), in which case the contents of the staging folder must be kept.
+    """
+    journal_path = OutputStaging.getSiblingPath(output_path, JOURNAL_SUFFIX)
+    file_path = os.path.join(journal_path, JOURNAL_FILE)
+
+    steps = readJournalSteps(file_path, job_description) if resume else None
+
+    if steps is None:
+        if resume and not os.path.isdir(journal_path):
+            print("No interrupted job matching this one was found, so it will be started from the beginning.")
+
+        discardJobJournal(output_path)
+        os.mkdir(journal_path)
+
+        journal = {'path': journal_path, 'file': open(file_path, 'w'), 'steps': {}, 'resumed': False}
+        writeJournalLine(journal, {'job': job_description})
+
+        return journal
+
+    return {'path': journal_path, 'file': open(file_path, 'a'), 'steps': steps, 'resumed': True}
+
+
+def discardJobJournal(output_path):
+    """
+    Removes the journal of an interrupted job that writes to the same output folder, since its progress no longer
+    applies once the staging folder is emptied. The progress is only thrown away if the user agrees to it.
+    :param output_path: The path to the job's output folder.
+    """
+    journal_path = OutputStaging.getSiblingPath(output_path, JOURNAL_SUFFIX)
+
+    if not os.path.isdir(journal_path):
+        return
+
+    print("An interrupted run left progress in " + journal_path + " that this run would discard.")
+    print("Run the interrupted command again with --resume to continue it instead. Do you wish to discard it?")
+
+    try:
+        answer = input()
+    except EOFError:
+        answer = ''
+
+    if answer[:1] != 'y' and answer[:1] != 'Y':
+        print("The interrupted run's progress has been kept. Goodbye.")
+        sys.exit(0)
+
+    shutil.rmtree(journal_path)
+
+
+def recordJournalStep(journal, step_name, record):
+    """
+    Records that a step of the job has been completed, once all of its output has been flushed to disk.
+    :param journal: The open job journal (see openJobJournal).
+    :param step_name: The unique name of the step (such as the name of the photo it processed).
+    :param record: A dictionary describing the step's output, which must only hold values that can be stored as JSON
+    (or bytes).
+    """
+    writeJournalLine(journal, {'step': step_name, 'record': record})
+    journal['steps'][step_name] = record
+
+
+def getJournalStep(journal, step_name):
+    """
+    Gets the record of a completed step.
+    :param journal: The open job journal (see openJobJournal).
+    :param step_name: The name of the step.
+    :return: The record of the step (see recordJournalStep), or None if the step hasn't been completed.
+    """
+    return journal['steps'].get(step_name)
+
+
+def getCheckpointPath(journal, checkpoint_name):
+    """
+    Gets the path where a step can store a checkpoint file, which is removed along with the journal.
+    :param journal: The open job journal (see openJobJournal).
+    :param checkpoint_name: The name of the checkpoint file.
+    :return: The path to the checkpoint file.
+    """
+    return os.path.join(journal['path'], checkpoint_name)
+
+
+def closeJobJournal(journal):
+    """
+    Closes the journal of a completed job and removes it.
+    :param journal: The open job journal (see openJobJournal).
+    """
+    journal['file'].close()
+    shutil.rmtree(journal['path'])
+
+
+def getOutputDescription(file_path):
+    """
+    Describes a file written by a step, so that it can be checked when the job is resumed (see isOutputUnchanged).
+    The file must already be flushed to disk.
+    :param file_path: The path to the file.
+    :return: A dictionary holding the size ('size') and the BLAKE2b digest ('digest') of the file.
+    """
+    with open(file_path, 'rb') as file:
+        digest = hashlib.file_digest(file, FileDigests.createDigestHash).digest()
+
+    return {'size': os.path.getsize(file_path), 'digest': digest}
+
+
+def isOutputUnchanged(file_path, output_description):
+    """
+    Checks that a file written by a completed step is still exactly what the step wrote. The size is checked
+    first, so most damaged files are found without reading them.
+    :param file_path: The path to the file.
+    :param output_description: The description of the file (see getOutputDescription).
+    :return: True if the file exists and has the recorded size and digest.
+    """
+    if not os.path.isfile(file_path) or os.path.getsize(file_path) != output_description['size']:
+        return False
+
+    return getOutputDescription(file_path)['digest'] == output_description['digest']
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def readJournalSteps(file_path, job_description):
+    """
+    Reads the completed steps from an existing journal, and drops a last line that was cut short by a crash.
+    :param file_path: The path to the journal file.
+    :param job_description: The description of the job being resumed.
+    :return: A dictionary mapping step names to their records, or None if there is no journal or it describes a
+    different job.
+    """
+    if not os.path.isfile(file_path):
+        return None
+
+    with open(file_path, 'rb') as file:
+        contents = file.read()
+
+    # Only lines that end in a newline were written completely
+    complete_size = contents.rfind(b'\n') + 1
+    lines = contents[:complete_size].splitlines()
+
+    # The description is compared the way it was stored, since JSON turns tuples into lists
+    if len(lines) == 0 or decodeJournalLine(lines[0]).get('job') != decodeJournalLine(encodeJournalLine(job_description)):
+        return None
+
+    steps = {}
+    for line in lines[1:]:
+        entry = decodeJournalLine(line)
+        steps[entry['step']] = entry['record']
+
+    if complete_size < len(contents):
+        with open(file_path, 'r+b') as file:
+            file.truncate(complete_size)
+
+    return steps
+
+
+def writeJournalLine(journal, entry):
+    """
+    Appends a single line to the journal file and flushes it to disk.
+    :param journal: The open job journal (see openJobJournal).
+    :param entry: The dictionary stored on the line.
+    """
+    journal['file'].write(encodeJournalLine(entry) + '\n')
+    journal['file'].flush()
+    os.fsync(journal['file'].fileno())
+
+
+def encodeJournalLine(entry):
+    """
+    Stores a dictionary as a line of JSON, with all bytes values stored as {'bytes': hexadecimal string}.
+    :param entry: The dictionary to store.
+    :return: The line (without a newline), which only contains ASCII characters.
+    """
+    return json.dumps(entry, default=lambda value: {'bytes': value.hex()})
+
+
+def decodeJournalLine(line):
+    """
+    Reads a line stored with encodeJournalLine.
+    :param line: The line, as a string or in byte format.
+    :return: The stored dictionary.
+    """
+    return json.loads(line, object_hook=lambda value: bytes.fromhex(value['bytes']) if list(value) == ['bytes'] else value)
@@ -38,7 +38,16 @@ def removePotentialHiddenFiles(folder_path):
             item_path = os.path.join(folder_path, item)
             
             # Check if the item is a hidden file (starts with a dot)
-            if item.startswith('.') and not item.lower().endswith('.png'):
+            if isPotentialHiddenFile(item):
                 os.remove(item_path)
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
\ No newline at end of file
+        print(f"An error occurred: {str(e)}")
+
+
+def isPotentialHiddenFile(name):
+    """
+    Checks whether a file is one of the hidden files that removePotentialHiddenFiles removes.
+    :param name: The name of the file.
+    :return: True if the name starts with '.' and isn't the name of a png image.
+    """
+    return name.startswith('.') and not name.lower().endswith('.png')
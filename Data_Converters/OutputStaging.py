@@ -0,0 +1,167 @@
+import os, shutil, sys
+
+
+# Output folders (Processed_Photos and Extracted_Data) are never modified in place. New output is written into a
+# staging folder next to the output folder, and only once all of it has been written and flushed to disk does it
+# replace the output folder. An interrupted run therefore leaves the previous output untouched.
+#
+# The swap takes two renames: the output folder is moved aside to the retired folder, and the staging folder is
+# moved into its place. The output folder is only moved aside once the staging folder is complete, so if a run is
+# interrupted between the two renames, the next run finishes the swap (see recoverInterruptedSwap).
+STAGING_SUFFIX = '.staging'
+RETIRED_SUFFIX = '.old'
+
+
+def openStagingFolder(output_path, keep_contents=False):
+    """
+    Creates an empty staging folder for new output, after finishing any swap that was interrupted before. A staging
+    folder left behind by an interrupted run is removed, unless its contents are kept to resume that run.
+    :param output_path: The path to the output folder that the staged output will replace.
+    :param keep_contents: Whether to keep the contents of an existing staging folder (see JobJournal).
+    :return: The path to the staging folder.
+    """
+    recoverInterruptedSwap(output_path)
+
+    staging_path = getSiblingPath(output_path, STAGING_SUFFIX)
+
+    if keep_contents and os.path.isdir(staging_path):
+        return staging_path
+
+    try:
+        if os.path.isdir(staging_path):
+            shutil.rmtree(staging_path)
+        os.mkdir(staging_path)
+    except OSError as e:
+        print("Error - Unable to create the staging folder " + staging_path + " (" + str(e) + ").")
+        sys.exit(1)
+
+    return staging_path
+
+
+def commitStagingFolder(staging_path, output_path):
+    """
+    Flushes everything in the staging folder to disk and then replaces the output folder with it.
+    :param staging_path: The path to the staging folder (see openStagingFolder).
+    :param output_path: The path to the output folder being replaced.
+    """
+    output_path = os.path.abspath(output_path)
+    syncFolderContents(staging_path)
+
+    retired_path = getSiblingPath(output_path, RETIRED_SUFFIX)
+
+    try:
+        if os.path.isdir(retired_path):
+            shutil.rmtree(retired_path)
+
+        if os.path.exists(output_path):
+            os.rename(output_path, retired_path)
+        os.rename(staging_path, output_path)
+        syncFolder(os.path.dirname(output_path))
+
+        if os.path.isdir(retired_path):
+            shutil.rmtree(retired_path)
+    except OSError as e:
+        print("Error - Unable to move the new output into " + output_path + " (" + str(e) + ").")
+        sys.exit(1)
+
+
+def recoverInterruptedSwap(output_path):
+    """
+    Finishes a swap of an output folder that was interrupted between its two renames (see commitStagingFolder).
+    Anything that reads an output folder should call this first, since the folder may be missing until then.
+    :param output_path: The path to the output folder.
+    """
+    output_path = os.path.abspath(output_path)
+    retired_path = getSiblingPath(output_path, RETIRED_SUFFIX)
+
+    if not os.path.isdir(retired_path):
+        return
+
+    try:
+        current_path = getCurrentOutputPath(output_path)
+        if current_path != output_path:
+            os.rename(current_path, output_path)
+            syncFolder(os.path.dirname(output_path))
+
+        if os.path.isdir(retired_path):
+            shutil.rmtree(retired_path)
+    except OSError as e:
+        print("Error - Unable to recover the output folder " + output_path + " (" + str(e) + ").")
+        sys.exit(1)
+
+
+def getCurrentOutputPath(output_path):
+    """
+    Gets the folder holding an output folder's current contents without changing anything on disk, for reading an
+    output folder whose swap may have been interrupted (see recoverInterruptedSwap).
+    :param output_path: The path to the output folder.
+    :return: The path to the folder that recoverInterruptedSwap would move into place, or the output folder itself.
+    """
+    absolute_path = os.path.abspath(output_path)
+    retired_path = getSiblingPath(absolute_path, RETIRED_SUFFIX)
+    staging_path = getSiblingPath(absolute_path, STAGING_SUFFIX)
+
+    if not os.path.isdir(retired_path) or os.path.exists(absolute_path):
+        return output_path
+
+    # The output folder is only retired once the staging folder is complete, so the staged output wins
+    return staging_path if os.path.isdir(staging_path) else retired_path
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def getSiblingPath(output_path, suffix):
+    """
+    Gets the path of a hidden folder next to an output folder, such as its staging folder.
+    :param output_path: The path to the output folder.
+    :param suffix: The suffix of the sibling folder (STAGING_SUFFIX or RETIRED_SUFFIX).
+    :return: The path to the sibling folder, which is on the same file system, so it can be renamed atomically.
+    """
+    output_path = os.path.abspath(output_path)
+
+    return os.path.join(os.path.dirname(output_path), '.' + os.path.basename(output_path) + suffix)
+
+
+def syncFolderContents(folder_path):
+    """
+    Flushes every file and folder inside a folder (including the folder itself) to disk.
+    :param folder_path: The path to the folder.
+    """
+    for root, folders, files in os.walk(folder_path):
+        for file in files:
+            syncFile(os.path.join(root, file))
+
+        syncFolder(root)
+
+
+def syncFile(file_path):
+    """
+    Flushes a file that has already been written and closed to disk.
+    :param file_path: The path to the file.
+    """
+    file_descriptor = os.open(file_path, os.O_RDONLY)
+
+    try:
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+
+
+def syncFolder(folder_path):
+    """
+    Flushes the entries of a folder (the names of its files and folders) to disk. Folders can't be opened on
+    Windows, where renames are flushed by the file system itself.
+    :param folder_path: The path to the folder.
+    """
+    if os.name != 'posix':
+        return
+
+    file_descriptor = os.open(folder_path, os.O_RDONLY)
+
+    try:
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
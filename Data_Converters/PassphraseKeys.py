@@ -0,0 +1,65 @@
+from functools import lru_cache
+import hashlib, os, sys
+
+
+# Passphrases are turned into a master key with scrypt, which is deliberately slow and memory hungry so that
+# guessing passphrases is expensive. The salt and scrypt parameters are stored in every photo header, so the same
+# key can be derived again when extracting. Every use of the key (such as the order channel values are visited in)
+# gets its own subkey, derived from the master key with keyed BLAKE2b.
+SALT_SIZE = 16
+KEY_SIZE = 32
+
+# scrypt parameters for new photo sets (N = 2 ** 15, which takes 32 MB of memory)
+KDF_LOG_N = 15
+KDF_R = 8
+KDF_P = 1
+
+# Headers are read from untrusted photos, so parameters that would take an unreasonable amount of time or memory to
+# derive a key with are refused
+MAX_KDF_LOG_N = 20
+MAX_KDF_R = 16
+MAX_KDF_P = 16
+
+
+def createKeyParameters():
+    """
+    Creates the salt and scrypt parameters for a new photo set.
+    :return: A dictionary of the header values describing how the key is derived ('salt', 'kdf_log_n', 'kdf_r' and
+    'kdf_p', see PhotoHeaders).
+    """
+    return {'salt': os.urandom(SALT_SIZE), 'kdf_log_n': KDF_LOG_N, 'kdf_r': KDF_R, 'kdf_p': KDF_P}
+
+
+@lru_cache(maxsize=8)
+def deriveMasterKey(passphrase, salt, kdf_log_n, kdf_r, kdf_p):
+    """
+    Derives the master key of a photo set from a passphrase. Results are remembered, since every photo of a set
+    derives the same key.
+    :param passphrase: The passphrase (a string).
+    :param salt: The salt of the photo set.
+    :param kdf_log_n: The base 2 logarithm of the scrypt cost parameter N.
+    :param kdf_r: The scrypt block size parameter.
+    :param kdf_p: The scrypt parallelization parameter.
+    :return: The master key (32 bytes).
+    """
+    if not 1 <= kdf_log_n <= MAX_KDF_LOG_N or not 1 <= kdf_r <= MAX_KDF_R or not 1 <= kdf_p <= MAX_KDF_P:
+        print("Error - The photo header asks for unsupported passphrase parameters.")
+        sys.exit(1)
+
+    n = 2 ** kdf_log_n
+    return hashlib.scrypt(passphrase.encode('utf-8'), salt=salt, n=n, r=kdf_r, p=kdf_p, maxmem=256 * n * kdf_r + 2 ** 20,
+                          dklen=KEY_SIZE)
+
+
+def deriveSubkey(header_values, passphrase, purpose):
+    """
+    Derives the key used for one purpose from a passphrase and the key parameters stored in a photo header.
+    :param header_values: A dictionary containing the header values 'salt', 'kdf_log_n', 'kdf_r' and 'kdf_p'.
+    :param passphrase: The passphrase (a string).
+    :param purpose: A short name (bytes, at most 16 long) of what the key is used for, such as b'permutation'.
+    :return: The subkey (32 bytes).
+    """
+    master_key = deriveMasterKey(passphrase, bytes(header_values['salt']), header_values['kdf_log_n'],
+                                 header_values['kdf_r'], header_values['kdf_p'])
+
+    return hashlib.blake2b(key=master_key, person=purpose, digest_size=KEY_SIZE).digest()
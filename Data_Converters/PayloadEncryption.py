@@ -0,0 +1,108 @@
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+import struct, sys
+
+
+# The hidden data can be encrypted with ChaCha20-Poly1305, using a key derived from a passphrase (see
+# PassphraseKeys). The data is split into chunks of CHUNK_SIZE bytes that are encrypted separately, each one
+# followed by its 16 byte authentication tag, so chunks can be encrypted and decrypted independently of each other.
+#
+# Every photo set gets a fresh salt and therefore a fresh key, so the nonce of a chunk is simply its index, along
+# with a flag marking the final chunk. A chunk that was moved, dropped or appended (or a set that was cut short)
+# fails authentication, since it no longer decrypts under the nonce of its position.
+CHUNK_SIZE = 2 ** 20
+TAG_SIZE = 16
+NONCE_STRUCT = struct.Struct('>QI')
+
+
+def encryptPayload(byte_data, encryption_key):
+    """
+    Encrypts the data to be hidden, one chunk at a time.
+    :param byte_data: The data in byte format.
+    :param encryption_key: The 32 byte encryption key (see PassphraseKeys.deriveSubkey).
+    :return: The encrypted data (in a bytearray), which is TAG_SIZE bytes longer than the data for every chunk.
+    """
+    cipher = ChaCha20Poly1305(encryption_key)
+    chunk_count = getChunkCount(len(byte_data))
+    data = memoryview(byte_data)
+
+    # Every chunk is encrypted straight from the data into its place in the output, so neither the chunks nor the
+    # encrypted chunks are ever copied
+    encrypted_data = bytearray(getEncryptedSize(len(byte_data)))
+    output = memoryview(encrypted_data)
+
+    # Even empty data gets one (empty) chunk, so that its tag can still be checked
+    for chunk_index in range(chunk_count):
+        chunk = data[chunk_index * CHUNK_SIZE:(chunk_index + 1) * CHUNK_SIZE]
+        start = chunk_index * (CHUNK_SIZE + TAG_SIZE)
+        nonce = createNonce(chunk_index, chunk_index == chunk_count - 1)
+        cipher.encrypt_into(nonce, chunk, None, output[start:start + len(chunk) + TAG_SIZE])
+
+    return encrypted_data
+
+
+def getEncryptedSize(size):
+    """
+    Gets the size that data will have once it's encrypted with encryptPayload.
+    :param size: The size of the data in bytes.
+    :return: The size of the encrypted data in bytes.
+    """
+    return size + getChunkCount(size) * TAG_SIZE
+
+
+def decryptPayload(byte_data, encryption_key):
+    """
+    Decrypts hidden data that was encrypted with encryptPayload, checking every chunk's tag.
+    :param byte_data: The encrypted data in byte format.
+    :param encryption_key: The 32 byte encryption key (see PassphraseKeys.deriveSubkey).
+    :return: The decrypted data (in a bytearray).
+    """
+    cipher = ChaCha20Poly1305(encryption_key)
+    encrypted_chunk_size = CHUNK_SIZE + TAG_SIZE
+    chunk_count = max(1, -(-len(byte_data) // encrypted_chunk_size))
+
+    # The final chunk must at least hold its tag
+    if len(byte_data) - (chunk_count - 1) * encrypted_chunk_size < TAG_SIZE:
+        print("Error - Unable to decrypt the hidden data. The passphrase is wrong or the photos have been altered.")
+        sys.exit(1)
+
+    data = memoryview(byte_data)
+    decrypted_data = bytearray(len(byte_data) - chunk_count * TAG_SIZE)
+    output = memoryview(decrypted_data)
+
+    for chunk_index in range(chunk_count):
+        encrypted_chunk = data[chunk_index * encrypted_chunk_size:(chunk_index + 1) * encrypted_chunk_size]
+        start = chunk_index * CHUNK_SIZE
+        nonce = createNonce(chunk_index, chunk_index == chunk_count - 1)
+
+        try:
+            cipher.decrypt_into(nonce, encrypted_chunk, None, output[start:start + len(encrypted_chunk) - TAG_SIZE])
+        except InvalidTag:
+            print("Error - Unable to decrypt the hidden data. The passphrase is wrong or the photos have been altered.")
+            sys.exit(1)
+
+    return decrypted_data
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def createNonce(chunk_index, is_final_chunk):
+    """
+    Creates the 12 byte nonce of a chunk.
+    :param chunk_index: The index of the chunk within the data.
+    :param is_final_chunk: Whether this is the last chunk of the data.
+    :return: The nonce in byte format.
+    """
+    return NONCE_STRUCT.pack(chunk_index, 1 if is_final_chunk else 0)
+
+
+def getChunkCount(size):
+    """
+    Gets the number of chunks that data is split into when it's encrypted.
+    :param size: The size of the data in bytes.
+    :return: The number of chunks, which is at least 1.
+    """
+    return max(1, -(-size // CHUNK_SIZE))
@@ -0,0 +1,192 @@
+from Data_Converters import DirectoryToByteData, ContainerFormat, JobJournal, OutputStaging, PassphraseKeys
+from Image_Manipulation import CarrierCache, ImageDataHiding, PhotoHeaders, PhotoPackingPlanner
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import json, os, sys
+
+
+# A batch hides several independent pieces of data in one pool of input photos in a single run. It's described by a
+# manifest, a JSON list of jobs such as:
+#
+#   [{"data": "Reports/", "group": "reports"}, {"data": "photos.zip", "group": "backup"}]
+#
+# Every job's data is hidden as a photo set of its own, in photos that no other job uses, and saved to its own folder
+# inside Processed_Photos named after its group. Every set has its own set ID (and its own salt), so the groups can
+# be extracted and verified separately, and photos from different groups are never mistaken for one set. Data paths
+# that aren't absolute are relative to the folder containing the manifest.
+
+
+def hideBatchInImages(manifest_path, path_to_input_photos, path_to_processed_photos, parity_photos=0,
+                      packing_strategy=PhotoPackingPlanner.DEFAULT_PACKING_STRATEGY, carrier_cache=None, passphrase=None,
+                      keyed=False, encrypted=False, matrix_bits=0):
+    """
+    Hides the data of every job in a batch manifest in its own set of photos, chosen from one shared pool of input
+    photos, and saves each set to its group's folder inside the processed photos folder. The jobs are hidden in
+    parallel.
+    :param manifest_path: The path to the batch manifest (see readBatchManifest).
+    :param path_to_input_photos: The path to the folder containing the photo(s) that will be used to hide the data.
+    :param path_to_processed_photos: Folder location where the folders of all groups will be saved.
+    :param parity_photos: The number of extra parity photos to create for every job.
+    :param packing_strategy: How to choose the photos that every job gets hidden in (see PhotoPackingPlanner).
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), or None to open every photo's
+    header without a cache.
+    :param passphrase: The passphrase that keys are derived from (see PassphraseKeys). Required if 'keyed' or
+    'encrypted' is True.
+    :param keyed: Whether the hidden data is stored in keyed order (see KeyedPermutation).
+    :param encrypted: Whether the hidden data is encrypted (see PayloadEncryption).
+    :param matrix_bits: The number of bits per block with matrix embedding (see MatrixEmbedding), or 0.
+    """
+    jobs = readBatchManifest(manifest_path)
+
+    # Every job is sized from the file system's metadata only, so no data is read until the photos are chosen
+    for job in jobs:
+        record_count, job['num_bytes'] = ImageDataHiding.getHiddenDataSize(job['data'], encrypted)
+
+    capacities = ImageDataHiding.getPhotoCapacities(path_to_input_photos, carrier_cache)
+    channel_capacities = capacities
+
+    if carrier_cache is not None:
+        CarrierCache.saveCarrierCache(carrier_cache)
+
+    if matrix_bits != 0:
+        capacities = ImageDataHiding.getMatrixCapacities(channel_capacities, matrix_bits)
+
+    unused_photos = allocateBatchPhotos(jobs, capacities, channel_capacities, parity_photos, packing_strategy)
+
+    total_bits = sum(slice_bits for job in jobs for photo, slice_offset, slice_bits in job['photo_slices'])
+    ImageDataHiding.printSizeOfDataToBeHidden(total_bits)
+
+    # Every group is written to its own folder inside one staging folder, which only replaces the processed photos
+    # from a previous session once every job has been completed. A batch can't be resumed, so an interrupted hiding
+    # session's progress is only thrown away if the user agrees to it.
+    JobJournal.discardJobJournal(path_to_processed_photos)
+    path_to_staged_photos = OutputStaging.openStagingFolder(path_to_processed_photos)
+
+    for job in jobs:
+        os.mkdir(os.path.join(path_to_staged_photos, job['group']))
+
+    hide_job = partial(hideBatchJob, path_to_input_photos=path_to_input_photos, path_to_staged_photos=path_to_staged_photos,
+                       parity_photos=parity_photos, passphrase=passphrase, keyed=keyed, encrypted=encrypted,
+                       matrix_bits=matrix_bits)
+
+    # Each job is one task, so the photos of one job are written in order while the jobs run side by side
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(hide_job, jobs))
+
+    OutputStaging.commitStagingFolder(path_to_staged_photos, path_to_processed_photos)
+
+    print("All " + str(len(jobs)) + " group(s) have successfully been hidden! (100% complete)")
+
+    if len(unused_photos) > 0:
+        print("\nHere are all the photos that didn't need to (and haven't been) processed...")
+        for photo in unused_photos:
+            print("-> " + photo)
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def readBatchManifest(manifest_path):
+    """
+    Reads and checks a batch manifest.
+    :param manifest_path: The path to the manifest, a JSON list of jobs. Every job is an object with the path to the
+    data to hide ('data') and the name of the group, which is the folder its photos are saved to ('group').
+    :return: The list of jobs, each a dictionary holding the full path to its data ('data') and its group ('group').
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except OSError as e:
+        print("Error - Unable to read the batch manifest " + manifest_path + " (" + str(e) + ").")
+        sys.exit(1)
+    except ValueError as e:
+        print("Error - The batch manifest " + manifest_path + " is not valid JSON (" + str(e) + ").")
+        sys.exit(1)
+
+    if not isinstance(manifest, list) or len(manifest) == 0:
+        print("Error - The batch manifest must be a list of at least one job.")
+        sys.exit(1)
+
+    manifest_folder = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    groups = set()
+
+    for entry in manifest:
+        if not isinstance(entry, dict) or not isinstance(entry.get('data'), str) or not isinstance(entry.get('group'), str):
+            print("Error - Every job in the batch manifest must have a 'data' path and a 'group' name.")
+            sys.exit(1)
+
+        group = entry['group']
+
+        # Group names become folder names, and names starting with '.' would be taken for hidden files
+        if group == '' or group.startswith('.') or '/' in group or '\\' in group:
+            print("Error - The group name '" + group + "' can't be used as a folder name.")
+            sys.exit(1)
+
+        if group in groups:
+            print("Error - The group name '" + group + "' is used by more than one job.")
+            sys.exit(1)
+
+        groups.add(group)
+        jobs.append({'data': os.path.join(manifest_folder, entry['data']), 'group': group})
+
+    return jobs
+
+
+def allocateBatchPhotos(jobs, capacities, channel_capacities, parity_photos=0,
+                        packing_strategy=PhotoPackingPlanner.DEFAULT_PACKING_STRATEGY):
+    """
+    Chooses the photos of every job from the shared pool, so that no photo is used by more than one job. The largest
+    jobs choose first, since they have the fewest photos to choose from. Each job's packing plan is printed.
+    :param jobs: The list of jobs (see readBatchManifest), each holding the number of bytes it hides ('num_bytes').
+    Every job gets the list of its slices added ('photo_slices', see ImageDataHiding.planPhotoSlices).
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :param channel_capacities: The capacities the photos have with one bit per channel value.
+    :param parity_photos: The number of parity photos of every job.
+    :param packing_strategy: How to choose the photos of every job (see PhotoPackingPlanner).
+    :return: The list of photo names that no job needs.
+    """
+    remaining_capacities = dict(capacities)
+
+    for job in sorted(jobs, key=lambda job: job['num_bytes'], reverse=True):
+        print("Group '" + job['group'] + "': " + ImageDataHiding.getDataSizeString(job['num_bytes'] * 8))
+
+        # Any photos left over still have to be able to hold the job, and the error names the group that didn't fit
+        photo_slices, unused_photos = ImageDataHiding.planPhotoSlices(job['num_bytes'], parity_photos, remaining_capacities,
+                                                                      packing_strategy)
+
+        ImageDataHiding.printPackingPlan(photo_slices, remaining_capacities, packing_strategy, channel_capacities)
+
+        job['photo_slices'] = photo_slices
+        remaining_capacities = {photo: remaining_capacities[photo] for photo in unused_photos}
+
+    return sorted(remaining_capacities)
+
+
+def hideBatchJob(job, path_to_input_photos, path_to_staged_photos, parity_photos=0, passphrase=None, keyed=False,
+                 encrypted=False, matrix_bits=0):
+    """
+    Hides the data of one job of a batch in the photos chosen for it. Runs in a worker process.
+    :param job: The job (see allocateBatchPhotos), holding its data path, group, size and slices.
+    :param path_to_input_photos: The path to the folder containing the input photos.
+    :param path_to_staged_photos: The path to the staging folder that holds the folders of all groups.
+    :param parity_photos: The number of parity photos of the job.
+    :param passphrase: The passphrase that keys are derived from, or None.
+    :param keyed: Whether the hidden data is stored in keyed order.
+    :param encrypted: Whether the hidden data is encrypted.
+    :param matrix_bits: The number of bits per block with matrix embedding, or 0.
+    """
+    byte_data = ContainerFormat.createContainer(DirectoryToByteData.getByteData(job['data']))
+
+    # Every group is a photo set of its own, so each one gets its own salt
+    key_parameters = {}
+    if keyed or encrypted:
+        key_parameters = PassphraseKeys.createKeyParameters()
+
+    # Worker processes don't share the carrier cache, so every photo is decoded from its file
+    ImageDataHiding.hidePhotoSet(byte_data, job['photo_slices'], path_to_input_photos, os.path.join(path_to_staged_photos, job['group']),
+                                 PhotoHeaders.createSetID(), key_parameters, passphrase, parity_photos, keyed, encrypted, matrix_bits)
+
+    print("Group '" + job['group'] + "' has been hidden in " + str(len(job['photo_slices'])) + " photo(s).")
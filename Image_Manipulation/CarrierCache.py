@@ -0,0 +1,220 @@
+from Data_Converters import FileDigests
+from Image_Manipulation import CarrierFormats
+import hashlib, os, sqlite3, time
+
+
+# The carrier cache remembers what was learned about every input photo across runs, so that reusing the same photos
+# for many hide jobs doesn't mean opening (and possibly decoding) all of them every time.
+#
+# Everything is keyed by the hash of a photo's file contents, so renamed or copied photos are still recognized and a
+# modified photo is never mistaken for its old version. To avoid hashing every photo on every run, the hash of each
+# path is remembered along with the file's size and modification time, and only computed again if either changes.
+#
+# Tables of the index (an SQLite database):
+#   files:    path, size, modification time (nanoseconds) and content hash of every photo seen so far
+#   carriers: content hash, mode, width, height and number of usable bands (see CarrierFormats.openCarrier).
+#             The capacity of a photo at any density follows from its number of usable channel values.
+#   scratch:  content hash, size and time of last use of every decoded photo stored in the scratch folder
+#   settings: name and value of settings that are kept across runs (the scratch limit)
+#
+# The scratch folder optionally holds the decoded samples of recently used photos (one raw file per content hash),
+# so hiding data in them again skips decoding. Its total size is kept below a limit by removing the photos that
+# were used the longest time ago. The limit is stored in the index, so runs that don't set it keep the one set last.
+CACHE_VERSION = 1
+INDEX_NAME = 'index.sqlite3'
+SCRATCH_FOLDER = 'Scratch'
+
+INDEX_TABLES = (
+    'CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, content_hash TEXT)',
+    'CREATE TABLE IF NOT EXISTS carriers (content_hash TEXT PRIMARY KEY, mode TEXT, width INTEGER, height INTEGER, '
+    'usable_bands INTEGER)',
+    'CREATE TABLE IF NOT EXISTS scratch (content_hash TEXT PRIMARY KEY, size INTEGER, last_used INTEGER)',
+    'CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value INTEGER)',
+)
+
+
+def openCarrierCache(path_to_cache, scratch_limit=None):
+    """
+    Opens the carrier cache, creating it if it doesn't exist yet. A cache written by a different version of this
+    program is cleared first.
+    :param path_to_cache: The path to the folder holding the cache.
+    :param scratch_limit: The largest total size (in bytes) of decoded photos kept in the scratch folder, which is
+    remembered for later runs. With 0, no decoded photos are kept at all. With None, the limit set by an earlier run
+    is kept (0 if it was never set), and nothing is removed from the scratch folder.
+    :return: A dictionary holding the open index ('connection'), the path to the scratch folder ('scratch_path') and
+    the scratch limit ('scratch_limit').
+    """
+    scratch_path = os.path.join(path_to_cache, SCRATCH_FOLDER)
+    os.makedirs(scratch_path, exist_ok=True)
+
+    connection = sqlite3.connect(os.path.join(path_to_cache, INDEX_NAME))
+
+    if connection.execute('PRAGMA user_version').fetchone()[0] != CACHE_VERSION:
+        for table in ('files', 'carriers', 'scratch', 'settings'):
+            connection.execute('DROP TABLE IF EXISTS ' + table)
+        for item in os.listdir(scratch_path):
+            os.remove(os.path.join(scratch_path, item))
+        connection.execute('PRAGMA user_version = ' + str(CACHE_VERSION))
+
+    for statement in INDEX_TABLES:
+        connection.execute(statement)
+
+    # Decoded photos written by a run that never got to save the index are unknown to it, and get removed
+    known_files = {row[0] for row in connection.execute('SELECT content_hash FROM scratch')}
+    for item in os.listdir(scratch_path):
+        if item not in known_files:
+            os.remove(os.path.join(scratch_path, item))
+
+    if scratch_limit is None:
+        row = connection.execute("SELECT value FROM settings WHERE name = 'scratch_limit'").fetchone()
+        return {'connection': connection, 'scratch_path': scratch_path, 'scratch_limit': 0 if row is None else row[0]}
+
+    connection.execute("INSERT OR REPLACE INTO settings VALUES ('scratch_limit', ?)", (scratch_limit,))
+    carrier_cache = {'connection': connection, 'scratch_path': scratch_path, 'scratch_limit': scratch_limit}
+
+    # The limit may be lower than during the previous run
+    removeLeastRecentlyUsedScratch(carrier_cache)
+
+    return carrier_cache
+
+
+def saveCarrierCache(carrier_cache):
+    """
+    Saves all changes made to the carrier cache so far.
+    :param carrier_cache: The open carrier cache (see openCarrierCache).
+    """
+    carrier_cache['connection'].commit()
+
+
+def closeCarrierCache(carrier_cache):
+    """
+    Saves all changes to the carrier cache and closes it.
+    :param carrier_cache: The open carrier cache (see openCarrierCache).
+    """
+    saveCarrierCache(carrier_cache)
+    carrier_cache['connection'].close()
+
+
+def getCarrierInfo(carrier_cache, photo_path):
+    """
+    Gets the description of a carrier, from the cache if the photo has been seen before.
+    :param carrier_cache: The open carrier cache (see openCarrierCache).
+    :param photo_path: The path to the photo.
+    :return: A dictionary describing the carrier (see CarrierFormats.openCarrier).
+    """
+    content_hash = getContentHash(carrier_cache, photo_path)
+    row = carrier_cache['connection'].execute('SELECT mode, width, height, usable_bands FROM carriers WHERE content_hash = ?',
+                                              (content_hash,)).fetchone()
+
+    # The format always follows from the photo's file extension, just like when the photo itself is opened
+    if row is not None:
+        mode, width, height, usable_bands = row
+        return {'format': CarrierFormats.getCarrierFormat(photo_path), 'mode': mode, 'size': (width, height),
+                'usable_bands': usable_bands}
+
+    carrier = CarrierFormats.getCarrierInfo(photo_path)
+    storeCarrierInfo(carrier_cache, content_hash, carrier)
+
+    return carrier
+
+
+def openCarrier(carrier_cache, photo_path):
+    """
+    Gets the decoded samples of a photo, from the scratch folder if they are stored there. Otherwise, the photo is
+    decoded and its samples get stored in the scratch folder (if it is enabled).
+    :param carrier_cache: The open carrier cache (see openCarrierCache).
+    :param photo_path: The path to the photo.
+    :return: A tuple containing the samples of the photo (stored in a bytearray) and a dictionary describing the
+    carrier (see CarrierFormats.openCarrier).
+    """
+    content_hash = getContentHash(carrier_cache, photo_path)
+    connection = carrier_cache['connection']
+    scratch_file = os.path.join(carrier_cache['scratch_path'], content_hash)
+
+    in_scratch = connection.execute('SELECT 1 FROM scratch WHERE content_hash = ?', (content_hash,)).fetchone()
+
+    if in_scratch is not None and os.path.isfile(scratch_file):
+        connection.execute('UPDATE scratch SET last_used = ? WHERE content_hash = ?', (time.time_ns(), content_hash))
+
+        with open(scratch_file, 'rb') as file:
+            samples = bytearray(file.read())
+
+        return (samples, getCarrierInfo(carrier_cache, photo_path))
+
+    samples, carrier = CarrierFormats.openCarrier(photo_path)
+    storeCarrierInfo(carrier_cache, content_hash, carrier)
+
+    if 0 < len(samples) <= carrier_cache['scratch_limit']:
+        with open(scratch_file, 'wb') as file:
+            file.write(samples)
+
+        connection.execute('INSERT OR REPLACE INTO scratch VALUES (?, ?, ?)', (content_hash, len(samples), time.time_ns()))
+        removeLeastRecentlyUsedScratch(carrier_cache)
+
+    return (samples, carrier)
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def getContentHash(carrier_cache, photo_path):
+    """
+    Gets the hash of a photo's file contents, which is only computed if the file is new or has changed since the
+    last time it was hashed.
+    :param carrier_cache: The open carrier cache (see openCarrierCache).
+    :param photo_path: The path to the photo.
+    :return: The BLAKE2b hash of the file contents, as a hexadecimal string.
+    """
+    path = os.path.abspath(photo_path)
+    stat = os.stat(path)
+    connection = carrier_cache['connection']
+
+    row = connection.execute('SELECT size, mtime_ns, content_hash FROM files WHERE path = ?', (path,)).fetchone()
+
+    if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+        return row[2]
+
+    with open(path, 'rb') as file:
+        content_hash = hashlib.file_digest(file, FileDigests.createDigestHash).hexdigest()
+
+    connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)', (path, stat.st_size, stat.st_mtime_ns, content_hash))
+
+    return content_hash
+
+
+def storeCarrierInfo(carrier_cache, content_hash, carrier):
+    """
+    Stores the description of a carrier in the cache.
+    :param carrier_cache: The open carrier cache (see openCarrierCache).
+    :param content_hash: The hash of the photo's file contents.
+    :param carrier: The dictionary describing the carrier (see CarrierFormats.openCarrier).
+    """
+    width, height = carrier['size']
+    carrier_cache['connection'].execute('INSERT OR REPLACE INTO carriers VALUES (?, ?, ?, ?, ?)',
+                                        (content_hash, carrier['mode'], width, height, carrier['usable_bands']))
+
+
+def removeLeastRecentlyUsedScratch(carrier_cache):
+    """
+    Removes decoded photos from the scratch folder, least recently used first, until their total size is within the
+    scratch limit.
+    :param carrier_cache: The open carrier cache (see openCarrierCache).
+    """
+    connection = carrier_cache['connection']
+    total_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM scratch').fetchone()[0]
+
+    if total_size <= carrier_cache['scratch_limit']:
+        return
+
+    for content_hash, size in connection.execute('SELECT content_hash, size FROM scratch ORDER BY last_used').fetchall():
+        if total_size <= carrier_cache['scratch_limit']:
+            break
+
+        scratch_file = os.path.join(carrier_cache['scratch_path'], content_hash)
+        if os.path.isfile(scratch_file):
+            os.remove(scratch_file)
+
+        connection.execute('DELETE FROM scratch WHERE content_hash = ?', (content_hash,))
+        total_size -= size
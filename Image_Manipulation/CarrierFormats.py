@@ -0,0 +1,243 @@
+from PIL import Image
+import os, struct, sys, zlib
+
+
+# A carrier is a photo that data gets hidden in. Carriers are read in their own mode rather than being converted to
+# RGB first, so nothing about the photo changes except the least significant bits of its samples.
+#
+# Supported file formats, along with the options used to save them (all of them lossless)
+CARRIER_FORMATS = {
+    '.png': ('PNG', {}),
+    '.webp': ('WEBP', {'lossless': True, 'exact': True}),
+    '.tif': ('TIFF', {}),
+    '.tiff': ('TIFF', {}),
+}
+
+# Supported modes, each described by a tuple (bands per pixel, bytes per sample, index of the byte within a sample
+# that holds its least significant bit, whether the last band is alpha). Samples are stored the way Image.tobytes
+# returns them.
+CARRIER_MODES = {
+    'L': (1, 1, 0, False),
+    'LA': (2, 1, 0, True),
+    'RGB': (3, 1, 0, False),
+    'RGBA': (4, 1, 0, True),
+    'I;16': (1, 2, 0, False),
+    'I;16B': (1, 2, 1, False),
+    'I': (1, 4, 0 if sys.byteorder == 'little' else 3, False),
+    'RGB;16B': (3, 2, 1, False),
+    'RGBA;16B': (4, 2, 1, True),
+}
+
+# Pillow only decodes 16-bit color PNGs at 8 bits per sample, so these are decoded twice (once for the high bytes
+# and once for the low bytes of every sample) and written by savePNG16 instead
+PNG16_MODES = {'RGB;16B': ('RGB', 'RGB;16L', 2), 'RGBA;16B': ('RGBA', 'RGBA;16L', 6)}
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def isSupportedCarrier(photo_path):
+    """
+    Checks whether a photo is stored in a file format that data can be hidden in.
+    :param photo_path: The path to the photo.
+    :return: True if the photo's file extension belongs to a supported (lossless) format.
+    """
+    return os.path.splitext(photo_path)[1].lower() in CARRIER_FORMATS
+
+
+def getCarrierFormat(photo_path):
+    """
+    Gets the file format a photo is stored in, based on its file extension.
+    :param photo_path: The path to the photo, which must be a supported carrier (see isSupportedCarrier).
+    :return: The name of the file format ('PNG', 'WEBP' or 'TIFF').
+    """
+    return CARRIER_FORMATS[os.path.splitext(photo_path)[1].lower()][0]
+
+
+def getCarrierInfo(photo_path):
+    """
+    Gets the description of a carrier without decoding it. Only the image header is read, unless the photo has an
+    alpha channel, which has to be decoded to check whether it can be used (see getUsableBands).
+    :param photo_path: The path to the photo.
+    :return: A dictionary describing the carrier (see openCarrier).
+    """
+    image, mode = openCarrierImage(photo_path)
+    usable_bands = CARRIER_MODES[mode][0]
+
+    if CARRIER_MODES[mode][3]:
+        usable_bands = getUsableBands(readCarrierSamples(image, mode, photo_path), mode)
+
+    carrier = {
+        'format': getCarrierFormat(photo_path),
+        'mode': mode,
+        'size': image.size,
+        'usable_bands': usable_bands,
+    }
+    image.close()
+
+    return carrier
+
+
+def getChannelCount(carrier):
+    """
+    Gets the number of samples whose least significant bits can hold hidden data.
+    :param carrier: The dictionary describing the carrier (see openCarrier).
+    :return: The number of usable samples in the photo.
+    """
+    width, height = carrier['size']
+
+    return width * height * carrier['usable_bands']
+
+
+def openCarrier(photo_path):
+    """
+    Decodes a photo into its raw samples.
+    :param photo_path: The path to the photo.
+    :return: A tuple containing the samples of the photo (stored in a bytearray) and a dictionary describing the
+    carrier, holding its file format ('format'), mode ('mode', a key of CARRIER_MODES), size ('size') and the number
+    of bands of every pixel that can hold hidden data ('usable_bands').
+    """
+    image, mode = openCarrierImage(photo_path)
+    samples = readCarrierSamples(image, mode, photo_path)
+
+    carrier = {
+        'format': getCarrierFormat(photo_path),
+        'mode': mode,
+        'size': image.size,
+        'usable_bands': getUsableBands(samples, mode),
+    }
+    image.close()
+
+    return (samples, carrier)
+
+
+def saveCarrier(samples, carrier, destination):
+    """
+    Saves the raw samples of a photo in the photo's original file format and mode.
+    :param samples: The samples of the photo, stored in the same layout as returned by openCarrier.
+    :param carrier: The dictionary describing the carrier (see openCarrier).
+    :param destination: The path that the photo will be saved to.
+    """
+    if carrier['mode'] in PNG16_MODES:
+        savePNG16(samples, carrier, destination)
+        return
+
+    file_format, options = CARRIER_FORMATS[os.path.splitext(destination)[1].lower()]
+
+    # A WebP image whose alpha values are all 255 is stored without alpha, but a used alpha channel always holds
+    # at least one zero bit of the photo header, so the alpha channel survives
+    image = Image.frombytes(carrier['mode'], carrier['size'], bytes(samples))
+    image.save(destination, file_format, **options)
+    image.close()
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def openCarrierImage(photo_path):
+    """
+    Opens a photo without decoding it and works out which mode its samples will be read in.
+    :param photo_path: The path to the photo.
+    :return: A tuple containing the opened image and the carrier mode (a key of CARRIER_MODES).
+    """
+    image = Image.open(photo_path)
+
+    if image.format == 'PNG' and len(image.tile) == 1 and image.tile[0][3] in PNG16_MODES:
+        return (image, image.tile[0][3])
+
+    if image.mode in CARRIER_MODES:
+        return (image, image.mode)
+
+    # Any other mode (such as a palette) gets converted, keeping transparency if there is any
+    converted = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    image.close()
+
+    return (converted, converted.mode)
+
+
+def readCarrierSamples(image, mode, photo_path):
+    """
+    Decodes the samples of an opened photo. (Part of openCarrier)
+    :param image: The opened image.
+    :param mode: The carrier mode (a key of CARRIER_MODES).
+    :param photo_path: The path to the photo, used to decode 16-bit color PNGs a second time.
+    :return: The samples of the photo, stored in a bytearray.
+    """
+    if mode not in PNG16_MODES:
+        return bytearray(image.tobytes())
+
+    high_bytes = image.tobytes()
+
+    # Unpacking the big-endian samples as if they were little-endian gives the low byte of every sample
+    low_image = Image.open(photo_path)
+    low_image.tile = [tile[:3] + (PNG16_MODES[mode][1],) for tile in low_image.tile]
+    low_bytes = low_image.tobytes()
+    low_image.close()
+
+    samples = bytearray(len(high_bytes) * 2)
+    samples[0::2] = high_bytes
+    samples[1::2] = low_bytes
+
+    return samples
+
+
+def getUsableBands(samples, mode):
+    """
+    Gets the number of bands of every pixel that can hold hidden data. An alpha channel is only used if every alpha
+    value is (almost) fully opaque, since changing the alpha of a transparent pixel could reveal its hidden color.
+    Changing least significant bits never changes the outcome of this check, so it gives the same answer for a photo
+    before and after data has been hidden in it.
+    :param samples: The samples of the photo.
+    :param mode: The carrier mode (a key of CARRIER_MODES).
+    :return: The number of usable bands, which are always the first bands of each pixel.
+    """
+    bands, sample_size, lsb_index, has_alpha = CARRIER_MODES[mode]
+
+    if not has_alpha:
+        return bands
+
+    pixel_size = bands * sample_size
+    alpha_start = (bands - 1) * sample_size
+
+    for byte_index in range(sample_size):
+        alpha_bytes = samples[alpha_start + byte_index::pixel_size]
+        allowed_values = b'\xfe\xff' if byte_index == lsb_index else b'\xff'
+
+        # Deleting every allowed value leaves nothing behind if the alpha channel is opaque
+        if len(alpha_bytes.translate(None, allowed_values)) > 0:
+            return bands - 1
+
+    return bands
+
+
+def savePNG16(samples, carrier, destination):
+    """
+    Saves the samples of a 16-bit color photo as a PNG image, since Pillow can't save these. Every row is stored
+    unfiltered. (Part of saveCarrier)
+    :param samples: The big-endian 16-bit samples of the photo.
+    :param carrier: The dictionary describing the carrier (see openCarrier).
+    :param destination: The path that the photo will be saved to.
+    """
+    width, height = carrier['size']
+    bands = CARRIER_MODES[carrier['mode']][0]
+    color_type = PNG16_MODES[carrier['mode']][2]
+    row_size = width * bands * 2
+
+    rows = b''.join(b'\x00' + samples[start:start + row_size] for start in range(0, len(samples), row_size))
+
+    with open(destination, 'wb') as file:
+        file.write(PNG_SIGNATURE)
+        file.write(createPNGChunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 16, color_type, 0, 0, 0)))
+        file.write(createPNGChunk(b'IDAT', zlib.compress(rows)))
+        file.write(createPNGChunk(b'IEND', b''))
+
+
+def createPNGChunk(chunk_type, chunk_data):
+    """
+    Creates a single PNG chunk. (Part of savePNG16)
+    :param chunk_type: The 4 byte type of the chunk.
+    :param chunk_data: The contents of the chunk.
+    :return: The chunk in byte format (length, type, contents and CRC32).
+    """
+    return struct.pack('>I', len(chunk_data)) + chunk_type + chunk_data + struct.pack('>I', zlib.crc32(chunk_type + chunk_data))
@@ -0,0 +1,85 @@
+from Image_Manipulation import CarrierCache, CarrierFormats
+
+
+# Lookup tables used with bytes.translate so that whole runs of channel values can be processed at C speed
+LSB_TABLE = bytes(value & 1 for value in range(256))
+CLEAR_LSB_TABLE = bytes(value & 0xFE for value in range(256))
+
+
+def openChannelBuffer(photo_path, carrier_cache=None):
+    """
+    Opens a photo and returns all of its usable channel values as one flat buffer (see CarrierFormats). Channel n of
+    the buffer is usable band (n % b) of pixel n // b, where b is the number of usable bands, with pixels ordered row
+    by row. For samples wider than 8 bits, only the byte holding the least significant bit is part of the buffer.
+    :param photo_path: The path to the photo that will be opened.
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), which may already hold the
+    photo's decoded samples, or None to always decode the photo.
+    :return: A tuple containing the channel values (stored in a bytearray) and the dictionary describing the carrier
+    (see CarrierFormats.openCarrier), which also holds all samples of the photo ('samples').
+    """
+    if carrier_cache is not None:
+        samples, carrier = CarrierCache.openCarrier(carrier_cache, photo_path)
+    else:
+        samples, carrier = CarrierFormats.openCarrier(photo_path)
+    bands, sample_size, lsb_index, has_alpha = CarrierFormats.CARRIER_MODES[carrier['mode']]
+    usable_bands = carrier['usable_bands']
+
+    carrier['samples'] = samples
+
+    # When every byte of every sample is usable, the samples are used as the buffer directly
+    if usable_bands == bands and sample_size == 1:
+        return (samples, carrier)
+
+    pixel_size = bands * sample_size
+    channels = bytearray(len(samples) // pixel_size * usable_bands)
+
+    for band in range(usable_bands):
+        channels[band::usable_bands] = samples[band * sample_size + lsb_index::pixel_size]
+
+    return (channels, carrier)
+
+
+def saveChannelBuffer(channels, carrier, destination):
+    """
+    Saves a flat buffer of channel values as a photo in the same format and mode as the photo it was opened from.
+    :param channels: The channel values of the photo, stored in the same layout as returned by openChannelBuffer.
+    :param carrier: The dictionary describing the carrier, as returned by openChannelBuffer.
+    :param destination: The path that the photo will be saved to.
+    """
+    samples = carrier['samples']
+    bands, sample_size, lsb_index, has_alpha = CarrierFormats.CARRIER_MODES[carrier['mode']]
+    usable_bands = carrier['usable_bands']
+
+    if channels is not samples:
+        pixel_size = bands * sample_size
+        for band in range(usable_bands):
+            samples[band * sample_size + lsb_index::pixel_size] = channels[band::usable_bands]
+
+    CarrierFormats.saveCarrier(samples, carrier, destination)
+
+
+def readLSBs(channels, start, length):
+    """
+    Reads the least significant bits of a run of channel values.
+    :param channels: The channel values of the photo.
+    :param start: The index of the first channel value to read.
+    :param length: The number of channel values to read.
+    :return: The least significant bits, stored as zeroes and ones in a bytearray.
+    """
+    return bytearray(channels[start:start + length].translate(LSB_TABLE))
+
+
+def writeLSBs(channels, start, bits):
+    """
+    Overwrites the least significant bits of a run of channel values with the given bits.
+    :param channels: The channel values of the photo. This bytearray is modified in place.
+    :param start: The index of the first channel value to overwrite.
+    :param bits: The bits to store, as zeroes and ones in a bytearray.
+    """
+    length = len(bits)
+    cleared = channels[start:start + length].translate(CLEAR_LSB_TABLE)
+
+    # Every cleared value ends in a zero bit and every bit is a zero or one, so a single big integer OR sets each
+    # least significant bit without any carries between neighbouring channel values
+    merged = int.from_bytes(cleared, 'big') | int.from_bytes(bits, 'big')
+    channels[start:start + length] = merged.to_bytes(length, 'big')
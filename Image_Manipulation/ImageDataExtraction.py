@@ -1,22 +1,50 @@
-from Data_Converters import ByteDataToDirectory, DecimalBitConverters, BinaryByteConverters, Miscellaneous_Helpers
-from PIL import Image
-import pickle, os, sys, math, shutil
+from Data_Converters import ByteDataToDirectory, BinaryByteConverters, JobJournal, Miscellaneous_Helpers, OutputStaging, PassphraseKeys
+from Image_Manipulation import CarrierFormats, ChannelBuffers, PhotoHeaders, LegacyImageDataExtraction
+from collections import Counter
+import os, sys
 
 
-def extractDataFromImages(processed_photos, path_to_paste_data):
+def extractDataFromImages(processed_photos, path_to_paste_data, allow_legacy_pickle=False, passphrase=None, resume=False):
     """
     Extracts all hidden data from a given set of images and reconstructs the data back to its original form.
     :param processed_photos: Path to the folder containing all photos which contain hidden data.
     :param path_to_paste_data: Path to the folder where the hidden data will be reconstructed and stored.
+    :param allow_legacy_pickle: Whether data hidden by older versions of this program (stored with pickle) may be
+    loaded. Loading pickle data can run arbitrary code, so this must only be allowed for photos that are trusted.
+    :param passphrase: The passphrase the data was hidden with, or None if it was hidden without one.
+    :param resume: Whether to continue an interrupted session that was extracting data from the same photos, reusing
+    the data it already read from each photo and the files it already wrote (see JobJournal).
     """
-    # Any previously extracted data will get removed before adding the newly extracted data
-    Miscellaneous_Helpers.removePreviouslyExtractedData(path_to_paste_data)
-    
-    photo_dict = createPhotoDictionary(processed_photos)
-    bits = getAllBinaryDataFromPhotos(photo_dict)
-    
-    byte_data_list = BinaryByteConverters.convertFullBinaryToByteDataList(bits)
-    ByteDataToDirectory.createDirectoryFromByteData(path_to_paste_data, byte_data_list)
+    photo_paths = getPhotoPaths(processed_photos)
+
+    # Photos are recognized by their size and modification time, just like in the carrier cache
+    photo_descriptions = []
+    for photo_path in photo_paths:
+        stat = os.stat(photo_path)
+        photo_descriptions.append([os.path.basename(photo_path), stat.st_size, stat.st_mtime_ns])
+
+    # Previously extracted data is only replaced once all of the newly extracted data has been written. The journal
+    # next to the staging folder keeps the data read from every photo, until the extracted files have all been written.
+    journal = JobJournal.openJobJournal(path_to_paste_data, {'mode': 'extract', 'photos': photo_descriptions}, resume)
+    path_to_staged_data = OutputStaging.openStagingFolder(path_to_paste_data, keep_contents=journal['resumed'])
+
+    photo_payloads = []
+    for photo_path in photo_paths:
+        photo_payloads.append(readJournaledPhotoPayload(journal, photo_path, passphrase))
+
+    # Photos processed with the legacy format don't have a header and are handled separately
+    if all(payload['header'] is None for payload in photo_payloads):
+        byte_data = BinaryByteConverters.convertBinaryByteArrayToBytes(LegacyImageDataExtraction.getBitsFromLegacyPhotos(processed_photos))
+        byte_data_list = BinaryByteConverters.convertLegacyBytesToByteDataList(byte_data, allow_legacy_pickle)
+    else:
+        bits = decryptPayloadBits(assembleBitsFromPhotoPayloads(photo_payloads), photo_payloads, passphrase)
+        byte_data_list = BinaryByteConverters.convertFullBinaryToByteDataList(bits, allow_legacy_pickle)
+
+    # Files written by an interrupted session are kept if their contents are already correct
+    ByteDataToDirectory.createDirectoryFromByteData(path_to_staged_data, byte_data_list, reuse_existing=journal['resumed'])
+
+    JobJournal.closeJobJournal(journal)
+    OutputStaging.commitStagingFolder(path_to_staged_data, path_to_paste_data)
 
     print("Success! The data from the image set has been extracted and can now be viewed. (100% complete)")
 
@@ -26,340 +54,375 @@ def extractDataFromImages(processed_photos, path_to_paste_data):
 # ********************************************************************
 
 
-def getAllBinaryDataFromPhotos(photo_dict):
+def getPhotoPaths(processed_photos):
     """
-    Extracts all the binary data hidden inside a given set of photos.
-    :param photo_dict: A dictionary of photos, where the key is the photo's identifier number and the value
-    is the name of the path to the photo.
-    :return: All of the extracted hidden data represented as a string of bits.
+    Gets the paths to all photos inside the folder of processed photos, after finishing a swap of the folder that was
+    interrupted and removing any hidden files from it.
+    :param processed_photos: The path to the folder containing the processed photos which have data hidden in them.
+    :return: A sorted list of the paths to all photos inside the folder.
     """
-    bits = bytearray()
-    total_bit_data_size = getTotalBitsNumDataSize(photo_dict[0], 4 + Miscellaneous_Helpers.getNumBitsToReserve(getImageNum(photo_dict[0])))
+    # A previous hiding session may have been interrupted while replacing the processed photos
+    OutputStaging.recoverInterruptedSwap(processed_photos)
 
-    # Extract all hidden data from all images
-    for i in range(len(photo_dict)):
-        bits += extractDataFromImage(photo_dict[i], len(bits), total_bit_data_size)
-    
-    if len(bits) != total_bit_data_size:
-        print("Error - Unable to process photo(s) as it may be prone to errors")
-        sys.exit(1)
+    if os.path.isdir(processed_photos):
+        Miscellaneous_Helpers.removePotentialHiddenFiles(processed_photos)
 
-    return bits
+    return listPhotoPaths(processed_photos)
 
 
-def getStartBitsDataLength(image_path):
+def listPhotoPaths(processed_photos):
     """
-    Gets the total number of reserve bits that are present in a given photo.
-    :param image_path: The path to the current image containing a certain number of reserve bits.
-    :return: The total number of reserve bits present in the given image.
+    Gets the paths to all photos inside the folder of processed photos without changing anything on disk, for
+    commands that only read the photos. Hidden files are skipped rather than removed, and if a swap of the folder was
+    interrupted, the photos are read from wherever the swap left them.
+    :param processed_photos: The path to the folder containing the processed photos which have data hidden in them.
+    :return: A sorted list of the paths to all photos inside the folder.
     """
-    image_num = getImageNum(image_path)
-    image_num_data_length = 4 + Miscellaneous_Helpers.getNumBitsToReserve(image_num)
+    folder_path = OutputStaging.getCurrentOutputPath(processed_photos)
+
+    # Path must lead to a folder
+    if not os.path.isdir(folder_path):
+        print("Error - Specified path to folder containing processed photos does not lead to a folder.")
+        sys.exit(1)
 
-    # All additional photos after the first photo only store the image number data as their precursor
-    if image_num != 0:
-        return image_num_data_length
-    
-    stored_bit_data_size = getTotalBitsNumDataSize(image_path, image_num_data_length)
+    photo_paths = []
+    for photo in sorted(os.listdir(folder_path)):
+        if Miscellaneous_Helpers.isPotentialHiddenFile(photo):
+            continue
 
-    return image_num_data_length + 6 + Miscellaneous_Helpers.getNumBitsToReserve(stored_bit_data_size)
+        # Photos hidden in a batch are stored in one folder per group (see BatchDataHiding)
+        if os.path.isdir(os.path.join(folder_path, photo)):
+            print("Error - The processed photos are split into groups by a batch (such as '" + photo + "').")
+            print("Run again with --group NAME to use the photos of a single group.")
+            sys.exit(1)
 
+        # Check to make sure only compatible image types being processed
+        if not CarrierFormats.isSupportedCarrier(photo):
+            print("Error - Only png, webp and tiff images are allowed for extraction.")
+            sys.exit(1)
+
+        photo_paths.append(os.path.join(folder_path, photo))
+
+    # There must exist at least one photo
+    if len(photo_paths) == 0:
+        print("Error - You do not have any processed photos listed.")
+        sys.exit(1)
 
-def iterateOverBitImageVals(length, i, w, h, image, photo_path):
+    return photo_paths
+
+
+def readPhotoPayload(photo_path, passphrase=None):
     """
-    Iterates over a specified number of bits inside the image. No pixel values are changed and no data is extracted.
-    :param length: The number of bits to iterate through (number of RGB pixel values)
-    :param i: The current index value, representing the number of bits that have currently been gone over so far in
-    the given image.
-    :param w: The current image pixel width value being looked at.
-    :param h: The current image pixel height value being looked at.
-    :param image: The image object containing all the pixel data of the current image.
-    :param photo_path: The path to the photo whose pixel values are being iterated over.
-    :return: The updated values of i, w, and h.
+    Reads the header and the slice of hidden data stored in a single photo, and checks both against the checksum
+    stored in the header.
+    :param photo_path: The path to the photo containing hidden data.
+    :param passphrase: The passphrase the data was hidden with, or None if it was hidden without one.
+    :return: A dictionary containing the photo path ('photo_path'), its header values ('header'), the slice of hidden
+    data stored as a bytearray of bits ('bits') and whether the header and slice match the checksum ('checksum_matches').
+    The header and bits are None if the photo doesn't contain a valid header.
     """
-    width, height = image.size
-
-    for j in range(length):
-        if w >= width:
-            w = 0
-            h += 1
-            if h >= height:
-                print("Error - Invalid image for data extraction.")
-                print("Image " + str(os.path.basename(photo_path)) + " is too small and therefore could've never stored any data in the first place.")
-                image.close()
-                sys.exit(1)
-
-        i += 1
-    
-        # The RGB values for the current pixel have all been gone through and it's now time for the next pixel
-        if i % 3 == 0:
-            w += 1
-    
-    return (i, w, h)
-
-
-def getPixelVals(length, extracted_bits, i, w, h, image, photo_path):
+    channels, carrier = ChannelBuffers.openChannelBuffer(photo_path)
+    header = PhotoHeaders.readPhotoHeader(channels)
+
+    if header is None:
+        return {'photo_path': photo_path, 'header': None, 'bits': None, 'checksum_matches': False}
+
+    # With matrix embedding, the slice takes up more channel values than it has bits
+    channel_count = header['slice_bits']
+    if header['matrix_bits'] > 0:
+        # Only imported with matrix embedding, since it depends on numpy
+        from Image_Manipulation import MatrixEmbedding
+
+        channel_count = MatrixEmbedding.getMatrixChannelCount(header['slice_bits'], header['matrix_bits'])
+
+    # The header must describe a slice that actually fits inside of the photo
+    if header['header_bits'] + channel_count > len(channels):
+        return {'photo_path': photo_path, 'header': None, 'bits': None, 'checksum_matches': False}
+
+    if header['flags'] & PhotoHeaders.FLAG_KEYED:
+        checkPassphraseGiven(passphrase, photo_path)
+
+        # Only imported in keyed mode, since it depends on numpy
+        from Image_Manipulation import KeyedPermutation
+
+        permutation_key = PassphraseKeys.deriveSubkey(header, passphrase, b'permutation')
+        bits = KeyedPermutation.readKeyedLSBs(channels, permutation_key, header['photo_ID'], header['header_bits'], channel_count)
+    else:
+        bits = ChannelBuffers.readLSBs(channels, header['header_bits'], channel_count)
+
+    if header['matrix_bits'] > 0:
+        bits = MatrixEmbedding.extractMatrixBits(bits, header['slice_bits'], header['matrix_bits'])
+
+    checksum_matches = PhotoHeaders.computeChecksum(bits, header) == header['checksum']
+
+    return {'photo_path': photo_path, 'header': header, 'bits': bits, 'checksum_matches': checksum_matches}
+
+
+def readJournaledPhotoPayload(journal, photo_path, passphrase=None):
     """
-    Gets all of the image pixel least significant bit values within a specified range (i to i + length - 1)
-    :param length: The number of pixel value bits to extract from the given image.
-    :param extracted_bits: All hidden bits get extracted and stored in this data structure (a list of 0's and 1's)
-    :param i: The current index value, representing the number of bits that have currently been gone over so far in
-    the given image.
-    :param w: The current image pixel width value being looked at.
-    :param h: The current image pixel height value being looked at.
-    :param image: The image object containing all the pixel data of the current image.
-    :param photo_path: The path to the photo whose pixel lsb values are being extracted and stored.
-    :return: The updated values of i, w, and h.
+    Reads the payload of a single photo (see readPhotoPayload), reusing the one stored by an interrupted session if
+    there is one. Every intact payload that gets read is stored in the journal as a checkpoint.
+    :param journal: The open job journal (see JobJournal.openJobJournal).
+    :param photo_path: The path to the photo containing hidden data.
+    :param passphrase: The passphrase the data was hidden with, or None if it was hidden without one.
+    :return: The payload of the photo (see readPhotoPayload).
     """
-    width, height = image.size
-
-    for j in range(length):
-        if w >= width:
-            w = 0
-            h += 1
-            if h >= height:
-                print("Error - Invalid image for data extraction.")
-                print("Image " + str(os.path.basename(photo_path)) + " is too small and therefore could've never stored any data in the first place.")
-                image.close()
-                sys.exit(1)
-        
-        rgb = image.getpixel((w, h))
-        extracted_bits.append(rgb[i%3] % 2)
-
-        i += 1
-    
-        if i % 3 == 0:
-            w += 1
-    
-    return (i, w, h)
-
-
-def getTotalBitsNumDataSize(image_path, precursor_bit_length):
+    photo = os.path.basename(photo_path)
+    checkpoint_path = JobJournal.getCheckpointPath(journal, photo + '.slice')
+    record = JobJournal.getJournalStep(journal, photo)
+
+    if record is not None and JobJournal.isOutputUnchanged(checkpoint_path, record['output']):
+        print("Reusing the data extracted from photo " + photo + " by the interrupted session")
+
+        with open(checkpoint_path, 'rb') as file:
+            bits = BinaryByteConverters.convertBytesToBinaryByteArray(file.read())[:record['header']['slice_bits']]
+
+        return {'photo_path': photo_path, 'header': record['header'], 'bits': bits, 'checksum_matches': True}
+
+    print("Currently extracting data from photo " + photo)
+    payload = readPhotoPayload(photo_path, passphrase)
+
+    # Only intact payloads are worth keeping, since a damaged one has to be read again anyway
+    if payload['header'] is not None and payload['checksum_matches']:
+        # The slice is padded to whole bytes, and cut back to its length when it's reused
+        bits = payload['bits']
+        with open(checkpoint_path, 'wb') as file:
+            file.write(BinaryByteConverters.convertBinaryByteArrayToBytes(bits + bytearray(-len(bits) % 8)))
+
+        OutputStaging.syncFile(checkpoint_path)
+        JobJournal.recordJournalStep(journal, photo, {'header': payload['header'], 'output': JobJournal.getOutputDescription(checkpoint_path)})
+
+    return payload
+
+
+def checkPassphraseGiven(passphrase, photo_path):
     """
-    Gets the number of bits reserved for storing the total number of bits of data that has been hidden (Stored num only in first image)
-    :param image_path: The path to the image containing the number of bits of data that has been hidden.
-    :param precursor_bit_length: The number of image pixel value bits that need to be iterated over before we get to the bits in the
-    image used to store the value we are looking for.
-    :return: The total number of bits that have been hidden in a photo set (which we have found, hidden in our given image).
+    Stops the program if a photo that was processed with a passphrase is read without one.
+    :param passphrase: The passphrase that was entered, or None.
+    :param photo_path: The path to the photo that needs the passphrase.
     """
-    # Only the image that has image number 0 can be inputted into this function
-    if getImageNum(image_path) != 0:
-        print("Error - Image " + str(os.path.basename(image_path)) + " is an invalid image for extracting total number of bits.")
+    if passphrase is None:
+        print("Error - Photo '" + os.path.basename(photo_path) + "' was processed with a passphrase.")
+        print("Run again with --keyed to enter it.")
         sys.exit(1)
 
-    image = Image.open(image_path)
-
-    # Convert the image to RGB color mode if needed
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-    
-    width, height = image.size
-    
-    w = 0
-    h = 0
-
-    i = 0
-
-    # Iterate over starting bit values in image containing image num data since we will currently not be dealing with this
-    i, w, h = iterateOverBitImageVals(precursor_bit_length, i, w, h, image, image_path)
-    
-    # Obtaining the length (of the) length in bits of the total number of bits that are hidden
-    b_total_size_length = bytearray()
-    i, w, h = getPixelVals(6, b_total_size_length, i, w, h, image, image_path)
-    total_size_length = 1 + DecimalBitConverters.convertBitsToDecimal(b_total_size_length)
-    
-    # Obtaining the length in bits of the total number of bits that are hidden
-    b_bit_data_size = bytearray()
-    i, w, h = getPixelVals(total_size_length, b_bit_data_size, i, w, h, image, image_path)
-    
-    return DecimalBitConverters.convertBitsToDecimal(b_bit_data_size)
-
-
-def createPhotoDictionary(processed_photos):
+
+def decryptPayloadBits(bits, photo_payloads, passphrase):
     """
-    Creates a dictionary of photos, where the keys are the extracted unique image identifier numbers that are mapped to their 
-    corresponding photos.
-    :param processed_photos: The path to the folder containing the processed photos which have data hidden in them.
-    :return: The newly created dictionary of photos with their corresponding identifier numbers (keys). Note that in order to
-    be valid, all keys must be a unique number from 0 to n - 1, where n is the total number of photos containing the hidden data.
+    Decrypts the hidden data of a photo set that was hidden with encryption (see PayloadEncryption). Data that
+    isn't encrypted is returned unchanged.
+    :param bits: The hidden data of the set (see assembleBitsFromPhotoPayloads).
+    :param photo_payloads: The payloads of all photos in the set (see readPhotoPayload).
+    :param passphrase: The passphrase the data was hidden with, or None.
+    :return: The decrypted hidden data represented as a bytearray of bits.
     """
-    photo_dict = {}
+    intact_payload = getIntactPhotoPayloads(photo_payloads)[0]
+    header = intact_payload['header']
 
-    Miscellaneous_Helpers.removePotentialHiddenFiles(processed_photos)
+    if not header['flags'] & PhotoHeaders.FLAG_ENCRYPTED:
+        return bits
 
-    # Fill the dictionary with the photos and their corresponding identifier numbers
-    for photo in os.listdir(processed_photos):
-        # Check to make sure only compatible image types being processed
-        if not photo.lower().endswith('.png'):
-            print("Error - Only png images are allowed for extraction.")
-            sys.exit(1)
+    checkPassphraseGiven(passphrase, intact_payload['photo_path'])
 
-        photo_path = os.path.join(processed_photos, photo)
-        current_num = getImageNum(photo_path)
+    # Only imported for encrypted sets, since it depends on the cryptography package
+    from Data_Converters import PayloadEncryption
 
-        # Multiple separate photos cannot contain the same identifier number
-        if current_num in photo_dict:
-            print("Error - Invalid set of photos for extraction.")
-            print("Photos '" + str(os.path.basename(photo_dict[current_num])) + "' and '" + photo + "' contain the same identifier number.")
-            sys.exit(1)
+    encryption_key = PassphraseKeys.deriveSubkey(header, passphrase, b'encryption')
+    byte_data = PayloadEncryption.decryptPayload(BinaryByteConverters.convertBinaryByteArrayToBytes(bits), encryption_key)
 
-        photo_dict[current_num] = photo_path
+    return BinaryByteConverters.convertBytesToBinaryByteArray(byte_data)
 
-    nums = fillListWithNumbersFromZeroToMax(len(photo_dict) - 1)
-    
-    # Check that all photo identifier numbers are within proper range (0 to n - 1, where n is the number of photos to process)
-    for key in photo_dict:
-        if not key in nums:
-            print("Error - Invalid set of photos for extraction.")
-            print("Photo number for '" + str(os.path.basename(photo_dict[key])) + "' is not in range, given the current set of photos for extraction.")
-            sys.exit(1)
-        
-        nums.remove(key)
-    
-    return photo_dict
 
+def getSetDescription(header):
+    """
+    Gets the header values that every photo of the same photo set must agree on.
+    :param header: The header values of a photo (see PhotoHeaders.readPhotoHeader).
+    :return: A tuple of the header values describing the photo set.
+    """
+    return (header['flags'], header['photo_count'], header['parity_count'], header['total_bits'], bytes(header['salt']),
+            header['matrix_bits'], header['set_ID'])
 
-def fillListWithNumbersFromZeroToMax(max):
+
+def getMainSetDescription(photo_payloads):
     """
-    Fills a list with integers from zero to max (size = max + 1)
-    :param max: The largest (and last) integer value to be stored in the list.
-    :return: The list containing integers zero to max.
+    Finds the photo set that most of the intact photos (those with a header that matches their checksum) belong to.
+    Intact photos of any other set are treated just like lost photos, so a stray photo (or one whose header was
+    altered without its checksum failing, which older headers allow) can't spoil a set that is otherwise complete.
+    :param photo_payloads: The payloads of all photos in the set (see readPhotoPayload).
+    :return: The set description (see getSetDescription) shared by the most intact photos, or None if there are no
+    intact photos or two sets are tied for the most.
     """
-    aList = []
-    for i in range(max + 1):
-        aList.append(i)
-    
-    return aList
+    set_counts = Counter(getSetDescription(payload['header']) for payload in photo_payloads
+                         if payload['header'] is not None and payload['checksum_matches'])
+    most_common = set_counts.most_common(2)
+
+    if len(most_common) == 0 or (len(most_common) == 2 and most_common[0][1] == most_common[1][1]):
+        return None
+
+    return most_common[0][0]
 
 
-def getMainDataFromPixels(bits, i, w, h, image, current_num_extracted, total_bits):
+def getIntactPhotoPayloads(photo_payloads):
     """
-    Extracts all hidden data that will later be reconstructed.
-    :param bits: Our bytearray data structure which stores all extracted bits.
-    :param i: The current index value, representing the number of bits that have currently been gone over so far in
-    the given image.
-    :param w: The current image pixel width value being looked at.
-    :param h: The current image pixel height value being looked at.
-    :param image: The image object containing all the pixel data of the current image.
-    :param current_num_extracted: The current number of bits that have so far been extracted from any potential
-    previous images (not including reserve bits).
-    :param total_bits: The total number of bits of data that have been hidden (In all images). This way we know 
-    when to stop extracting least significant bit values.
-    :return: The updated current number of bits that have been extracted.
+    Gets the payloads of all photos that have a header, whose header and hidden data match its checksum, and that
+    belong to the main photo set (see getMainSetDescription).
+    :param photo_payloads: The payloads of all photos in the set (see readPhotoPayload).
+    :return: The intact payloads, sorted by photo ID, with at most one payload per photo ID.
     """
-    width, height = image.size
-
-    # Go through potential remaining G/B values in current pixel to start with fresh new pixel
-    while i % 3 != 0:
-        rgb = image.getpixel((w, h))
-        bits.append(rgb[i%3] % 2)
-        
-        i += 1
-        current_num_extracted += 1
-         
-        # All data hidden in image(s) has been read, meaning any future remaining pixels do not need to be explored since they never got modified.
-        if current_num_extracted == total_bits:
-            image.close()
-            return current_num_extracted
-    
-    w += 1
-
-    for h in range(h, height):
-        for w in range(w, width):
-            for j in range(3):
-                rgb = image.getpixel((w, h))
-                bits.append(rgb[i%3] % 2)
-                
-                i += 1
-                current_num_extracted += 1
-
-                # All data hidden in image(s) has been read
-                if current_num_extracted == total_bits:
-                    image.close()
-                    return current_num_extracted
-        w = 0
-    
-    return current_num_extracted
-
-
-def extractDataFromImage(image_path, current_num_bits_extracted, total_bit_data_size):
+    intact_payloads = {}
+    set_description = getMainSetDescription(photo_payloads)
+
+    for payload in photo_payloads:
+        if payload['header'] is not None and payload['checksum_matches'] and getSetDescription(payload['header']) == set_description:
+            intact_payloads.setdefault(payload['header']['photo_ID'], payload)
+
+    return [intact_payloads[photo_ID] for photo_ID in sorted(intact_payloads)]
+
+
+def findPhotoSetErrors(photo_payloads):
     """
-    Extracts all hidden data from a given image.
-    :param image_path: The path to the image containing hidden data that will be extracted.
-    :param current_num_bits_extracted: The current number of bits of data that have so far been 
-    extracted from any potential previous images.
-    :param total_bit_data_size: The total number of bits of data that have been hidden in an image
-    set. This same number of bits needs to be extracted from all photos.
-    :return: The updated bytearray data structure storing all extracted bits.
+    Checks that a set of photo payloads forms one complete, uncorrupted photo set.
+    :param photo_payloads: The payloads of all photos in the set (see readPhotoPayload).
+    :return: A list of error messages, each one naming the photo it applies to. The list is empty if the set is valid.
     """
-    try:
-        print("Currently extracting data from photo " + str(os.path.basename(image_path)), end="")
-        print("  (" + str((current_num_bits_extracted * 1000 // total_bit_data_size) / 10) + "% complete)")
-    except ZeroDivisionError as e:
-        print("\nError - Invalid Photo")
-        sys.exit(1)
+    errors = []
+    photo_dict = {}
+    set_description = getMainSetDescription(photo_payloads)
 
-    bits = bytearray()
-    precursor_bit_length = getStartBitsDataLength(image_path)
+    for payload in photo_payloads:
+        photo = os.path.basename(payload['photo_path'])
+        header = payload['header']
+
+        if header is None:
+            errors.append("Photo '" + photo + "' does not contain a valid header.")
+            continue
+
+        if not payload['checksum_matches']:
+            if header['flags'] & PhotoHeaders.FLAG_KEYED:
+                errors.append("Photo '" + photo + "' has been altered or the passphrase is wrong (its header or hidden data does not match its checksum).")
+            else:
+                errors.append("Photo '" + photo + "' has been altered (its header or hidden data does not match its checksum).")
+            continue
+
+        # Intact photos that most of the others don't agree with belong to a different photo set
+        if set_description is not None and getSetDescription(header) != set_description:
+            errors.append("Photo '" + photo + "' does not belong to the same photo set as the other photos.")
+            continue
+
+        # Multiple separate photos cannot contain the same identifier number
+        if header['photo_ID'] in photo_dict:
+            errors.append("Photos '" + photo_dict[header['photo_ID']] + "' and '" + photo + "' contain the same identifier number.")
+            continue
+
+        photo_dict[header['photo_ID']] = photo
+
+    # The headers of altered photos can't be trusted, so only intact photos describe the set
+    headers = [payload['header'] for payload in getIntactPhotoPayloads(photo_payloads)]
+    if len(headers) == 0:
+        return errors
+
+    # Just as many intact photos belong to another set, so neither can be told apart from the stray photos
+    if set_description is None:
+        errors.append("The photos do not all belong to the same photo set.")
+        return errors
+
+    photo_count = headers[0]['photo_count']
+
+    for photo_ID in range(photo_count):
+        if photo_ID not in photo_dict:
+            errors.append("Photo number " + str(photo_ID) + " of " + str(photo_count) + " is missing or unreadable.")
+
+    for photo_ID in photo_dict:
+        if photo_ID >= photo_count:
+            errors.append("Photo number for '" + photo_dict[photo_ID] + "' is not in range, given the current set of photos.")
 
-    image = Image.open(image_path)
+    return errors
 
-    # Convert the image to RGB color mode if needed
-    if image.mode != "RGB":
-        image = image.convert("RGB")
 
-    width, height = image.size
+def canRebuildFromParity(photo_payloads):
+    """
+    Checks whether the hidden data of a photo set that has lost or altered photos can still be rebuilt from its
+    parity photos.
+    :param photo_payloads: The payloads of all photos in the set (see readPhotoPayload).
+    :return: True if the set uses parity photos and enough of its photos are intact.
+    """
+    intact_payloads = getIntactPhotoPayloads(photo_payloads)
 
-    w = 0
-    h = 0
+    if len(intact_payloads) == 0 or getMainSetDescription(photo_payloads) is None:
+        return False
 
-    i = 0
+    header = intact_payloads[0]['header']
+    if not header['flags'] & PhotoHeaders.FLAG_PARITY or intact_payloads[-1]['header']['photo_ID'] >= header['photo_count']:
+        return False
 
-    # Iterate over starting bit values in image containing image num data (and data size if first image)
-    i, w, h = iterateOverBitImageVals(precursor_bit_length, i, w, h, image, image_path) 
-    
-    # Extract the main data that will later be reconstructed from the remaining pixels
-    current_num_bits_extracted = getMainDataFromPixels(bits, i, w, h, image, current_num_bits_extracted, total_bit_data_size)
+    return len(intact_payloads) >= header['photo_count'] - header['parity_count']
 
-    # Future bits in the image have been explored when they shouldn't have
-    if current_num_bits_extracted > total_bit_data_size:
-        print("Error in extracting data from photo " + str(os.path.basename(image_path)))
+
+def assembleBitsFromPhotoPayloads(photo_payloads, report_warnings=True):
+    """
+    Puts the slices of hidden data from every photo of a set back together, in photo ID order. Sets with parity
+    photos are rebuilt from whichever photos are intact.
+    :param photo_payloads: The payloads of all photos in the set (see readPhotoPayload).
+    :param report_warnings: Whether to print the problems of a set that is being rebuilt from its parity photos.
+    :return: All of the extracted hidden data represented as a bytearray of bits.
+    """
+    errors = findPhotoSetErrors(photo_payloads)
+
+    if len(errors) > 0:
+        if not canRebuildFromParity(photo_payloads):
+            print("Error - Invalid set of photos for extraction.")
+            for error in errors:
+                print("-> " + error)
+            sys.exit(1)
+
+        if report_warnings:
+            print("Warning - Some photos are missing or altered, but the data will be rebuilt from the parity photos.")
+            for error in errors:
+                print("-> " + error)
+
+    intact_payloads = getIntactPhotoPayloads(photo_payloads)
+
+    if intact_payloads[0]['header']['flags'] & PhotoHeaders.FLAG_PARITY:
+        return assembleBitsFromParityPhotoPayloads(intact_payloads)
+
+    bits = bytearray()
+
+    for payload in intact_payloads:
+        # Each slice must continue exactly where the previous one ended
+        if payload['header']['slice_offset'] != len(bits):
+            print("Error - Unable to process photo(s) as it may be prone to errors")
+            sys.exit(1)
+
+        bits += payload['bits']
+
+    if len(bits) != intact_payloads[0]['header']['total_bits']:
+        print("Error - Unable to process photo(s) as it may be prone to errors")
         sys.exit(1)
-    
-    image.close()
 
     return bits
 
 
-def getImageNum(photo_path):
+def assembleBitsFromParityPhotoPayloads(intact_payloads):
     """
-    Obtains the image identifier number hidden in an image.
-    :param photo_path: The path to the image containing an identifier number we wish toi extract.
-    :return: The hidden image identifier number from the given image.
+    Rebuilds the hidden data of a photo set with parity photos (see ErasureCoding).
+    :param intact_payloads: The payloads of all intact photos in the set (see getIntactPhotoPayloads).
+    :return: All of the extracted hidden data represented as a bytearray of bits.
     """
-    image = Image.open(photo_path)
-
-    # Convert the image to RGB color mode if needed
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-    
-    width, height = image.size
-
-    w = 0
-    h = 0
-
-    i = 0
-
-    # Extract the length, in bits, of the current photo ID number
-    b_ID_length = bytearray()
-    i, w, h = getPixelVals(4, b_ID_length, i, w, h, image, photo_path)
-    ID_length = 1 + DecimalBitConverters.convertBitsToDecimal(b_ID_length)
-
-    # Extract the actual photo ID num
-    b_photo_num = bytearray()
-    i, w, h = getPixelVals(ID_length, b_photo_num, i, w, h, image, photo_path)
-    
-    image.close()
-    
-    return DecimalBitConverters.convertBitsToDecimal(b_photo_num)
-        
+    # Only imported for sets with parity photos, since it depends on numpy
+    from Data_Converters import ErasureCoding
+
+    header = intact_payloads[0]['header']
+    data_photos = header['photo_count'] - header['parity_count']
+
+    shards = {}
+    for payload in intact_payloads:
+        shards[payload['header']['photo_ID']] = BinaryByteConverters.convertBinaryByteArrayToBytes(payload['bits'])
+
+    # Every shard has the same length, so a photo holding a differently sized slice can't be part of this set
+    if len(set(len(shard) for shard in shards.values())) != 1 or len(shards[intact_payloads[0]['header']['photo_ID']]) * data_photos * 8 < header['total_bits']:
+        print("Error - Unable to process photo(s) as it may be prone to errors")
+        sys.exit(1)
+
+    byte_data = ErasureCoding.decodeParityShards(shards, data_photos, header['parity_count'], header['total_bits'] // 8)
+
+    return BinaryByteConverters.convertBytesToBinaryByteArray(byte_data)
@@ -1,56 +1,89 @@
-from Data_Converters import DirectoryToByteData, BinaryByteConverters, DecimalBitConverters, Miscellaneous_Helpers
-from PIL import Image
-import pickle, sys, os, math
+from Data_Converters import DirectoryToByteData, BinaryByteConverters, ContainerFormat, FileDigests, JobJournal, Miscellaneous_Helpers
+from Data_Converters import OutputStaging, PassphraseKeys
+from Image_Manipulation import CarrierCache, CarrierFormats, ChannelBuffers, PhotoHeaders, PhotoPackingPlanner
+import sys, os
 
 
-def hideDataInImages(folder_path, path_to_input_photos, path_to_processed_photos):
+def hideDataInImages(folder_path, path_to_input_photos, path_to_processed_photos, parity_photos=0,
+                     packing_strategy=PhotoPackingPlanner.DEFAULT_PACKING_STRATEGY, carrier_cache=None, passphrase=None,
+                     keyed=False, encrypted=False, matrix_bits=0, resume=False):
     """
     Hides data in a given set of images and saves those modified images to a new folder.
     :param folder_path: The path to the data that we want to extract and hide.
     :param path_to_input_photos: The path to the folder containing the photo(s) that will be used to hide
     the data.
     :param path_to_processed_photos: Folder location where all photos that have been processed will be saved.
+    :param parity_photos: The number of extra parity photos to create. With m parity photos, the data can still be
+    extracted after any m of the processed photos have been lost or altered.
+    :param packing_strategy: How to choose the photos that data gets hidden in (see PhotoPackingPlanner).
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), or None to open every photo
+    without a cache.
+    :param passphrase: The passphrase that keys are derived from (see PassphraseKeys). Required if 'keyed' or
+    'encrypted' is True.
+    :param keyed: Whether the hidden data is spread over every photo in an order that depends on the passphrase (see
+    KeyedPermutation), instead of being stored from the start of each photo onwards.
+    :param encrypted: Whether the hidden data is encrypted with a key derived from the passphrase (see
+    PayloadEncryption).
+    :param matrix_bits: The number of bits (k) hidden in every block of 2 ** k - 1 channel values with matrix
+    embedding (see MatrixEmbedding), or 0 to hide one bit in every channel value.
+    :param resume: Whether to continue an interrupted session that was hiding the same data in the same photos with
+    the same options, keeping every photo it completed (see JobJournal).
     """
     byte_data_list = DirectoryToByteData.getByteData(folder_path)
-    bits = BinaryByteConverters.convertByteDataListToFullBinary(byte_data_list)
+    byte_data = ContainerFormat.createContainer(byte_data_list)
 
-    # All error checking happens here to determine whether or not photo data can properly be hidden
-    checkIfDataCanBeHidden(len(bits), path_to_input_photos)
+    # Every photo is only opened once to find out how much it can hold (and not at all if it's in the cache)
+    capacities = getPhotoCapacities(path_to_input_photos, carrier_cache)
+    channel_capacities = capacities
 
-    printSizeOfDataToBeHidden(len(bits))
+    # What was learned about the photos is kept even if the user decides not to continue
+    if carrier_cache is not None:
+        CarrierCache.saveCarrierCache(carrier_cache)
 
-    # Any processed photos from a previous session will get removed
-    Miscellaneous_Helpers.removePreviouslyExtractedData(path_to_processed_photos)
+    if matrix_bits != 0:
+        capacities = getMatrixCapacities(channel_capacities, matrix_bits)
 
-    # Total number of bits to be hidden in binary (bit) format
-    b_total_bits = DecimalBitConverters.convertDecimalToBits(len(bits), Miscellaneous_Helpers.getNumBitsToReserve(len(bits)))
-    
-    unused_photos = []
+    # The photos are chosen for the exact size the data takes up once hidden
+    num_bytes = len(byte_data)
+    if encrypted:
+        # Only imported when encryption is requested, since it depends on the cryptography package
+        from Data_Converters import PayloadEncryption
+
+        num_bytes = PayloadEncryption.getEncryptedSize(num_bytes)
+
+    photo_slices, unused_photos = planPhotoSlices(num_bytes, parity_photos, capacities, packing_strategy)
+
+    printPackingPlan(photo_slices, capacities, packing_strategy, channel_capacities)
+    printSizeOfDataToBeHidden(sum(slice_bits for photo, slice_offset, slice_bits in photo_slices))
+
+    # The photos chosen and the slices they hold all follow from these
+    job_description = {
+        'mode': 'hide',
+        'data_digest': FileDigests.computeFileDigest(byte_data),
+        'capacities': capacities,
+        'parity_photos': parity_photos,
+        'packing_strategy': packing_strategy,
+        'keyed': keyed,
+        'encrypted': encrypted,
+        'matrix_bits': matrix_bits,
+    }
+    journal = JobJournal.openJobJournal(path_to_processed_photos, job_description, resume)
+
+    # Processed photos are written to a staging folder, which only replaces the processed photos from a previous
+    # session once every photo has been written. Nothing in it is touched until the user has agreed to continue.
+    path_to_staged_photos = OutputStaging.openStagingFolder(path_to_processed_photos, keep_contents=journal['resumed'])
+
+    # Every photo of the set shares the same salt, so the passphrase only has to be turned into a key once
+    key_parameters = {}
+    if keyed or encrypted:
+        key_parameters = getJournaledKeyParameters(journal, passphrase)
+
+    hidePhotoSet(byte_data, photo_slices, path_to_input_photos, path_to_staged_photos, getJournaledSetID(journal),
+                 key_parameters, passphrase, parity_photos, keyed, encrypted, matrix_bits, carrier_cache, journal)
+
+    JobJournal.closeJobJournal(journal)
+    OutputStaging.commitStagingFolder(path_to_staged_photos, path_to_processed_photos)
 
-    bit_index = 0
-    photo_num = 0
-    first_image = True
-    for photo in os.listdir(path_to_input_photos):
-        photo_path = os.path.join(path_to_input_photos, photo)
-
-        # If true, then all data has been hidden in all previous photo(s) and any remaining photos will not be needed when extracting data.
-        if bit_index >= len(bits):
-            unused_photos.append(photo)
-            continue
-
-        b_photo_num = DecimalBitConverters.convertDecimalToBits(photo_num, Miscellaneous_Helpers.getNumBitsToReserve(photo_num))
-
-        # Hides data in the current photo and updates the next bit index in 'bits' to be stored
-        bit_index = hideDataInPhoto(bits, bit_index, photo_path, b_photo_num, b_total_bits, first_image, path_to_processed_photos)
-        first_image = False
-        photo_num += 1
-    
-    # This error should never occur but is checked just in case.
-    if bit_index < len(bits):
-        print("Error - Not all data was able to be hidden in the given photos.")
-        print("If this error occurs, something went wrong and the process was unsuccessful")
-        sys.exit(1)
-    
     print("Your data has successfully been hidden! (100% complete)")
     
     # Any potential remaining photos that didn't need to be used for hiding data are listed here.
@@ -60,17 +93,148 @@ def hideDataInImages(folder_path, path_to_input_photos, path_to_processed_photos
             print("-> " + photo)
 
 
+def planDataHiding(folder_path, path_to_input_photos, parity_photos=0,
+                   packing_strategy=PhotoPackingPlanner.DEFAULT_PACKING_STRATEGY, carrier_cache=None, encrypted=False,
+                   matrix_bits=0):
+    """
+    Works out exactly how much data hiding it would take, and which photos it would be hidden in, without reading
+    the data or decoding any photo. Only the file system's metadata of the data is used, along with the carrier cache.
+    :param folder_path: The path to the data that we want to hide.
+    :param path_to_input_photos: The path to the folder containing the photo(s) that would be used to hide the data.
+    :param parity_photos: The number of extra parity photos that would be created.
+    :param packing_strategy: How to choose the photos that data gets hidden in (see PhotoPackingPlanner).
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), or None to open every photo's
+    header without a cache.
+    :param encrypted: Whether the data would be encrypted (see PayloadEncryption).
+    :param matrix_bits: The number of bits per block with matrix embedding (see MatrixEmbedding), or 0.
+    """
+    record_count, num_bytes = getHiddenDataSize(folder_path, encrypted)
+
+    capacities = getPhotoCapacities(path_to_input_photos, carrier_cache)
+    channel_capacities = capacities
+
+    if carrier_cache is not None:
+        CarrierCache.saveCarrierCache(carrier_cache)
+
+    if matrix_bits != 0:
+        capacities = getMatrixCapacities(channel_capacities, matrix_bits)
+
+    print("Files and folders to be hidden: " + str(record_count))
+    print("Size of data to be hidden: " + getDataSizeString(num_bytes * 8))
+
+    photo_slices, unused_photos = planPhotoSlices(num_bytes, parity_photos, capacities, packing_strategy)
+
+    if parity_photos > 0:
+        print("Size including parity data: " + getDataSizeString(sum(slice_bits for photo, slice_offset, slice_bits in photo_slices)))
+
+    printPackingPlan(photo_slices, capacities, packing_strategy, channel_capacities)
+
+    print("Nothing has been hidden yet. Run 'hide' with the same options to hide the data.")
+
+
 # ********************************************************************
 # HELPER FUNCTIONS...
 # ********************************************************************
 
 
+def getJournaledKeyParameters(journal, passphrase):
+    """
+    Gets the salt and scrypt parameters of the photo set. A resumed session reuses the ones of the interrupted
+    session, since every photo of a set must share them, and checks that the same passphrase is used.
+    :param journal: The open job journal (see JobJournal.openJobJournal).
+    :param passphrase: The passphrase that keys are derived from.
+    :return: A dictionary of the header values describing how the key is derived (see
+    PassphraseKeys.createKeyParameters).
+    """
+    record = JobJournal.getJournalStep(journal, 'key_parameters')
+
+    if record is None:
+        key_parameters = PassphraseKeys.createKeyParameters()
+        passphrase_check = PassphraseKeys.deriveSubkey(key_parameters, passphrase, b'verification')
+        JobJournal.recordJournalStep(journal, 'key_parameters', dict(key_parameters, passphrase_check=passphrase_check))
+
+        return key_parameters
+
+    if PassphraseKeys.deriveSubkey(record, passphrase, b'verification') != record['passphrase_check']:
+        print("Error - The passphrase does not match the one used by the interrupted session.")
+        sys.exit(1)
+
+    return {field: record[field] for field in ('salt', 'kdf_log_n', 'kdf_r', 'kdf_p')}
+
+
+def getJournaledSetID(journal):
+    """
+    Gets the set ID of the photo set. A resumed session reuses the one of the interrupted session, since every photo
+    of a set must share it.
+    :param journal: The open job journal (see JobJournal.openJobJournal).
+    :return: The set ID (see PhotoHeaders.createSetID).
+    """
+    record = JobJournal.getJournalStep(journal, 'set_ID')
+
+    if record is None:
+        record = {'set_ID': PhotoHeaders.createSetID()}
+        JobJournal.recordJournalStep(journal, 'set_ID', record)
+
+    return record['set_ID']
+
+
+def createSetHeaderValues(photo_count, parity_photos, total_bits, keyed, encrypted, matrix_bits, key_parameters, set_ID):
+    """
+    Creates the header values that every photo of a set shares (see PhotoHeaders.createPhotoHeader).
+    :param photo_count: The number of photos in the set (including parity photos).
+    :param parity_photos: The number of parity photos in the set.
+    :param total_bits: The number of bits of data hidden in the set (before adding parity).
+    :param keyed: Whether the data is stored in keyed order.
+    :param encrypted: Whether the data is encrypted.
+    :param matrix_bits: The number of bits per block with matrix embedding, or 0.
+    :param key_parameters: The salt and scrypt parameters of the passphrase (see PassphraseKeys.createKeyParameters),
+    or an empty dictionary if no passphrase is used.
+    :param set_ID: The set ID (see PhotoHeaders.createSetID).
+    :return: A dictionary of the header values, which only lacks the values of the individual photos ('photo_ID',
+    'slice_offset' and 'slice_bits').
+    """
+    flags = 0
+    if parity_photos > 0:
+        flags |= PhotoHeaders.FLAG_PARITY
+    if keyed:
+        flags |= PhotoHeaders.FLAG_KEYED
+    if encrypted:
+        flags |= PhotoHeaders.FLAG_ENCRYPTED
+
+    return {
+        'flags': flags,
+        'photo_count': photo_count,
+        'parity_count': parity_photos,
+        'total_bits': total_bits,
+        'matrix_bits': matrix_bits,
+        'set_ID': set_ID,
+        **key_parameters,
+    }
+
+
 def printSizeOfDataToBeHidden(num_bits):
     """
     Given the total number of bits, prints the size of the data to be hidden in a more human-readable format
     and prompts the user with the option of if they still want to continue with the data hiding process.
     :param num_bits: The number of bits that will be converted into a more human-readable format.
     """
+    print("Size of data to be hidden: " + getDataSizeString(num_bits))
+    print("Do you wish to continue?")
+    answer = input()
+
+    if answer[0] != 'y' and answer[0] != 'Y':
+        print("No new images have been modified/saved. Goodbye.")
+        sys.exit(0)
+
+    print("***")
+
+
+def getDataSizeString(num_bits):
+    """
+    Converts a number of bits into a human-readable size.
+    :param num_bits: The number of bits.
+    :return: The size in bytes, kilobytes, megabytes, gigabytes or terabytes (such as "1.5 megabytes.").
+    """
     num_bytes = num_bits / 8
     dataTypeStr = ""
 
@@ -89,25 +253,41 @@ def printSizeOfDataToBeHidden(num_bits):
         dataTypeStr = " terabytes."
         num_bytes = (num_bytes // 10 ** 11) / 10
 
-    print("Size of data to be hidden: " + str(num_bytes) + dataTypeStr)
-    print("Do you wish to continue?")
-    answer = input()
+    return str(num_bytes) + dataTypeStr
 
-    if answer[0] != 'y' and answer[0] != 'Y':
-        print("No new images have been modified/saved. Goodbye.")
-        sys.exit(0)
 
+def printPackingPlan(photo_slices, capacities, packing_strategy, channel_capacities=None):
+    """
+    Prints which photos will be used to hide the data, along with the total number of channel values that will have
+    to be decoded and encoded to do so.
+    :param photo_slices: The list of slices, each represented as a tuple (photo name, index of the slice's first bit,
+    number of bits in the slice).
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :param packing_strategy: The strategy that was used to choose the photos.
+    :param channel_capacities: The capacities the photos have with one bit per channel value (see
+    getPhotoCapacities), which give the number of channel values of every photo. Defaults to 'capacities'.
+    """
+    if channel_capacities is None:
+        channel_capacities = capacities
+
+    photos = [photo for photo, slice_offset, slice_bits in photo_slices]
+    channel_cost = PhotoPackingPlanner.getPlanChannelCost(photos, channel_capacities)
+
+    print("Packing plan (" + packing_strategy + "): " + str(len(photos)) + " of " + str(len(capacities)) + " photo(s) will be used.")
+    for photo, slice_offset, slice_bits in photo_slices:
+        print("-> " + photo + "  (" + str((slice_bits * 1000 // capacities[photo]) / 10) + "% full)")
+    print("Expected cost: " + str(channel_cost) + " channel values to decode and encode (" + str((channel_cost // 10 ** 4) / 100) + " million).")
     print("***")
 
 
-def checkIfDataCanBeHidden(num_bits, path_to_input_photos):
+def checkIfDataCanBeHidden(num_bits, capacities):
     """
     Checks to see if the number of bits to be hidden will be able to fit inside the specified set of photos.
     :param num_bits: The number of bits that have been requested to be hidden.
-    :param path_to_input_photos: The path to the photos, whose sizes will be calculated to see if the given
-    number of bits can fit inside the given set of photos.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold (see
+    getPhotoCapacities).
     """
-    capacity = getMaxDataThatCanBeHidden(path_to_input_photos, num_bits)
+    capacity = sum(capacities.values())
 
     # All data must be able to fit inside image(s)
     if num_bits > capacity:
@@ -122,36 +302,25 @@ def checkIfDataCanBeHidden(num_bits, path_to_input_photos):
         sys.exit(1)
 
 
-def getNumBitsAvailableToHide(photo_name, photo_ID_reserve_bits, total_bits_reserve_bits, first_image):
+def getNumBitsAvailableToHide(photo_name, carrier_cache=None):
     """
-    Gets the total number of bits that can be hidden inside of a given photo (Minus the reserve bits).
+    Gets the total number of bits that can be hidden inside of a given photo (Minus the bits used by the photo header).
     :param photo_name: The path to the photo that will be calculated.
-    :param photo_ID_reserve_bits: The total number of bits that must be reserved for the storage of the
-    photo identification number inside the given photo.
-    :param total_bits_reserve_bits: The total number of bits that must be reserved for the storage of the
-    total number of bits that will be hidden and stored in the set of photos. (These bits will only be 
-    hidden inside of the first image that gets processed.)
-    :param first_image: A boolean value indicating whether or not the given photo is recognized as the
-    first image. 
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), or None.
     :return: The maximum number of bits of hidden data that the photo is able to store.
     """
-    # Path must lead to a png image
-    if not photo_name.lower().endswith('.png'):
-        print("Error - Only png images are supported for this application.")
-        print(str(os.path.basename(photo_name)) + " is not a png image.")
+    # Path must lead to an image stored in a lossless format
+    if not CarrierFormats.isSupportedCarrier(photo_name):
+        print("Error - Only png, webp and tiff images are supported for this application.")
+        print(str(os.path.basename(photo_name)) + " is not a png, webp or tiff image.")
         sys.exit(1)
 
-    image = Image.open(photo_name)
-    width, height = image.size
-    image.close()
-
-    pixel_count = width * height
-
-    # The first image must contain a bit extra data
-    if first_image:
-        val = pixel_count * 3 - 10 - photo_ID_reserve_bits - total_bits_reserve_bits
+    if carrier_cache is not None:
+        carrier = CarrierCache.getCarrierInfo(carrier_cache, photo_name)
     else:
-        val = pixel_count * 3 - 4 - photo_ID_reserve_bits
+        carrier = CarrierFormats.getCarrierInfo(photo_name)
+
+    val = CarrierFormats.getChannelCount(carrier) - PhotoHeaders.HEADER_BITS
 
     if val <= 0:
         print("Error - Image size for " + str(os.path.basename(photo_name)) + " is way too small and is therefore unable to hide any data.")
@@ -160,13 +329,23 @@ def getNumBitsAvailableToHide(photo_name, photo_ID_reserve_bits, total_bits_rese
     return val
 
 
-def getMaxDataThatCanBeHidden(path_to_input_photos, total_bits):
+def getMaxDataThatCanBeHidden(path_to_input_photos, carrier_cache=None):
     """
     Gets the maximum amount of data that can be hidden inside a given set of photos.
     :param path_to_input_photos: The path to the folder containing the set of photos.
-    :param total_bits: The total number of bits of data that will be hidden (not including reserve bits).
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), or None.
     :return: The maximum size of data (in bits) that can be hidden in the given set of photos.
     """
+    return sum(getPhotoCapacities(path_to_input_photos, carrier_cache).values())
+
+
+def getPhotoCapacities(path_to_input_photos, carrier_cache=None):
+    """
+    Gets the amount of data that can be hidden inside each photo of a given set of photos.
+    :param path_to_input_photos: The path to the folder containing the set of photos.
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), or None.
+    :return: A dictionary mapping every photo name to the maximum size of data (in bits) that can be hidden in it.
+    """
     # Path must lead to a folder
     if not os.path.isdir(path_to_input_photos):
         print("Error - Specified path to folder containing photos does not lead to a folder.")
@@ -175,193 +354,286 @@ def getMaxDataThatCanBeHidden(path_to_input_photos, total_bits):
     # Sometimes unwanted hidden files may appear, which we do not want
     Miscellaneous_Helpers.removePotentialHiddenFiles(path_to_input_photos)
 
-    max_allowed_bits = 0
-    num_photos_in_directory = len(os.listdir(path_to_input_photos))
+    photos = os.listdir(path_to_input_photos)
 
     # There must exist at least one photo
-    if num_photos_in_directory == 0:
+    if len(photos) == 0:
         print("Error - You do not have any photos listed.")
         sys.exit(1)
 
-    # Number of photos in path cannot exceed max number able to be stored in reserved bit space
-    if num_photos_in_directory >= 2 ** 16:
-        print("Error - Too many photos. Max is " + str(2 ** 16) - 1)
+    # Number of photos in path cannot exceed max number able to be stored in a photo header
+    if len(photos) >= 2 ** 16:
+        print("Error - Too many photos. Max is " + str(2 ** 16 - 1))
         sys.exit(1)
-    
-    # Calculate reserve bits
-    photo_ID_reserve_bits = Miscellaneous_Helpers.getNumBitsToReserve(num_photos_in_directory)
-    total_bits_reserve_bits = Miscellaneous_Helpers.getNumBitsToReserve(total_bits)
-
-    first_image = True
-    for photo in os.listdir(path_to_input_photos):
-        photo_path = os.path.join(path_to_input_photos, photo)
-        num = getNumBitsAvailableToHide(photo_path, photo_ID_reserve_bits, total_bits_reserve_bits, first_image)
-        first_image = False
-
-        # Super rare occurrence except for EXTREMELY small images (containing only a couple of pixels)
-        if num < 1:
-            print("Error - Image size for " + str(photo) + " is way too small.")
-            sys.exit(1)
-
-        max_allowed_bits += num
-
-    return max_allowed_bits
-
-
-def storeDataInPixels(data, w, h, i, image):
-    """
-    Stores a specific set of bits inside of the pixels of a given image.
-    :param data: The data, represented in bits, that is to be stored inside the image.
-    :param w: The current pixel width value to start storing data at.
-    :param h: The current pixel height value to start storing data at.
-    :param i: The current index value, representing the number of bits that have currently 
-    been stored so far in the given image.
-    :param image: The image object containing all the pixel data of the current image.
-    :return: A tuple containing the pixel width and height values, as well as the index i.
-    """
-    width, height = image.size
-
-    for j in range(len(data)):
-        if w >= width:
-            w = 0
-            h += 1
-            if h >= height:
-                print("Error - Image size is not large enough to store all initial necessary components.")
-                image.close()
-                sys.exit(1)
-    
-        rgb = list(image.getpixel((w, h)))
 
-        # If true, then the current lsb pixel value needs to be changed
-        if rgb[i%3] % 2 != data[j]:
-            if data[j] == 0:
-                rgb[i%3] -= 1
-            else:
-                rgb[i%3] += 1
+    capacities = {}
+    for photo in photos:
+        capacities[photo] = getNumBitsAvailableToHide(os.path.join(path_to_input_photos, photo), carrier_cache)
 
-        image.putpixel((w, h), tuple(rgb))
+    return capacities
 
-        i += 1
 
-        # The RGB values for the current pixel have all been gone through and it's now time for the next pixel
-        if i % 3 == 0:
-            w += 1
-    
-    return (w, h, i)
+def getMatrixCapacities(capacities, matrix_bits):
+    """
+    Gets the amount of data that can be hidden inside each photo of a set with matrix embedding. Matrix embedding
+    holds fewer bits in more channel values, but the order of the photos by capacity stays the same, so the packing
+    planner chooses photos in the same way.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold with one bit per
+    channel value (see getPhotoCapacities).
+    :param matrix_bits: The number of bits stored in every block (see MatrixEmbedding).
+    :return: A dictionary mapping every photo name to the maximum size of data (in bits) that can be hidden in it.
+    """
+    # Only imported with matrix embedding, since it depends on numpy
+    from Image_Manipulation import MatrixEmbedding
+
+    if not MatrixEmbedding.MIN_MATRIX_BITS <= matrix_bits <= MatrixEmbedding.MAX_MATRIX_BITS:
+        print("Error - Matrix embedding can store " + str(MatrixEmbedding.MIN_MATRIX_BITS) + " to " +
+              str(MatrixEmbedding.MAX_MATRIX_BITS) + " bits per block.")
+        sys.exit(1)
 
+    return {photo: MatrixEmbedding.getMatrixCapacity(capacity, matrix_bits) for photo, capacity in capacities.items()}
 
-def storeMainDataInPixels(bits, val, w, h, i, image, path_to_processed_photos, image_name):
+
+def createPhotoSlices(num_bits, capacities, packing_strategy=PhotoPackingPlanner.DEFAULT_PACKING_STRATEGY):
     """
-    All actual data meant to get hidden is stored here.
-    :param bits: The data, represented in bits, that is to be stored inside the image.
-    :param val: The total current index value, representing the TOTAL number of bits that have so far been stored 
-    in any previously processed photos from this session, minus the number of reserve bits for this photo.
-    :param w: The current pixel width value to start storing data at.
-    :param h: The current pixel height value to start storing data at.
-    :param i: The current index value, representing the number of bits that have currently been stored so far in
-    the given image.
-    :param image: The image object containing all the pixel data of the current image.
-    :param path_to_processed_photos: The path to the location to store all photos that have been processed.
-    :param image_name: The base name of the current photo being processed. The processed photo will have this
-    same name and will then be stored in 'path_to_processed_photos'.
-    :return: The new value of the current index value, i
-    """
-    width, height = image.size
-
-    # Go through potential remaining G/B values in current pixel to start with fresh new pixel
-    while i % 3 != 0:
-        if i + val >= len(bits):
-            image.save(os.path.join(path_to_processed_photos, image_name))
-            return i
-        
-        rgb = list(image.getpixel((w, h)))
-
-        if rgb[i%3] % 2 != bits[i + val]:
-            if bits[i + val] == 0:
-                rgb[i%3] -= 1
-            else:
-                rgb[i%3] += 1
-        
-        image.putpixel((w, h), tuple(rgb))
-        
-        i += 1
-    
-    w += 1
-
-    # Go through all remaining pixels in photo (or until all data has been stored)
-    for h in range(h, height):
-        for w in range(w, width):
-            for j in range(3):
-                if i + val >= len(bits):
-                    image.save(os.path.join(path_to_processed_photos, image_name))
-                    return i
-
-                rgb = list(image.getpixel((w, h)))
-
-                if rgb[i%3] % 2 != bits[i + val]:
-                    if bits[i + val] == 0:
-                        rgb[i%3] -= 1
-                    else:
-                        rgb[i%3] += 1
-        
-                image.putpixel((w, h), tuple(rgb))
-                
-                i += 1
-        w = 0
-    
-    return i
+    Splits the data to be hidden into consecutive slices, one per photo chosen by the packing planner, where each
+    slice is as large as the photo it gets hidden in can hold.
+    :param num_bits: The total number of bits that will be hidden.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :param packing_strategy: How to choose the photos (see PhotoPackingPlanner).
+    :return: A tuple containing the list of slices, each represented as a tuple (photo name, index of the slice's
+    first bit, number of bits in the slice), and the list of photo names that aren't needed.
+    """
+    planned_photos = PhotoPackingPlanner.createPackingPlan(num_bits, capacities, packing_strategy)
+    photo_slices = []
+
+    bit_index = 0
+    for photo in planned_photos:
+        slice_bits = min(num_bits - bit_index, capacities[photo])
+        photo_slices.append((photo, bit_index, slice_bits))
+        bit_index += slice_bits
+
+    # This error should never occur but is checked just in case.
+    if bit_index < num_bits:
+        print("Error - Not all data was able to be hidden in the given photos.")
+        print("If this error occurs, something went wrong and the process was unsuccessful")
+        sys.exit(1)
+
+    used_photos = set(planned_photos)
+    unused_photos = [photo for photo in capacities if photo not in used_photos]
+
+    return (photo_slices, unused_photos)
+
+
+def getHiddenDataSize(folder_path, encrypted=False):
+    """
+    Works out exactly how much data hiding a path's contents takes, from the file system's metadata alone.
+    :param folder_path: The path to the data that we want to hide.
+    :param encrypted: Whether the data gets encrypted (see PayloadEncryption).
+    :return: A tuple containing the number of files and folders, and the number of bytes that get hidden (before
+    adding parity).
+    """
+    record_count, names_size, contents_size = DirectoryToByteData.getByteDataSizes(folder_path)
+    num_bytes = ContainerFormat.getContainerSize(record_count, names_size, contents_size)
+
+    if encrypted:
+        # Only imported when encryption is requested, since it depends on the cryptography package
+        from Data_Converters import PayloadEncryption
+
+        num_bytes = PayloadEncryption.getEncryptedSize(num_bytes)
+
+    return (record_count, num_bytes)
+
+
+def planPhotoSlices(num_bytes, parity_photos, capacities, packing_strategy=PhotoPackingPlanner.DEFAULT_PACKING_STRATEGY):
+    """
+    Chooses the photos that data of a given size gets hidden in, and the slice of it that each photo holds.
+    :param num_bytes: The number of bytes that will be hidden (before adding parity).
+    :param parity_photos: The number of parity photos.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :param packing_strategy: How to choose the photos (see PhotoPackingPlanner).
+    :return: A tuple containing the list of slices, each represented as a tuple (photo name, index of the slice's
+    first bit, number of bits in the slice), and the list of photo names that aren't needed.
+    """
+    # Parity photos all store equally sized shards, so the capacity check happens while choosing the photos
+    if parity_photos > 0:
+        return planParityPhotoSlices(num_bytes, parity_photos, capacities, packing_strategy)
+
+    # All error checking happens here to determine whether or not photo data can properly be hidden
+    checkIfDataCanBeHidden(num_bytes * 8, capacities)
+
+    return createPhotoSlices(num_bytes * 8, capacities, packing_strategy)
+
+
+def encodeParityBits(bits, data_photos, parity_photos):
+    """
+    Splits the data to be hidden into data shards and adds their parity shards (see ErasureCoding).
+    :param bits: The data, represented in bits, that is to be hidden.
+    :param data_photos: The number of data shards (k).
+    :param parity_photos: The number of parity shards (m).
+    :return: All shards joined together, represented in bits. Photo n holds shard n (see planParityPhotoSlices).
+    """
+    # Only imported when parity photos are requested, since it depends on numpy
+    from Data_Converters import ErasureCoding
+
+    byte_data = BinaryByteConverters.convertBinaryByteArrayToBytes(bits)
+    shards = ErasureCoding.encodeParityShards(byte_data, data_photos, parity_photos)
+
+    return BinaryByteConverters.convertBytesToBinaryByteArray(b''.join(shards))
+
 
-def hideDataInPhoto(bits, current_index, photo, photo_ID, total_bits, first_image, path_to_processed_photos):
+def planParityPhotoSlices(num_bytes, parity_photos, capacities, packing_strategy=PhotoPackingPlanner.DEFAULT_PACKING_STRATEGY):
     """
-    Hides all data needed to be hidden in the current given photo.
-    :param bits: The data, represented in bits, that is to be stored inside the image.
-    :param current_index: The total current index value, representing the TOTAL number of bits that have so far been stored 
-    in any previously processed photos from this session.
+    Chooses the photos that hold the shards of the data and its parity shards (see encodeParityBits).
+    :param num_bytes: The number of bytes that will be hidden (before adding parity).
+    :param parity_photos: The number of parity shards (m).
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :param packing_strategy: How to choose the photos (see PhotoPackingPlanner).
+    :return: A tuple containing the list of slices, one per shard, each represented as a tuple (photo name, index of
+    the slice's first bit, number of bits in the slice), and the list of photo names that aren't needed.
+    """
+    # Only imported when parity photos are requested, since it depends on numpy
+    from Data_Converters import ErasureCoding
+
+    plan = PhotoPackingPlanner.createParityPackingPlan(num_bytes, parity_photos, capacities, ErasureCoding.MAX_SHARDS, packing_strategy)
+
+    if plan is None:
+        print("Error - Not enough space is available to store requested data along with " + str(parity_photos) + " parity photo(s).")
+        print("Add more (or larger) photos, or request fewer parity photos.")
+        sys.exit(1)
+
+    data_photos, planned_photos = plan
+
+    # Every shard is equally long, with the last data shard padded (see ErasureCoding.encodeParityShards)
+    shard_bits = ErasureCoding.getShardLength(num_bytes, data_photos) * 8
+
+    photo_slices = []
+    for index in range(len(planned_photos)):
+        photo_slices.append((planned_photos[index], index * shard_bits, shard_bits))
+
+    used_photos = set(planned_photos)
+    unused_photos = [photo for photo in capacities if photo not in used_photos]
+
+    return (photo_slices, unused_photos)
+
+
+def hidePhotoSet(byte_data, photo_slices, path_to_input_photos, path_to_staged_photos, set_ID, key_parameters,
+                 passphrase=None, parity_photos=0, keyed=False, encrypted=False, matrix_bits=0, carrier_cache=None,
+                 journal=None):
+    """
+    Hides data as one photo set, in the photos that were chosen for it, and writes every photo to the staging folder.
+    :param byte_data: The container holding the data (see ContainerFormat.createContainer).
+    :param photo_slices: The slices of the photos chosen for the data (see planPhotoSlices).
+    :param path_to_input_photos: The path to the folder containing the input photos.
+    :param path_to_staged_photos: The path to the staging folder the photos are written to (see OutputStaging).
+    :param set_ID: The set ID (see PhotoHeaders.createSetID).
+    :param key_parameters: The salt and scrypt parameters of the passphrase (see PassphraseKeys.createKeyParameters),
+    or an empty dictionary if no passphrase is used.
+    :param passphrase: The passphrase that keys are derived from, or None.
+    :param parity_photos: The number of parity photos among the chosen photos.
+    :param keyed: Whether the hidden data is stored in keyed order (see KeyedPermutation).
+    :param encrypted: Whether the hidden data is encrypted (see PayloadEncryption).
+    :param matrix_bits: The number of bits per block with matrix embedding (see MatrixEmbedding), or 0.
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), or None.
+    :param journal: The open job journal of the session (see JobJournal.openJobJournal), which records every photo
+    once it has been written and lets a resumed session keep it, or None.
+    """
+    if encrypted:
+        # Only imported when encryption is requested, since it depends on the cryptography package
+        from Data_Converters import PayloadEncryption
+
+        byte_data = PayloadEncryption.encryptPayload(byte_data, PassphraseKeys.deriveSubkey(key_parameters, passphrase, b'encryption'))
+
+    bits = BinaryByteConverters.convertBytesToBinaryByteArray(byte_data)
+    total_bits = len(bits)
+
+    if parity_photos > 0:
+        bits = encodeParityBits(bits, len(photo_slices) - parity_photos, parity_photos)
+
+    # The photos were chosen for the size the data had when it was measured, which only differs if it was changed
+    # in the meantime
+    last_photo, last_slice_offset, last_slice_bits = photo_slices[-1]
+    if len(bits) != last_slice_offset + last_slice_bits:
+        print("Error - The data to be hidden changed after the photos were chosen for it. Please try again.")
+        sys.exit(1)
+
+    permutation_key = None
+    if keyed:
+        permutation_key = PassphraseKeys.deriveSubkey(key_parameters, passphrase, b'permutation')
+
+    set_values = createSetHeaderValues(len(photo_slices), parity_photos, total_bits, keyed, encrypted, matrix_bits,
+                                       key_parameters, set_ID)
+
+    for photo_num in range(len(photo_slices)):
+        photo, slice_offset, slice_bits = photo_slices[photo_num]
+        header_values = dict(set_values, photo_ID=photo_num, slice_offset=slice_offset, slice_bits=slice_bits)
+        staged_photo_path = os.path.join(path_to_staged_photos, photo)
+
+        # A photo completed by an interrupted session is kept if it still holds exactly what this photo would
+        if journal is not None:
+            record = JobJournal.getJournalStep(journal, photo)
+
+            if record is not None and record['header'] == header_values and JobJournal.isOutputUnchanged(staged_photo_path, record['output']):
+                print("Photo " + photo + " was already completed by the interrupted session.")
+                continue
+
+        hideDataInPhoto(bits, os.path.join(path_to_input_photos, photo), header_values, path_to_staged_photos,
+                        carrier_cache, permutation_key)
+
+        OutputStaging.syncFile(staged_photo_path)
+
+        if journal is not None:
+            JobJournal.recordJournalStep(journal, photo, {'header': header_values, 'output': JobJournal.getOutputDescription(staged_photo_path)})
+
+
+def hideDataInPhoto(bits, photo, header_values, path_to_processed_photos, carrier_cache=None, permutation_key=None):
+    """
+    Hides the photo header and the given slice of data in the current given photo.
+    :param bits: The data, represented in bits, that is to be stored inside the image set.
     :param photo: The path to the current photo to be processed.
-    :param photo_ID: The photo ID number (in bit format) that will be stored in the current photo to be processed. 
-    :param total_bits: The total number of bits of data that will be hidden (not including reserve bits).
-    :param first_image: A boolean value indicating whether or not the given photo is recognized as the
-    first image. 
+    :param header_values: The values of the photo header (see PhotoHeaders.createPhotoHeader), not including the
+    checksum. The 'slice_offset' and 'slice_bits' values describe which part of 'bits' is stored in this photo, and
+    'matrix_bits' whether it's stored with matrix embedding (see MatrixEmbedding).
     :param path_to_processed_photos: The path to the location to store all photos that have been processed.
-    :return: The start of the next current bit index for the next potential photo to be processed.
+    :param carrier_cache: The open carrier cache (see CarrierCache.openCarrierCache), or None.
+    :param permutation_key: The key deciding the order the slice is stored in (see KeyedPermutation), or None to
+    store it in order.
     """
-    image = Image.open(photo)
+    slice_offset = header_values['slice_offset']
+    slice_bits = header_values['slice_bits']
 
-    print("Currently hiding data in photo " + str(os.path.basename(photo)) + "  (" + str((current_index * 1000 // len(bits)) / 10) + "% complete)")
+    print("Currently hiding data in photo " + str(os.path.basename(photo)) + "  (" + str((slice_offset * 1000 // len(bits)) / 10) + "% complete)")
 
-    # Convert the image to RGB color mode if needed
-    if image.mode != "RGB":
-        image = image.convert("RGB")
+    channels, carrier = ChannelBuffers.openChannelBuffer(photo, carrier_cache)
 
-    total_reserve_bits = 4 + len(photo_ID) if not first_image else 10 + len(photo_ID) + len(total_bits)
-    
-    width, height = image.size
+    data = bits[slice_offset:slice_offset + slice_bits]
+    header = PhotoHeaders.createPhotoHeader(dict(header_values, checksum=PhotoHeaders.computeChecksum(data, header_values)))
 
-    w = 0
-    h = 0
+    # The header always comes first, directly followed by this photo's slice of the hidden data (which is spread
+    # over everything after the header in keyed mode)
+    ChannelBuffers.writeLSBs(channels, 0, header)
 
-    i = 0
+    if permutation_key is not None:
+        # Only imported in keyed mode, since it depends on numpy
+        from Image_Manipulation import KeyedPermutation
 
-    # Store number of bits to reserve for photo ID num (minus one)
-    bit_ID_length = DecimalBitConverters.convertDecimalToBits(len(photo_ID) - 1, 4)
-    w, h, i = storeDataInPixels(bit_ID_length, w, h, i, image)
+    if header_values['matrix_bits'] > 0:
+        # Only imported with matrix embedding, since it depends on numpy
+        from Image_Manipulation import MatrixEmbedding
 
-    # Store photo ID num
-    w, h, i = storeDataInPixels(photo_ID, w, h, i, image)
-    
-    # Storing total number of bits to be stored is only done in the first photo
-    if first_image:
-        # Store number of bits to reserve for total num of bits (minus one)
-        bit_total_bits_length = DecimalBitConverters.convertDecimalToBits(len(total_bits) - 1, 6)
-        w, h, i = storeDataInPixels(bit_total_bits_length, w, h, i, image)
-        
-        # Store number of total bits to be stored
-        w, h, i = storeDataInPixels(total_bits, w, h, i, image)
-    
-    # Now we can store all hidden data! Hooray!
-    val = current_index - total_reserve_bits
-    i = storeMainDataInPixels(bits, val, w, h, i, image, path_to_processed_photos, os.path.basename(photo))
-    
-    image.save(os.path.join(path_to_processed_photos, os.path.basename(photo)))
-    
-    return i + val
\ No newline at end of file
+        # Matrix embedding works out which bits to flip from the bits that are already stored in the channel values
+        channel_count = MatrixEmbedding.getMatrixChannelCount(len(data), header_values['matrix_bits'])
+
+        if permutation_key is not None:
+            cover_bits = KeyedPermutation.readKeyedLSBs(channels, permutation_key, header_values['photo_ID'], PhotoHeaders.HEADER_BITS, channel_count)
+        else:
+            cover_bits = ChannelBuffers.readLSBs(channels, PhotoHeaders.HEADER_BITS, channel_count)
+
+        data = MatrixEmbedding.embedMatrixBits(cover_bits, data, header_values['matrix_bits'])
+
+    if permutation_key is not None:
+        KeyedPermutation.writeKeyedLSBs(channels, permutation_key, header_values['photo_ID'], PhotoHeaders.HEADER_BITS, data)
+    else:
+        ChannelBuffers.writeLSBs(channels, PhotoHeaders.HEADER_BITS, data)
+
+    ChannelBuffers.saveChannelBuffer(channels, carrier, os.path.join(path_to_processed_photos, os.path.basename(photo)))
@@ -0,0 +1,86 @@
+from Data_Converters import BinaryByteConverters
+from Image_Manipulation import ImageDataExtraction
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os, sys
+
+
+def verifyImages(processed_photos, passphrase=None):
+    """
+    Checks the integrity of a set of processed photos without changing anything on disk. Every photo is checked
+    against the checksum stored in its header (in parallel), and the headers are checked to form one complete photo
+    set. If photos are missing or altered but the data can be rebuilt from the parity photos, every rebuilt file is
+    checked against its stored digest.
+    :param processed_photos: Path to the folder containing all photos which contain hidden data.
+    :param passphrase: The passphrase the data was hidden with, or None if it was hidden without one.
+    """
+    photo_paths = ImageDataExtraction.listPhotoPaths(processed_photos)
+
+    print("Verifying " + str(len(photo_paths)) + " photo(s)...")
+
+    with ProcessPoolExecutor() as executor:
+        photo_results = list(executor.map(partial(verifyPhoto, passphrase=passphrase), photo_paths))
+
+    # Photos processed with the legacy format have nothing that can be verified
+    if all(result['header'] is None for result in photo_results):
+        print("Error - These photos were processed with the legacy format, which stores no checksums.")
+        sys.exit(1)
+
+    for result in photo_results:
+        status = "OK" if result['header'] is not None and result['checksum_matches'] else "FAILED"
+        print("-> " + os.path.basename(result['photo_path']) + ": " + status)
+
+    errors = ImageDataExtraction.findPhotoSetErrors(photo_results)
+
+    # Every photo's slice matches its checksum and the set is complete, so the hidden data is exactly what was hidden
+    if len(errors) == 0:
+        print("\nSuccess! All photos are intact.")
+        return
+
+    print("\nVerification failed. The following problem(s) were found:")
+    for error in errors:
+        print("-> " + error)
+
+    if not ImageDataExtraction.canRebuildFromParity(photo_results):
+        sys.exit(1)
+
+    print("\nEnough photos are intact to rebuild the hidden data from the parity photos. Checking the rebuilt files...")
+
+    # Rebuilding needs the slices themselves, so only the intact photos are read again
+    intact_paths = [result['photo_path'] for result in ImageDataExtraction.getIntactPhotoPayloads(photo_results)]
+
+    with ProcessPoolExecutor() as executor:
+        photo_payloads = list(executor.map(partial(ImageDataExtraction.readPhotoPayload, passphrase=passphrase), intact_paths))
+
+    bits = ImageDataExtraction.assembleBitsFromPhotoPayloads(photo_payloads, report_warnings=False)
+    bits = ImageDataExtraction.decryptPayloadBits(bits, photo_payloads, passphrase)
+    byte_data_list, mismatched_files = BinaryByteConverters.convertFullBinaryToCheckedByteDataList(bits)
+
+    if len(mismatched_files) > 0:
+        print("\nVerification failed. The following hidden file(s) do not match their stored digests:")
+        for path in mismatched_files:
+            print("-> " + path)
+        sys.exit(1)
+
+    print("\nAll hidden files can be rebuilt, but the photos listed above should be replaced.")
+    sys.exit(1)
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def verifyPhoto(photo_path, passphrase=None):
+    """
+    Checks a single photo's header and slice of hidden data against its checksum. This runs in a worker process, so
+    only the outcome of the check is sent back, rather than the slice itself.
+    :param photo_path: The path to the photo containing hidden data.
+    :param passphrase: The passphrase the data was hidden with, or None if it was hidden without one.
+    :return: The photo's payload (see ImageDataExtraction.readPhotoPayload), with its bits left out ('bits' is None).
+    The header still holds the photo's checksum.
+    """
+    payload = ImageDataExtraction.readPhotoPayload(photo_path, passphrase)
+    payload['bits'] = None
+
+    return payload
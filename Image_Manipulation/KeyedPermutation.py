@@ -0,0 +1,151 @@
+import numpy as np
+import hashlib, struct
+
+
+# In keyed mode, a photo's slice of hidden data is spread over its channel values in an order that depends on a key,
+# rather than being written from the first channel value onwards. Without the key, there's no telling which channel
+# values hold the slice. The header itself is still stored in order before the permuted channel values, since it
+# holds the salt the key is derived from.
+#
+# The order is a keyed pseudo-random permutation of the channel values after the header, computed with a 6 round
+# Feistel network over the smallest power of 2 that covers them. The two halves of an index differ in size by at most
+# one bit when the number of bits is odd, and trade places every round. Each round function is a keyed multiplicative
+# hash (add a round key, multiply by an odd round multiplier and keep the top bits of the word), which needs only a
+# few cheap numpy operations per round. The domain is sent through the network in order, and every position that falls
+# outside of the channel values is simply dropped, which leaves every channel value exactly once, in keyed order.
+# Every step works on whole numpy arrays of positions, so bits are read and written with a single gather or scatter
+# per chunk instead of one Python call per channel value. Positions are created a chunk at a time, so memory use
+# doesn't grow with the size of the photo. Chunks are small enough for their arrays to stay in the CPU cache.
+FEISTEL_ROUNDS = 6
+CHUNK_SIZE = 2 ** 16
+
+
+def readKeyedLSBs(channels, permutation_key, photo_ID, start, length):
+    """
+    Reads the least significant bits of the first 'length' channel values in keyed order.
+    :param channels: The channel values of the photo.
+    :param permutation_key: The permutation key of the photo set (see PassphraseKeys.deriveSubkey).
+    :param photo_ID: The identifier number of the photo, so that every photo of a set uses a different order.
+    :param start: The index of the first channel value that is part of the permutation (the end of the header).
+    :param length: The number of bits to read.
+    :return: The least significant bits, stored as zeroes and ones in a bytearray.
+    """
+    values = np.frombuffer(channels, dtype=np.uint8)
+    bits = np.empty(length, dtype=np.uint8)
+
+    for offset, positions in getKeyedPositions(permutation_key, photo_ID, len(channels) - start, length):
+        positions += start
+        bits[offset:offset + len(positions)] = values[positions] & 1
+
+    return bytearray(bits.tobytes())
+
+
+def writeKeyedLSBs(channels, permutation_key, photo_ID, start, bits):
+    """
+    Overwrites the least significant bits of the first len(bits) channel values in keyed order.
+    :param channels: The channel values of the photo. This bytearray is modified in place.
+    :param permutation_key: The permutation key of the photo set (see PassphraseKeys.deriveSubkey).
+    :param photo_ID: The identifier number of the photo, so that every photo of a set uses a different order.
+    :param start: The index of the first channel value that is part of the permutation (the end of the header).
+    :param bits: The bits to store, as zeroes and ones in a bytearray.
+    """
+    values = np.frombuffer(channels, dtype=np.uint8)
+    new_bits = np.frombuffer(bits, dtype=np.uint8)
+
+    for offset, positions in getKeyedPositions(permutation_key, photo_ID, len(channels) - start, len(bits)):
+        positions += start
+        values[positions] = (values[positions] & 0xFE) | new_bits[offset:offset + len(positions)]
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def getKeyedPositions(permutation_key, photo_ID, channel_count, length):
+    """
+    Generates the first 'length' positions of the keyed permutation of 'channel_count' channel values, one chunk at
+    a time.
+    :param permutation_key: The permutation key of the photo set.
+    :param photo_ID: The identifier number of the photo.
+    :param channel_count: The number of channel values being permuted.
+    :param length: The number of positions to generate.
+    :return: A generator of tuples (index of the chunk's first position, numpy array of positions).
+    """
+    # Indexes are stored in 32-bit words unless the photo is too large for that
+    index_bits = max(2, (channel_count - 1).bit_length())
+    word_type = np.uint32 if index_bits <= 32 else np.uint64
+    round_keys = getRoundKeys(permutation_key, photo_ID, word_type)
+
+    # Every channel value is only visited once, so asking for more positions than there are would never finish
+    length = min(length, channel_count)
+    offset = 0
+    domain_index = 0
+
+    while offset < length:
+        indexes = np.arange(domain_index, domain_index + CHUNK_SIZE, dtype=word_type)
+        positions = permuteIndexes(indexes, round_keys, index_bits)
+        domain_index += CHUNK_SIZE
+
+        # The domain is less than twice as large as the number of channel values, so most positions are kept.
+        # np.compress is several times faster than boolean indexing when the kept positions are this scattered.
+        positions = np.compress(positions < channel_count, positions)[:length - offset].astype(np.intp)
+
+        yield (offset, positions)
+        offset += len(positions)
+
+
+def getRoundKeys(permutation_key, photo_ID, word_type):
+    """
+    Derives the round keys and round multipliers of the Feistel network for a single photo.
+    :param permutation_key: The permutation key of the photo set.
+    :param photo_ID: The identifier number of the photo.
+    :param word_type: The numpy type the indexes are stored in (np.uint32 or np.uint64).
+    :return: A list of tuples (round key, odd round multiplier), both of type 'word_type'.
+    """
+    round_keys = []
+
+    for round_number in range(FEISTEL_ROUNDS):
+        digest = hashlib.blake2b(struct.pack('>HB', photo_ID, round_number), key=permutation_key, digest_size=16).digest()
+        key, multiplier = struct.unpack('>QQ', digest)
+
+        word_mask = np.iinfo(word_type).max
+        round_keys.append((word_type(key & word_mask), word_type((multiplier & word_mask) | 1)))
+
+    return round_keys
+
+
+def permuteIndexes(indexes, round_keys, index_bits):
+    """
+    Sends an array of indexes through the Feistel network.
+    :param indexes: A numpy array of indexes, each one below 2 ** index_bits.
+    :param round_keys: The round keys and multipliers of the network (see getRoundKeys).
+    :param index_bits: The number of bits in an index.
+    :return: A numpy array of the permuted indexes.
+    """
+    word_type = indexes.dtype.type
+    word_bits = indexes.dtype.itemsize * 8
+
+    left_bits = index_bits // 2
+    right_bits = index_bits - left_bits
+
+    left = indexes >> word_type(right_bits)
+    right = indexes & word_type((1 << right_bits) - 1)
+
+    # Every round works in place, since allocating new arrays takes about as long as the arithmetic itself
+    scratch = np.empty_like(indexes)
+
+    for round_key, multiplier in round_keys:
+        # The top 'left_bits' bits of the product are the ones that depend on every bit of the right half
+        np.add(right, round_key, out=scratch)
+        np.multiply(scratch, multiplier, out=scratch)
+        np.right_shift(scratch, word_type(word_bits - left_bits), out=scratch)
+        np.bitwise_xor(left, scratch, out=left)
+
+        left, right = right, left
+        left_bits, right_bits = right_bits, left_bits
+
+    np.left_shift(left, word_type(right_bits), out=left)
+    np.bitwise_or(left, right, out=left)
+
+    return left
@@ -0,0 +1,198 @@
+import numpy as np
+
+
+# With matrix embedding, hidden data is stored with a Hamming code instead of one bit per channel value. The channel
+# values are split into blocks of n = 2 ** k - 1, and each block holds k bits of hidden data in the syndrome of its
+# least significant bits: the XOR of the (1-based) positions of every least significant bit in the block that is set.
+# Any k bits can be stored by flipping at most one least significant bit per block (the one at the position given by
+# the XOR of the current syndrome and the bits being stored). A block that already stores the right bits is left
+# alone, so (1 - 2 ** -k) / k least significant bits change per hidden bit on average (0.29 for k = 3), instead of
+# half of one. In exchange, a photo only holds k / n bits per channel value.
+#
+# Hiding and reading work on the least significant bits of the channel values after they've been read in the
+# order the slice is stored in (see ChannelBuffers.readLSBs and KeyedPermutation.readKeyedLSBs), so matrix embedding
+# combines with keyed mode. Syndromes are computed a chunk of blocks at a time with a few numpy operations per chunk.
+MIN_MATRIX_BITS = 2
+MAX_MATRIX_BITS = 16
+
+# Number of least significant bits processed at a time, so the arrays of every chunk stay in the CPU cache
+CHUNK_SIZE = 2 ** 18
+
+# Up to this many bits per block, syndromes are computed one column of the blocks at a time, which is fastest for
+# short blocks. Longer blocks are reduced one row at a time instead.
+COLUMN_SYNDROME_LIMIT = 4
+
+
+def getMatrixCapacity(channel_count, matrix_bits):
+    """
+    Gets the number of bits that can be hidden in a run of channel values with matrix embedding.
+    :param channel_count: The number of channel values.
+    :param matrix_bits: The number of bits stored in every block (k).
+    :return: The number of bits that fit in the channel values' complete blocks.
+    """
+    return channel_count // getBlockSize(matrix_bits) * matrix_bits
+
+
+def getMatrixChannelCount(bit_count, matrix_bits):
+    """
+    Gets the number of channel values needed to hide a number of bits with matrix embedding.
+    :param bit_count: The number of bits to hide.
+    :param matrix_bits: The number of bits stored in every block (k).
+    :return: The number of channel values in the blocks holding the bits (the last block may be partly padding).
+    """
+    return -(-bit_count // matrix_bits) * getBlockSize(matrix_bits)
+
+
+def embedMatrixBits(cover_bits, bits, matrix_bits):
+    """
+    Works out the least significant bits that hide the given bits with matrix embedding.
+    :param cover_bits: The current least significant bits of the channel values that will hold the bits, as zeroes
+    and ones in a bytearray (getMatrixChannelCount(len(bits), matrix_bits) of them).
+    :param bits: The bits to hide, as zeroes and ones in a bytearray.
+    :param matrix_bits: The number of bits stored in every block (k).
+    :return: The new least significant bits, stored like 'cover_bits', which differ from them in at most one bit
+    per block.
+    """
+    block_size = getBlockSize(matrix_bits)
+    block_count = -(-len(bits) // matrix_bits)
+
+    # The last block is padded with zero bits, which are cut off again when the bits are read back
+    padded_bits = np.zeros(block_count * matrix_bits, dtype=np.uint8)
+    padded_bits[:len(bits)] = np.frombuffer(bits, dtype=np.uint8)
+
+    new_bits = np.frombuffer(cover_bits, dtype=np.uint8)[:block_count * block_size].copy()
+    blocks = new_bits.reshape(block_count, block_size)
+    chunk_blocks = max(1, CHUNK_SIZE // block_size)
+
+    for first_block in range(0, block_count, chunk_blocks):
+        last_block = min(first_block + chunk_blocks, block_count)
+
+        # The position to flip in every block is the XOR of the syndrome it has and the one it should have
+        flip_positions = computeSyndromes(blocks[first_block:last_block], matrix_bits)
+        flip_positions ^= packBlockBits(padded_bits[first_block * matrix_bits:last_block * matrix_bits], matrix_bits)
+
+        flipBlockBits(blocks[first_block:last_block], flip_positions, matrix_bits)
+
+    return bytearray(new_bits.tobytes())
+
+
+def extractMatrixBits(stored_bits, bit_count, matrix_bits):
+    """
+    Reads bits hidden with matrix embedding.
+    :param stored_bits: The least significant bits of the channel values holding the bits, as zeroes and ones in a
+    bytearray (getMatrixChannelCount(bit_count, matrix_bits) of them).
+    :param bit_count: The number of hidden bits.
+    :param matrix_bits: The number of bits stored in every block (k).
+    :return: The hidden bits, stored as zeroes and ones in a bytearray.
+    """
+    block_size = getBlockSize(matrix_bits)
+    block_count = -(-bit_count // matrix_bits)
+
+    blocks = np.frombuffer(stored_bits, dtype=np.uint8)[:block_count * block_size].reshape(block_count, block_size)
+    bits = np.empty(block_count * matrix_bits, dtype=np.uint8)
+    chunk_blocks = max(1, CHUNK_SIZE // block_size)
+
+    for first_block in range(0, block_count, chunk_blocks):
+        last_block = min(first_block + chunk_blocks, block_count)
+        syndromes = computeSyndromes(blocks[first_block:last_block], matrix_bits)
+        unpackBlockBits(syndromes, bits[first_block * matrix_bits:last_block * matrix_bits], matrix_bits)
+
+    return bytearray(bits[:bit_count].tobytes())
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def getBlockSize(matrix_bits):
+    """
+    Gets the number of channel values in every block.
+    :param matrix_bits: The number of bits stored in every block (k).
+    :return: The block size (2 ** k - 1).
+    """
+    return (1 << matrix_bits) - 1
+
+
+def getSyndromeType(matrix_bits):
+    """
+    Gets the smallest numpy type that can hold the syndrome of a block.
+    :param matrix_bits: The number of bits stored in every block (k).
+    :return: np.uint8 or np.uint16.
+    """
+    return np.uint8 if matrix_bits <= 8 else np.uint16
+
+
+def computeSyndromes(blocks, matrix_bits):
+    """
+    Computes the syndrome of every block of least significant bits.
+    :param blocks: A 2 dimensional numpy array of zeroes and ones, with one block per row.
+    :param matrix_bits: The number of bits stored in every block (k).
+    :return: A numpy array holding the syndrome of every block.
+    """
+    syndrome_type = getSyndromeType(matrix_bits)
+    positions = np.arange(1, blocks.shape[1] + 1, dtype=syndrome_type)
+
+    if matrix_bits > COLUMN_SYNDROME_LIMIT:
+        return np.bitwise_xor.reduce(blocks * positions, axis=1)
+
+    syndromes = np.zeros(len(blocks), dtype=syndrome_type)
+    column = np.empty(len(blocks), dtype=syndrome_type)
+
+    for index in range(blocks.shape[1]):
+        np.multiply(blocks[:, index], positions[index], out=column)
+        syndromes ^= column
+
+    return syndromes
+
+
+def flipBlockBits(blocks, flip_positions, matrix_bits):
+    """
+    Flips one bit in every block whose flip position isn't zero.
+    :param blocks: A 2 dimensional numpy array of zeroes and ones, with one block per row. This array is modified in
+    place.
+    :param flip_positions: A numpy array holding the (1-based) position of the bit to flip in every block, or zero
+    if the block already stores the right bits.
+    :param matrix_bits: The number of bits stored in every block (k).
+    """
+    # Most short blocks get a bit flipped, so comparing every column is faster than scattering the flips
+    if matrix_bits <= COLUMN_SYNDROME_LIMIT:
+        for index in range(blocks.shape[1]):
+            blocks[:, index] ^= flip_positions == index + 1
+        return
+
+    flipped_blocks = np.flatnonzero(flip_positions)
+    blocks[flipped_blocks, flip_positions[flipped_blocks] - 1] ^= 1
+
+
+def packBlockBits(bits, matrix_bits):
+    """
+    Turns every group of k bits into the syndrome that stores them, most significant bit first.
+    :param bits: A numpy array of zeroes and ones, whose length is a multiple of k.
+    :param matrix_bits: The number of bits stored in every block (k).
+    :return: A numpy array holding one syndrome per group of bits.
+    """
+    groups = bits.reshape(-1, matrix_bits).astype(getSyndromeType(matrix_bits))
+    syndromes = groups[:, 0].copy()
+
+    for index in range(1, matrix_bits):
+        syndromes <<= 1
+        syndromes |= groups[:, index]
+
+    return syndromes
+
+
+def unpackBlockBits(syndromes, bits, matrix_bits):
+    """
+    Turns every syndrome back into the k bits it stores (see packBlockBits).
+    :param syndromes: A numpy array of syndromes.
+    :param bits: The numpy array that the bits are stored in, k per syndrome. This array is modified in place.
+    :param matrix_bits: The number of bits stored in every block (k).
+    """
+    groups = bits.reshape(-1, matrix_bits)
+    shifted = np.empty_like(syndromes)
+
+    for index in range(matrix_bits):
+        np.right_shift(syndromes, matrix_bits - 1 - index, out=shifted)
+        shifted &= 1
+        groups[:, index] = shifted
@@ -0,0 +1,146 @@
+from Data_Converters import BinaryByteConverters
+from Image_Manipulation import ChannelBuffers
+import os, struct, sys, zlib
+
+
+# Every processed photo starts with a fixed size header, stored in the least significant bits of its first
+# channel values. The header makes each photo self-describing, so a single photo can be checked without
+# looking at any of the other photos in its set.
+#
+# Layout (big-endian): magic, version, followed by the fields listed in HEADER_FIELDS. These are the flags, photo ID,
+# photo count, number of parity photos in the set, total number of hidden bits in the set, index of this photo's
+# first hidden bit within the set, number of hidden bits in this photo and the CRC32 of those bits. Version 2 adds the
+# salt and scrypt parameters used to turn a passphrase into a key (see PassphraseKeys), which are zero if no
+# passphrase was used. Version 3 adds the number of bits stored in every block with matrix embedding (see
+# MatrixEmbedding), which is zero if the hidden data is stored one bit per channel value. Version 4 adds a random
+# set ID shared by every photo of a set, so photos from different sets (such as the groups of a batch, see
+# BatchDataHiding) are never mistaken for one set. Version 5 has the same fields, but its checksum also covers every
+# other header field (see computeChecksum), so an altered header is pinned to its photo just like altered data. Every
+# version only appends fields, so older headers are a prefix of the current one.
+HEADER_MAGIC = b'PXS2'
+HEADER_VERSION = 5
+HEADER_STRUCTS = {
+    1: struct.Struct('>4sBBHHHQQQI'),
+    2: struct.Struct('>4sBBHHHQQQI16sBBB'),
+    3: struct.Struct('>4sBBHHHQQQI16sBBBB'),
+    4: struct.Struct('>4sBBHHHQQQI16sBBBBQ'),
+    5: struct.Struct('>4sBBHHHQQQI16sBBBBQ'),
+}
+HEADER_STRUCT = HEADER_STRUCTS[HEADER_VERSION]
+HEADER_FIELDS = ('flags', 'photo_ID', 'photo_count', 'parity_count', 'total_bits', 'slice_offset', 'slice_bits', 'checksum',
+                 'salt', 'kdf_log_n', 'kdf_r', 'kdf_p', 'matrix_bits', 'set_ID')
+HEADER_BITS = HEADER_STRUCT.size * 8
+
+# The first version whose checksum covers the header fields
+HEADER_CHECKSUM_VERSION = 5
+
+# Values of fields that are left out (or missing from an older header), if they aren't zero
+HEADER_DEFAULTS = {'salt': bytes(16)}
+
+# Header flags
+FLAG_PARITY = 1
+FLAG_KEYED = 2
+FLAG_ENCRYPTED = 4
+
+
+def computeChecksum(bits, header_values):
+    """
+    Computes the checksum of a photo's header and slice of hidden data.
+    :param bits: The slice of hidden data, stored as zeroes and ones in a bytearray.
+    :param header_values: The values of the photo's header (see createPhotoHeader). Headers older than
+    HEADER_CHECKSUM_VERSION have a checksum of the slice only. Others are checked as packed, with the checksum itself
+    left as zero.
+    :return: The CRC32 checksum of the header and the slice.
+    """
+    version = header_values.get('version', HEADER_VERSION)
+    checksum = 0
+
+    if version >= HEADER_CHECKSUM_VERSION:
+        checksum = zlib.crc32(packPhotoHeader(dict(header_values, checksum=0), version))
+
+    return zlib.crc32(bits, checksum)
+
+
+def createSetID():
+    """
+    Creates the random identifier that every photo of a new photo set shares.
+    :return: The set ID, a 64-bit number.
+    """
+    return int.from_bytes(os.urandom(8), 'big')
+
+
+def createPhotoHeader(header_values):
+    """
+    Creates the header that gets stored at the start of a processed photo.
+    :param header_values: A dictionary containing the values of the header fields (see HEADER_FIELDS). Fields that
+    are left out are stored as zero.
+    - photo_ID: The identifier number of the photo (0 to photo_count - 1).
+    - photo_count: The total number of photos the hidden data is spread across (including parity photos).
+    - parity_count: The number of those photos that hold parity data (see ErasureCoding).
+    - total_bits: The total number of bits of data hidden in the whole photo set.
+    - slice_offset: The index of the first bit (within all hidden data) that is stored in this photo.
+    - slice_bits: The number of bits of hidden data stored in this photo.
+    - checksum: The checksum of the header and the bits stored in this photo (see computeChecksum).
+    - flags: Bit flags describing how the hidden data was stored.
+    - salt, kdf_log_n, kdf_r, kdf_p: The salt and scrypt parameters of the passphrase (see PassphraseKeys).
+    - matrix_bits: The number of bits stored in every block with matrix embedding, or zero (see MatrixEmbedding).
+    - set_ID: The random identifier shared by every photo of the set (see createSetID).
+    :return: The header, represented as a bytearray of bits.
+    """
+    return BinaryByteConverters.convertBytesToBinaryByteArray(packPhotoHeader(header_values, HEADER_VERSION))
+
+
+def packPhotoHeader(header_values, version):
+    """
+    Packs the values of a photo header into the layout of the given header version.
+    :param header_values: A dictionary containing the values of the header fields (see createPhotoHeader).
+    :param version: The header version (see HEADER_STRUCTS).
+    :return: The packed header as bytes.
+    """
+    header_struct = HEADER_STRUCTS[version]
+
+    # The format holds the magic and the version before the fields, and 16s is a single field
+    field_count = len(header_struct.unpack(bytes(header_struct.size))) - 2
+    values = [header_values.get(field, HEADER_DEFAULTS.get(field, 0)) for field in HEADER_FIELDS[:field_count]]
+
+    return header_struct.pack(HEADER_MAGIC, version, *values)
+
+
+def readPhotoHeader(channels):
+    """
+    Reads the header stored at the start of a processed photo.
+    :param channels: The channel values of the photo (see ChannelBuffers.openChannelBuffer).
+    :return: A dictionary containing all header values, along with the header version ('version') and the size of
+    the header in bits ('header_bits', which is where the photo's hidden data starts), or None if the photo does not contain a header (for example a
+    photo processed with the legacy format, or a photo that never had any data hidden in it).
+    """
+    # The oldest header is read first, since it's the smallest and tells which version the rest of the header has
+    oldest_bits = HEADER_STRUCTS[1].size * 8
+    if len(channels) < oldest_bits:
+        return None
+
+    header = BinaryByteConverters.convertBinaryByteArrayToBytes(ChannelBuffers.readLSBs(channels, 0, oldest_bits))
+    magic, version = header[:4], header[4]
+
+    if magic != HEADER_MAGIC:
+        return None
+
+    # Photos written by a newer version of this program can't be read safely
+    if version not in HEADER_STRUCTS:
+        print("Error - Unsupported photo header version (" + str(version) + ").")
+        sys.exit(1)
+
+    header_bits = HEADER_STRUCTS[version].size * 8
+    if len(channels) < header_bits:
+        return None
+
+    header = BinaryByteConverters.convertBinaryByteArrayToBytes(ChannelBuffers.readLSBs(channels, 0, header_bits))
+    magic, version, *values = HEADER_STRUCTS[version].unpack(header)
+
+    # Fields missing from older headers get their default values
+    header_values = {field: HEADER_DEFAULTS.get(field, 0) for field in HEADER_FIELDS}
+    header_values.update(zip(HEADER_FIELDS, values))
+    header_values['version'] = version
+    header_values['header_bits'] = header_bits
+
+    return header_values
@@ -0,0 +1,272 @@
+from Image_Manipulation import PhotoHeaders
+from bisect import bisect_left
+from itertools import accumulate
+
+
+# Every photo that gets used costs a full decode and encode of all of its pixels, no matter how little data it ends
+# up storing. The planner chooses which photos to use (and in which order) based on their capacities, which are
+# exactly one bit per usable channel value minus the photo header, so the number of channel values of a photo (its
+# pixels times its usable bands, see CarrierFormats) follows from its capacity and is used as its cost.
+#
+# Strategies:
+#   best-fit:      uses the set of photos with the fewest total channel values. A quick plan is made first (while no single
+#                  unused photo can hold the rest of the data, the largest photo that can't is taken, and the cheapest
+#                  of the plans that finish with the smallest photo able to hold the rest wins), and is then improved
+#                  by a branch and bound search over all subsets, which stops after SEARCH_STEP_LIMIT steps.
+#   fewest-images: uses as few photos as possible, and among those, photos that are as small as possible.
+#   largest-first: fills the largest photos first.
+PACKING_STRATEGIES = ('best-fit', 'fewest-images', 'largest-first')
+DEFAULT_PACKING_STRATEGY = 'best-fit'
+
+# Finding the cheapest subset is NP-hard in general, so the search for it is cut off after this many steps (which
+# takes well under a second), keeping the best plan found up to that point
+SEARCH_STEP_LIMIT = 200000
+
+
+def getChannelCost(capacity):
+    """
+    Gets the number of channel values that have to be decoded and encoded to use a photo.
+    :param capacity: The number of bits the photo can hold (see ImageDataHiding.getNumBitsAvailableToHide).
+    :return: The number of usable channel values in the photo.
+    """
+    return capacity + PhotoHeaders.HEADER_BITS
+
+
+def getPlanChannelCost(photos, capacities):
+    """
+    Gets the total number of channel values that have to be decoded and encoded to use a set of photos.
+    :param photos: The names of the photos.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :return: The total number of usable channel values in the photos.
+    """
+    return sum(getChannelCost(capacities[photo]) for photo in photos)
+
+
+def createPackingPlan(num_bits, capacities, strategy=DEFAULT_PACKING_STRATEGY):
+    """
+    Chooses the photos that data gets hidden in.
+    :param num_bits: The total number of bits that will be hidden.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold. Together, the
+    photos must be able to hold 'num_bits'.
+    :param strategy: One of PACKING_STRATEGIES.
+    :return: The list of photo names to use, in the order the data should be spread across them. Every photo except
+    the last one gets filled completely.
+    """
+    # Sorting by name as well keeps plans the same across file systems when capacities are equal
+    photos = sorted(capacities, key=lambda photo: (-capacities[photo], photo))
+
+    if strategy == 'largest-first':
+        return planLargestFirst(num_bits, photos, capacities)
+
+    if strategy == 'fewest-images':
+        return planFewestImages(num_bits, photos, capacities)
+
+    return planBestFit(num_bits, photos, capacities)
+
+
+def createParityPackingPlan(num_bytes, parity_photos, capacities, max_shards, strategy=DEFAULT_PACKING_STRATEGY):
+    """
+    Chooses the photos that data gets hidden in when parity photos are requested. The data is split into k equally
+    sized shards and m parity shards get added, so every chosen photo must be able to hold one shard.
+    :param num_bytes: The total number of bytes that will be hidden (before adding parity).
+    :param parity_photos: The number of parity shards (m).
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :param max_shards: The largest number of shards (k + m) that can be created.
+    :param strategy: One of PACKING_STRATEGIES. 'largest-first' uses the largest photos and 'fewest-images' uses the
+    smallest photos that can hold the shards of the smallest possible k. 'best-fit' tries every k and uses the one
+    with the fewest total channel values.
+    :return: A tuple containing the number of data shards (k) and the list of k + m photo names to use, or None if
+    the data can't be hidden with this many parity photos.
+    """
+    photos = sorted(capacities, key=lambda photo: (capacities[photo], photo))
+    sorted_capacities = [capacities[photo] for photo in photos]
+
+    best_plan = None
+    best_cost = None
+
+    for data_photos in range(1, min(len(photos), max_shards) - parity_photos + 1):
+        shard_bits = 8 * max(1, -(-num_bytes // data_photos))
+
+        # The smallest photos that can still hold one shard each
+        first = bisect_left(sorted_capacities, shard_bits)
+        if len(photos) - first < data_photos + parity_photos:
+            continue
+
+        if strategy == 'largest-first':
+            chosen = photos[::-1][:data_photos + parity_photos]
+        else:
+            chosen = photos[first:first + data_photos + parity_photos]
+
+        cost = getPlanChannelCost(chosen, capacities)
+
+        if best_plan is None or cost < best_cost:
+            best_plan = (data_photos, chosen)
+            best_cost = cost
+
+        if strategy != 'best-fit':
+            break
+
+    return best_plan
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def planLargestFirst(num_bits, photos, capacities):
+    """
+    Fills the largest photos first, until all data has been assigned. (Part of createPackingPlan)
+    :param num_bits: The total number of bits that will be hidden.
+    :param photos: All photo names, sorted from the largest photo to the smallest.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :return: The list of photo names to use.
+    """
+    plan = []
+    remaining_bits = num_bits
+
+    # At least one photo is always used, even when there is no data
+    for photo in photos:
+        plan.append(photo)
+        remaining_bits -= capacities[photo]
+
+        if remaining_bits <= 0:
+            break
+
+    return plan
+
+
+def planFewestImages(num_bits, photos, capacities):
+    """
+    Uses as few photos as possible, and then swaps each chosen photo (smallest first) for the smallest unused photo
+    that still leaves enough room for all data. (Part of createPackingPlan)
+    :param num_bits: The total number of bits that will be hidden.
+    :param photos: All photo names, sorted from the largest photo to the smallest.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :return: The list of photo names to use.
+    """
+    plan = planLargestFirst(num_bits, photos, capacities)
+    spare_bits = sum(capacities[photo] for photo in plan) - num_bits
+
+    unused_photos = photos[len(plan):][::-1]
+    unused_capacities = [capacities[photo] for photo in unused_photos]
+
+    for position in range(len(plan) - 1, -1, -1):
+        capacity = capacities[plan[position]]
+
+        # The smallest unused photo that is at least as large as this photo minus the spare room
+        index = bisect_left(unused_capacities, capacity - spare_bits)
+        if index == len(unused_photos) or unused_capacities[index] >= capacity:
+            continue
+
+        replacement = unused_photos.pop(index)
+        spare_bits -= capacity - unused_capacities.pop(index)
+
+        index = bisect_left(unused_capacities, capacity)
+        unused_photos.insert(index, plan[position])
+        unused_capacities.insert(index, capacity)
+
+        plan[position] = replacement
+
+    return sorted(plan, key=lambda photo: (-capacities[photo], photo))
+
+
+def planBestFit(num_bits, photos, capacities):
+    """
+    Builds the plans that take the largest photos which can't hold the rest of the data, one at a time, and finish
+    with the smallest photo that can, and returns the plan with the fewest total channel values. (Part of createPackingPlan)
+    :param num_bits: The total number of bits that will be hidden.
+    :param photos: All photo names, sorted from the largest photo to the smallest.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :return: The list of photo names to use.
+    """
+    unused_photos = photos[::-1]
+    unused_capacities = [capacities[photo] for photo in unused_photos]
+
+    taken_photos = []
+    taken_cost = 0
+    remaining_bits = num_bits
+
+    best_plan = None
+    best_cost = None
+
+    while len(unused_photos) > 0:
+        # The smallest photo that can hold all of the remaining data finishes a plan
+        index = bisect_left(unused_capacities, remaining_bits)
+
+        if index < len(unused_photos):
+            cost = taken_cost + getChannelCost(unused_capacities[index])
+            if best_plan is None or cost < best_cost:
+                best_plan = taken_photos + [unused_photos[index]]
+                best_cost = cost
+
+        # Otherwise the largest photo that can't hold all of it gets filled completely
+        if index == 0:
+            break
+
+        photo = unused_photos.pop(index - 1)
+        capacity = unused_capacities.pop(index - 1)
+
+        taken_photos.append(photo)
+        taken_cost += getChannelCost(capacity)
+        remaining_bits -= capacity
+
+    # Only happens if the photos can't hold all data, which is checked before planning
+    if best_plan is None:
+        return taken_photos
+
+    return searchCheapestPlan(num_bits, photos, capacities, best_plan)
+
+
+def searchCheapestPlan(num_bits, photos, capacities, initial_plan):
+    """
+    Searches for the set of photos with the fewest total channel values that can hold all data, going through the photos from
+    largest to smallest and deciding for each one whether it gets used. Branches that can't beat the best plan found
+    so far are skipped. (Part of planBestFit)
+    :param num_bits: The total number of bits that will be hidden.
+    :param photos: All photo names, sorted from the largest photo to the smallest.
+    :param capacities: A dictionary mapping photo names to the number of bits each photo can hold.
+    :param initial_plan: A plan that can hold all data, which the search tries to improve on.
+    :return: The list of photo names to use, sorted from the largest photo to the smallest.
+    """
+    photo_capacities = [capacities[photo] for photo in photos]
+    channel_costs = [getChannelCost(capacity) for capacity in photo_capacities]
+
+    # remaining_capacities[i] is the total capacity of photos[i:]
+    remaining_capacities = list(accumulate(photo_capacities[::-1], initial=0))[::-1]
+
+    best_cost = getPlanChannelCost(initial_plan, capacities)
+    best_chosen = None
+
+    # Each step holds the next photo to decide on, the bits still to be placed, the cost so far and the chosen
+    # photo indexes (as a linked list of tuples, so that steps share them instead of copying)
+    steps = [(0, num_bits, 0, None)]
+    step_count = 0
+
+    while len(steps) > 0 and step_count < SEARCH_STEP_LIMIT:
+        index, remaining_bits, cost, chosen = steps.pop()
+        step_count += 1
+
+        if remaining_bits <= 0 and chosen is not None:
+            if cost < best_cost:
+                best_cost = cost
+                best_chosen = chosen
+            continue
+
+        # Every plan needs at least one channel value per remaining bit, and the photos left must be able to hold them
+        if index == len(photos) or remaining_capacities[index] < remaining_bits or cost + getChannelCost(remaining_bits) >= best_cost:
+            continue
+
+        # Skipping the photo is pushed first, so that using it gets explored first
+        steps.append((index + 1, remaining_bits, cost, chosen))
+        steps.append((index + 1, remaining_bits - photo_capacities[index], cost + channel_costs[index], (index, chosen)))
+
+    if best_chosen is None:
+        return initial_plan
+
+    plan = []
+    while best_chosen is not None:
+        index, best_chosen = best_chosen
+        plan.append(photos[index])
+
+    return plan[::-1]
@@ -0,0 +1,285 @@
+import numpy as np
+from Image_Manipulation import CarrierFormats, ImageDataExtraction
+from concurrent.futures import ProcessPoolExecutor
+import csv, json, math, os, sys
+
+
+# Quality metrics compare every processed photo with the input photo it was made from, to show how much hiding data
+# distorted it and how easily the hidden data could be detected. Only the usable samples (see
+# CarrierFormats.getUsableBands) are compared, since those are the only ones hiding data can change.
+#
+# - psnr: the peak signal-to-noise ratio in decibels (higher is less distorted, None if nothing changed)
+# - changed_lsb_ratio: the share of samples whose least significant bit changed
+# - chi_square and chi_square_probability: the chi-square attack of Westfeld and Pfitzmann on the processed photo.
+#   Hiding random bits evens out the histogram counts of every pair of values 2k and 2k + 1, so a probability close
+#   to 1 means the hidden data is likely to be detected. input_chi_square_probability is the same for the input photo.
+# - pair_delta and input_pair_delta: the summed differences between the counts of every pair of values, as a share
+#   of all samples, for the processed and the input photo. The more the pair delta drops, the more detectable.
+REPORT_FORMATS = ('csv', 'json')
+REPORT_COLUMNS = ['photo', 'samples', 'psnr', 'changed_lsb_ratio', 'chi_square', 'chi_square_probability',
+                  'input_chi_square_probability', 'pair_delta', 'input_pair_delta']
+
+# numpy types of the samples of every carrier mode, by (bytes per sample, index of the least significant byte)
+SAMPLE_TYPES = {(1, 0): np.uint8, (2, 0): '<u2', (2, 1): '>u2', (4, 0): '<i4', (4, 3): '>i4'}
+
+# Samples are compared this many at a time, so no full size copy of a photo is ever made
+CHUNK_SIZE = 2 ** 22
+
+# Pairs of values that occur fewer times than this are left out of the chi-square test, which is unreliable for them
+MIN_PAIR_COUNT = 10
+
+
+def createQualityReport(path_to_input_photos, path_to_processed_photos, report_path, report_format='csv'):
+    """
+    Measures every processed photo against its input photo (in parallel) and saves the results as a report.
+    :param path_to_input_photos: The path to the folder containing the input photos.
+    :param path_to_processed_photos: The path to the folder containing the processed photos.
+    :param report_path: The path that the report will be saved to.
+    :param report_format: The format of the report, 'csv' or 'json' (see REPORT_FORMATS).
+    """
+    processed_paths = ImageDataExtraction.listPhotoPaths(path_to_processed_photos)
+    input_paths = [os.path.join(path_to_input_photos, os.path.basename(path)) for path in processed_paths]
+
+    for input_path in input_paths:
+        if not os.path.isfile(input_path):
+            print("Error - The input photo " + os.path.basename(input_path) + " that a processed photo was made from is missing.")
+            sys.exit(1)
+
+    print("Measuring " + str(len(processed_paths)) + " photo(s)...")
+
+    with ProcessPoolExecutor() as executor:
+        metrics_list = list(executor.map(measurePhoto, input_paths, processed_paths))
+
+    for metrics in metrics_list:
+        psnr = "identical" if metrics['psnr'] is None else "PSNR " + str(round(metrics['psnr'], 2)) + " dB"
+        probability = metrics['chi_square_probability']
+        print("-> " + metrics['photo'] + ": " + psnr + ", " + str(round(metrics['changed_lsb_ratio'] * 100, 2)) +
+              "% of LSBs changed, chi-square detection probability " + ("n/a" if probability is None else str(round(probability, 3))))
+
+    writeQualityReport(metrics_list, report_path, report_format)
+
+    print("\nThe quality report was saved to " + report_path)
+
+
+def measurePhoto(input_path, processed_path):
+    """
+    Computes all quality metrics of a single processed photo.
+    :param input_path: The path to the input photo the processed photo was made from.
+    :param processed_path: The path to the processed photo.
+    :return: A dictionary holding the name of the photo ('photo'), its number of usable samples ('samples') and every
+    metric listed in REPORT_COLUMNS.
+    """
+    input_values, input_carrier = openSampleValues(input_path)
+    values, carrier = openSampleValues(processed_path)
+
+    if carrier['mode'] != input_carrier['mode'] or carrier['size'] != input_carrier['size']:
+        print("Error - " + os.path.basename(processed_path) + " does not have the same mode and size as its input photo.")
+        sys.exit(1)
+
+    sample_count = len(values)
+
+    if values.dtype == np.uint8:
+        squared_error, changed_lsbs, histogram, input_histogram = compareByteSamples(input_values, values)
+    else:
+        squared_error, changed_lsbs, histogram, input_histogram = compareWideSamples(input_values, values)
+
+    bands, sample_size, lsb_index, has_alpha = CarrierFormats.CARRIER_MODES[carrier['mode']]
+    # Samples wider than 8 bits always come from 16-bit photos, including the 32-bit samples of mode 'I'
+    peak = 255 if sample_size == 1 else 65535
+    psnr = None
+    if squared_error > 0:
+        psnr = 10 * math.log10(peak ** 2 * sample_count / squared_error)
+
+    chi_square, chi_square_probability = getChiSquareAttack(histogram)
+
+    return {
+        'photo': os.path.basename(processed_path),
+        'samples': sample_count,
+        'psnr': psnr,
+        'changed_lsb_ratio': changed_lsbs / max(1, sample_count),
+        'chi_square': chi_square,
+        'chi_square_probability': chi_square_probability,
+        'input_chi_square_probability': getChiSquareAttack(input_histogram)[1],
+        'pair_delta': getPairDelta(histogram, sample_count),
+        'input_pair_delta': getPairDelta(input_histogram, sample_count),
+    }
+
+
+def writeQualityReport(metrics_list, report_path, report_format='csv'):
+    """
+    Saves the quality metrics of a set of photos as a CSV file (one row per photo) or as a JSON list.
+    :param metrics_list: The metrics of every photo (see measurePhoto).
+    :param report_path: The path that the report will be saved to.
+    :param report_format: The format of the report, 'csv' or 'json' (see REPORT_FORMATS).
+    """
+    try:
+        with open(report_path, 'w', newline='') as file:
+            if report_format == 'json':
+                json.dump(metrics_list, file, indent=2)
+                file.write('\n')
+            else:
+                writer = csv.DictWriter(file, fieldnames=REPORT_COLUMNS)
+                writer.writeheader()
+                writer.writerows(metrics_list)
+    except OSError as e:
+        print("Error - Unable to save the quality report to " + report_path + " (" + str(e) + ").")
+        sys.exit(1)
+
+
+# ********************************************************************
+# HELPER FUNCTIONS...
+# ********************************************************************
+
+
+def openSampleValues(photo_path):
+    """
+    Decodes a photo into the values of its usable samples.
+    :param photo_path: The path to the photo.
+    :return: A tuple containing the sample values (a flat numpy array, ordered like the channels of
+    ChannelBuffers.openChannelBuffer) and the dictionary describing the carrier (see CarrierFormats.openCarrier).
+    """
+    samples, carrier = CarrierFormats.openCarrier(photo_path)
+    bands, sample_size, lsb_index, has_alpha = CarrierFormats.CARRIER_MODES[carrier['mode']]
+
+    values = np.frombuffer(samples, dtype=SAMPLE_TYPES[(sample_size, lsb_index)])
+
+    # The samples of an alpha channel that holds no hidden data are left out
+    if carrier['usable_bands'] < bands:
+        values = values.reshape(-1, bands)[:, :carrier['usable_bands']].ravel()
+
+    return (values, carrier)
+
+
+def compareByteSamples(input_values, values):
+    """
+    Compares the 8-bit samples of an input photo and a processed photo using their joint histogram, which counts
+    every pair of input and processed values. Every metric can be read from it, so each sample is only visited once.
+    :param input_values: The sample values of the input photo (a numpy array of uint8).
+    :param values: The sample values of the processed photo, in the same order.
+    :return: A tuple containing the summed squared differences, the number of changed least significant bits and the
+    histograms of the processed and the input values (numpy arrays of counts, indexed by value).
+    """
+    joint_histogram = np.zeros(256 * 256, dtype=np.int64)
+
+    for start in range(0, len(values), CHUNK_SIZE):
+        pair_indexes = input_values[start:start + CHUNK_SIZE].astype(np.uint16)
+        pair_indexes <<= 8
+        pair_indexes |= values[start:start + CHUNK_SIZE]
+        joint_histogram += np.bincount(pair_indexes, minlength=256 * 256)
+
+    # Row i and column j count the samples that changed from value i to value j
+    joint_histogram = joint_histogram.reshape(256, 256)
+    input_levels, levels = np.indices((256, 256))
+    squared_error = float(np.sum(joint_histogram * (levels - input_levels) ** 2))
+    changed_lsbs = int(np.sum(joint_histogram[(levels ^ input_levels) & 1 == 1]))
+
+    return (squared_error, changed_lsbs, joint_histogram.sum(axis=0), joint_histogram.sum(axis=1))
+
+
+def compareWideSamples(input_values, values):
+    """
+    Compares the samples of an input photo and a processed photo that are wider than 8 bits, whose joint histogram
+    would be too large. Works like compareByteSamples.
+    :param input_values: The sample values of the input photo (a numpy array).
+    :param values: The sample values of the processed photo, in the same order.
+    :return: A tuple containing the summed squared differences, the number of changed least significant bits and the
+    histograms of the processed and the input values (numpy arrays of counts, indexed by value).
+    """
+    squared_error = 0.0
+    changed_lsbs = 0
+    histogram = np.zeros(0, dtype=np.int64)
+    input_histogram = np.zeros(0, dtype=np.int64)
+
+    for start in range(0, len(values), CHUNK_SIZE):
+        chunk = values[start:start + CHUNK_SIZE]
+        input_chunk = input_values[start:start + CHUNK_SIZE]
+
+        # Differences are summed as floats so that numpy can use its fast dot product
+        difference = chunk.astype(np.float64)
+        difference -= input_chunk
+        squared_error += float(np.dot(difference, difference))
+
+        changed = np.bitwise_xor(chunk, input_chunk)
+        changed &= 1
+        changed_lsbs += int(np.count_nonzero(changed))
+
+        histogram = addHistograms(histogram, np.bincount(chunk))
+        input_histogram = addHistograms(input_histogram, np.bincount(input_chunk))
+
+    return (squared_error, changed_lsbs, histogram, input_histogram)
+
+
+def addHistograms(histogram, other_histogram):
+    """
+    Adds two histograms of sample values, which may have different lengths.
+    :param histogram: The first histogram (a numpy array of counts, indexed by value).
+    :param other_histogram: The second histogram.
+    :return: The summed histogram, as long as the longer of the two.
+    """
+    if len(other_histogram) > len(histogram):
+        histogram, other_histogram = other_histogram, histogram
+
+    histogram = histogram.astype(np.int64)
+    histogram[:len(other_histogram)] += other_histogram
+
+    return histogram
+
+
+def getPairCounts(histogram):
+    """
+    Splits a histogram of sample values into the counts of the even and odd value of every pair 2k and 2k + 1.
+    :param histogram: The histogram (a numpy array of counts, indexed by value).
+    :return: A tuple containing the counts of the even values and the counts of the odd values (numpy arrays).
+    """
+    if len(histogram) % 2 == 1:
+        histogram = np.append(histogram, 0)
+
+    return (histogram[0::2], histogram[1::2])
+
+
+def getChiSquareAttack(histogram):
+    """
+    Runs the chi-square attack on a histogram of sample values, which tests whether the counts of every pair of
+    values 2k and 2k + 1 are as equal as hiding random bits in every least significant bit would make them.
+    :param histogram: The histogram (a numpy array of counts, indexed by value).
+    :return: A tuple containing the chi-square statistic and the probability that data is hidden in the samples
+    (both None if too few pairs of values occur often enough to be tested).
+    """
+    even_counts, odd_counts = getPairCounts(histogram)
+    pair_counts = even_counts + odd_counts
+    tested = pair_counts >= MIN_PAIR_COUNT
+    degrees_of_freedom = int(np.count_nonzero(tested)) - 1
+
+    if degrees_of_freedom < 1:
+        return (None, None)
+
+    expected_counts = pair_counts[tested] / 2
+    chi_square = float(np.sum((even_counts[tested] - expected_counts) ** 2 / expected_counts))
+
+    return (chi_square, getChiSquareTailProbability(chi_square, degrees_of_freedom))
+
+
+def getChiSquareTailProbability(chi_square, degrees_of_freedom):
+    """
+    Gets the probability that a chi-square distributed value is at least as large as the given one, using the
+    Wilson-Hilferty approximation (accurate to about 0.01 for the degrees of freedom that photos give).
+    :param chi_square: The chi-square statistic.
+    :param degrees_of_freedom: The degrees of freedom of the statistic.
+    :return: The probability, between 0 and 1.
+    """
+    variance = 2 / (9 * degrees_of_freedom)
+    z = ((chi_square / degrees_of_freedom) ** (1 / 3) - (1 - variance)) / math.sqrt(variance)
+
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def getPairDelta(histogram, sample_count):
+    """
+    Sums the differences between the counts of the even and odd value of every pair 2k and 2k + 1.
+    :param histogram: The histogram (a numpy array of counts, indexed by value).
+    :param sample_count: The number of samples the histogram was made from.
+    :return: The summed differences as a share of all samples, between 0 and 1.
+    """
+    even_counts, odd_counts = getPairCounts(histogram)
+
+    return int(np.sum(np.abs(even_counts - odd_counts))) / max(1, sample_count)
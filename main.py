@@ -1,26 +1,40 @@
-from Image_Manipulation import ImageDataExtraction, ImageDataHiding
+import argparse
 import os
+import sys
+
+# Only lightweight standard library modules are imported at startup. Pillow and the image manipulation
+# modules are imported inside each subcommand so that the interpreter only pays for what the chosen mode needs.
+
+__version__ = "1.1.0"
+
+KEYED_HELP = ("Spread the hidden data over the photos in an order that depends on a passphrase. The passphrase is "
+              "prompted for, or read from the PIXSAFE_PASSPHRASE environment variable.")
+PASSPHRASE_HELP = ("Enter the passphrase the photos were hidden with (needed for photos hidden with --keyed or --encrypt). "
+                   "The passphrase is prompted for, or read from the PIXSAFE_PASSPHRASE environment variable.")
+GROUP_HELP = "Use the photos of the group NAME of a batch, which are located in 'Processed_Photos/NAME'."
+RESUME_HELP = ("Continue an interrupted run of the same job from where it stopped, keeping the work it already completed. "
+               "Without it, an interrupted run's work is discarded.")
 
 
 def main():
     # Stored directory containing your local computer's path up to this project directory
     script_directory = os.path.dirname(os.path.abspath(__file__))
-       
+
     """
     ***
     PASTE THE LOCATION OF THE DATA YOU WANT HIDDEN IN THIS VARIABLE!!
     (Otherwise, the given default path will be used)
     ***
 
-    If the path leads to a folder, add an extra '/' at the end of the path if you only 
-    want to hide the contents of all data located inside of the folder. Otherwise, the 
+    If the path leads to a folder, add an extra '/' at the end of the path if you only
+    want to hide the contents of all data located inside of the folder. Otherwise, the
     program will hide the folder itself as well, containing all the contents.
     """
     PATH_TO_DATA_YOU_WANT_HIDDEN = ""
 
 
     '''
-    If a path is not specified by the user, then a default path to a folder will be 
+    If a path is not specified by the user, then a default path to a folder will be
     used which the user can paste any data into that they want hidden.
     '''
     if PATH_TO_DATA_YOU_WANT_HIDDEN == "":
@@ -29,18 +43,270 @@ def main():
     path_to_input_photos = script_directory + '/Input_Photos'
     path_to_processed_photos = script_directory + '/Processed_Photos'
     path_to_paste_data = script_directory + '/Extracted_Data'
+    path_to_carrier_cache = script_directory + '/Carrier_Cache'
+    path_to_quality_report = script_directory + '/Quality_Report'
+
+    args = createArgumentParser().parse_args()
+
+    if args.command == 'info':
+        printProgramInfo(script_directory)
+        return
+
+    # No subcommand given, so the user is prompted for a mode just like before
+    if args.command is None:
+        print("Enter 1 to hide data in an image set.")
+        print("Enter 2 to extract data from an image set")
+        num = input()
+        print("***")
+
+        if num == '1':
+            args.command = 'hide'
+            args.data = None
+            args.parity = 0
+            args.strategy = 'best-fit'
+            args.no_cache = False
+            args.cache_scratch = None
+            args.matrix = 0
+        elif num == '2':
+            args.command = 'extract'
+            args.allow_legacy_pickle = False
+        else:
+            print("Invalid response.")
+            return
+
+    # Asked for before any photos are opened, so a typo doesn't waste a long run. Planning never needs it, since
+    # the passphrase doesn't change how much space the data takes.
+    passphrase = None
+    if (args.keyed or args.encrypt) and args.command != 'plan':
+        passphrase = getPassphrase(confirm=args.command in ('hide', 'batch'))
+
+    # The groups of a batch are each saved to their own folder, and each one is extracted to its own folder too
+    if args.group is not None:
+        path_to_processed_photos = os.path.join(path_to_processed_photos, args.group)
+        path_to_paste_data = os.path.join(path_to_paste_data, args.group)
+
+    if args.command == 'hide':
+        from Image_Manipulation import CarrierCache, ImageDataHiding
+
+        if args.data is not None:
+            PATH_TO_DATA_YOU_WANT_HIDDEN = args.data
+
+        carrier_cache = None
+        if not args.no_cache:
+            scratch_limit = None if args.cache_scratch is None else args.cache_scratch * 10 ** 6
+            carrier_cache = CarrierCache.openCarrierCache(path_to_carrier_cache, scratch_limit)
+
+        ImageDataHiding.hideDataInImages(PATH_TO_DATA_YOU_WANT_HIDDEN, path_to_input_photos, path_to_processed_photos,
+                                         args.parity, args.strategy, carrier_cache, passphrase, args.keyed, args.encrypt,
+                                         args.matrix, args.resume)
+
+        if carrier_cache is not None:
+            CarrierCache.closeCarrierCache(carrier_cache)
+    elif args.command == 'plan':
+        from Image_Manipulation import CarrierCache, ImageDataHiding
+
+        if args.data is not None:
+            PATH_TO_DATA_YOU_WANT_HIDDEN = args.data
+
+        carrier_cache = None
+        if not args.no_cache:
+            carrier_cache = CarrierCache.openCarrierCache(path_to_carrier_cache)
+
+        ImageDataHiding.planDataHiding(PATH_TO_DATA_YOU_WANT_HIDDEN, path_to_input_photos, args.parity, args.strategy,
+                                       carrier_cache, args.encrypt, args.matrix)
+
+        if carrier_cache is not None:
+            CarrierCache.closeCarrierCache(carrier_cache)
+    elif args.command == 'batch':
+        from Image_Manipulation import BatchDataHiding, CarrierCache
+
+        carrier_cache = None
+        if not args.no_cache:
+            carrier_cache = CarrierCache.openCarrierCache(path_to_carrier_cache)
+
+        BatchDataHiding.hideBatchInImages(args.manifest, path_to_input_photos, path_to_processed_photos, args.parity,
+                                          args.strategy, carrier_cache, passphrase, args.keyed, args.encrypt, args.matrix)
+
+        if carrier_cache is not None:
+            CarrierCache.closeCarrierCache(carrier_cache)
+    elif args.command == 'extract':
+        from Image_Manipulation import ImageDataExtraction
+
+        if args.group is not None:
+            os.makedirs(os.path.dirname(path_to_paste_data), exist_ok=True)
+
+        ImageDataExtraction.extractDataFromImages(path_to_processed_photos, path_to_paste_data, args.allow_legacy_pickle, passphrase,
+                                                  args.resume)
+    elif args.command == 'verify':
+        from Image_Manipulation import ImageDataVerification
+
+        ImageDataVerification.verifyImages(path_to_processed_photos, passphrase)
+    elif args.command == 'metrics':
+        from Image_Manipulation import QualityMetrics
+
+        report_path = args.report
+        if report_path is None:
+            report_path = path_to_quality_report + '.' + args.format
+
+        QualityMetrics.createQualityReport(path_to_input_photos, path_to_processed_photos, report_path, args.format)
+
+
+def createArgumentParser():
+    """
+    Creates the command line parser for all of the program's subcommands.
+    :return: The argument parser. If no subcommand is given, 'command' is None and the interactive prompt is used.
+    """
+    parser = argparse.ArgumentParser(description="Hide data inside of png images, or extract previously hidden data.")
+    parser.add_argument('--version', action='version', version="%(prog)s " + __version__)
+
+    # Only hiding can encrypt, but a passphrase is asked for whenever either option is set. Neither these options nor
+    # resuming are offered by the interactive prompt.
+    parser.set_defaults(keyed=False, encrypt=False, resume=False, group=None)
+
+    subparsers = parser.add_subparsers(dest='command')
+
+    hide_parser = subparsers.add_parser('hide', help="Hide data in the photos located in 'Input_Photos'.")
+    plan_parser = subparsers.add_parser('plan', help="Print how large the data to hide is and which photos it would be hidden in, "
+                                                     "without reading the data or hiding anything.")
+
+    batch_parser = subparsers.add_parser('batch', help="Hide several files or folders, each in its own set of photos from "
+                                                       "'Input_Photos', as listed in a batch manifest.")
+    batch_parser.add_argument('manifest', help="Path to the batch manifest, a JSON list of jobs such as "
+                                               "[{\"data\": \"Reports/\", \"group\": \"reports\"}]. Each group is saved "
+                                               "to 'Processed_Photos/GROUP'.")
+
+    hide_parser.add_argument('--data', default=None, help="Path to the file or folder to hide (overrides the default path).")
+    plan_parser.add_argument('--data', default=None, help="Path to the file or folder to hide (overrides the default path).")
+
+    # Planning and batches take every option of hiding that changes the size of the data or the photos it needs
+    for subparser in (hide_parser, plan_parser, batch_parser):
+        subparser.add_argument('--parity', type=parseParityCount, default=0, metavar='M',
+                               help="Create M extra parity photos, so the data survives losing any M of the processed photos.")
+        # Same as PhotoPackingPlanner.PACKING_STRATEGIES, listed here so that Pillow isn't imported just to parse arguments
+        subparser.add_argument('--strategy', choices=['best-fit', 'fewest-images', 'largest-first'], default='best-fit',
+                               help="How to choose the photos that data gets hidden in (default: best-fit, the fewest total pixels).")
+        subparser.add_argument('--no-cache', action='store_true',
+                               help="Don't use or update the carrier cache in 'Carrier_Cache'.")
+        subparser.add_argument('--encrypt', action='store_true',
+                               help="Encrypt the hidden data with a key derived from a passphrase (asked for when hiding, like with --keyed).")
+        subparser.add_argument('--matrix', type=parseMatrixBits, default=0, metavar='K',
+                               help="Hide K bits in every 2^K - 1 channel values by changing at most one of them (matrix embedding, "
+                                    "K from 2 to 16). Far fewer bits change, but the photos hold K / (2^K - 1) as much.")
+
+    hide_parser.add_argument('--cache-scratch', type=int, default=None, metavar='MB',
+                             help="Keep up to MB megabytes of decoded photos in the carrier cache, so reusing them skips decoding. "
+                                  "The limit is remembered until it's set again (0 turns it off).")
+    hide_parser.add_argument('--keyed', action='store_true', help=KEYED_HELP)
+    batch_parser.add_argument('--keyed', action='store_true', help=KEYED_HELP)
+    hide_parser.add_argument('--resume', action='store_true', help=RESUME_HELP)
+
+    extract_parser = subparsers.add_parser('extract', help="Extract hidden data from the photos located in 'Processed_Photos'.")
+    extract_parser.add_argument('--allow-legacy-pickle', action='store_true',
+                                help="Allow loading data hidden by older versions, which used pickle. Only use with trusted photos.")
+    extract_parser.add_argument('--keyed', action='store_true', help=PASSPHRASE_HELP)
+    extract_parser.add_argument('--resume', action='store_true', help=RESUME_HELP)
+    extract_parser.add_argument('--group', default=None, metavar='NAME',
+                                help=GROUP_HELP + " The data is extracted to 'Extracted_Data/NAME'.")
+    verify_parser = subparsers.add_parser('verify', help="Check the integrity of the photos located in 'Processed_Photos' without extracting.")
+    verify_parser.add_argument('--keyed', action='store_true', help=PASSPHRASE_HELP)
+    verify_parser.add_argument('--group', default=None, metavar='NAME', help=GROUP_HELP)
+    metrics_parser = subparsers.add_parser('metrics', help="Measure how much each processed photo differs from its input photo "
+                                                           "and how detectable its hidden data is, and save a report.")
+    # Same as QualityMetrics.REPORT_FORMATS, listed here so that numpy isn't imported just to parse arguments
+    metrics_parser.add_argument('--format', choices=['csv', 'json'], default='csv', help="The format of the report (default: csv).")
+    metrics_parser.add_argument('--report', default=None, metavar='PATH',
+                                help="Where to save the report (default: 'Quality_Report.csv' or '.json' in the project directory).")
+    metrics_parser.add_argument('--group', default=None, metavar='NAME', help=GROUP_HELP)
+    subparsers.add_parser('info', help="Print version and environment information.")
+
+    return parser
+
+
+def parseParityCount(value):
+    """
+    Parses the number of parity photos given with '--parity', so that an invalid number is rejected before any
+    photo is opened.
+    :param value: The number as given on the command line.
+    :return: The number of parity photos.
+    """
+    try:
+        parity_photos = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("'" + value + "' is not a whole number")
+
+    if parity_photos < 0:
+        raise argparse.ArgumentTypeError("the number of parity photos can't be negative")
+
+    return parity_photos
+
+
+def parseMatrixBits(value):
+    """
+    Parses the number of bits per block given with '--matrix', so that an invalid number is rejected before any
+    photo is opened.
+    :param value: The number as given on the command line.
+    :return: The number of bits per block, or 0 for no matrix embedding.
+    """
+    try:
+        matrix_bits = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("'" + value + "' is not a whole number")
+
+    # Same as MatrixEmbedding.MIN_MATRIX_BITS and MAX_MATRIX_BITS, listed here so that numpy isn't imported just to
+    # parse arguments
+    if matrix_bits != 0 and not 2 <= matrix_bits <= 16:
+        raise argparse.ArgumentTypeError("matrix embedding can store 2 to 16 bits per block (or 0 to turn it off)")
+
+    return matrix_bits
+
+
+def getPassphrase(confirm):
+    """
+    Gets the passphrase for keyed mode and encryption, from the PIXSAFE_PASSPHRASE environment variable if it is set, and otherwise
+    by prompting for it without echoing it.
+    :param confirm: Whether the passphrase has to be typed twice (when hiding, since a typo would make the data
+    impossible to extract).
+    :return: The passphrase.
+    """
+    from getpass import getpass
+
+    passphrase = os.environ.get('PIXSAFE_PASSPHRASE')
+    if passphrase is not None:
+        return passphrase
+
+    passphrase = getpass("Passphrase: ")
+
+    if len(passphrase) == 0:
+        print("Error - The passphrase can't be empty.")
+        sys.exit(1)
+
+    if confirm and getpass("Repeat passphrase: ") != passphrase:
+        print("Error - The passphrases do not match.")
+        sys.exit(1)
 
-    print("Enter 1 to hide data in an image set.")
-    print("Enter 2 to extract data from an image set")
-    num = input()
     print("***")
 
-    if num == '1':
-        ImageDataHiding.hideDataInImages(PATH_TO_DATA_YOU_WANT_HIDDEN, path_to_input_photos, path_to_processed_photos)
-    elif num == '2':
-        ImageDataExtraction.extractDataFromImages(path_to_processed_photos, path_to_paste_data)
-    else:
-        print("Invalid response.")
+    return passphrase
+
+
+def printProgramInfo(script_directory):
+    """
+    Prints the program version along with information about the current environment. Pillow's version is looked up
+    from the installed package metadata so that the library itself never has to be imported.
+    :param script_directory: The path to this project's directory.
+    """
+    from importlib import metadata
+
+    try:
+        pillow_version = metadata.version('Pillow')
+    except metadata.PackageNotFoundError:
+        pillow_version = "not installed"
+
+    print("Pixsafe " + __version__)
+    print("Python " + sys.version.split()[0])
+    print("Pillow " + pillow_version)
+    print("Project directory: " + script_directory)
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,7 @@
+import os, sys
+
+# The tests import the project's packages directly, just like main.py does when run from the project directory
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if PROJECT_DIRECTORY not in sys.path:
+    sys.path.insert(0, PROJECT_DIRECTORY)
@@ -0,0 +1,178 @@
+import hashlib, os, struct
+import pytest
+
+from Data_Converters import ContainerFormat, FileDigests
+
+
+FOLDER = ContainerFormat.RECORD_KIND_FOLDER
+FILE = ContainerFormat.RECORD_KIND_FILE
+NO_PARENT = ContainerFormat.NO_PARENT
+
+SAMPLE_TREE = {
+    b'': {
+        b'a.txt': b'hello world\n',
+        b'empty': b'',
+        b'sub': {
+            b'b.bin': os.urandom(3000),
+            b'nested': {b'c.txt': b'c' * 100},
+            b'no files': {},
+        },
+    },
+}
+
+
+def packContainer(records, names, bodies, top_file_count=None, version=ContainerFormat.CONTAINER_VERSION, trailing=b''):
+    """
+    Packs a container by hand from its raw parts, so that containers the program would never create can be tested.
+    The container digest is always correct, so only the checks of the layout itself can reject the container.
+    :param records: A list of tuples (kind, parent index, size), one per record. Every file's digest is computed from
+    its contents.
+    :param names: The names of all records, in byte format.
+    :param bodies: The contents of all files.
+    :param top_file_count: The number of files at the top level (by default, the number of leading file records).
+    :param version: The container version (1 containers have no container digest).
+    :param trailing: Bytes added after the last file's contents (and covered by the container digest).
+    :return: The container in byte format.
+    """
+    if top_file_count is None:
+        top_file_count = next((index for index, record in enumerate(records) if record[0] != FILE), len(records))
+
+    file_digests = iter([FileDigests.computeFileDigest(body) for body in bodies])
+    digests = b''.join(next(file_digests) if kind == FILE else ContainerFormat.EMPTY_DIGEST for kind, parent, size in records)
+
+    names_table = b''.join(name + ContainerFormat.NAME_SEPARATOR for name in names)
+    rest = (bytes(kind for kind, parent, size in records) + b''.join(struct.pack('>I', parent) for kind, parent, size in records)
+            + b''.join(struct.pack('>Q', size) for kind, parent, size in records) + digests + names_table + b''.join(bodies) + trailing)
+
+    header = ContainerFormat.CONTAINER_HEADER_STRUCT.pack(ContainerFormat.CONTAINER_MAGIC, version, len(records), len(names_table),
+                                                          top_file_count)
+    if version >= 2:
+        header += hashlib.sha256(rest).digest()
+
+    return header + rest
+
+
+def assertInvalid(container, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        ContainerFormat.parseContainer(container)
+
+    assert exit_info.value.code == 1
+    assert capsys.readouterr().out.startswith("Error - Unable to extract data")
+
+
+def test_round_trip():
+    container = ContainerFormat.createContainer(SAMPLE_TREE)
+
+    assert len(container) == ContainerFormat.getContainerSize(8, len(b'a.txtemptysubb.binnestedc.txtno files'), 3112)
+    assert ContainerFormat.parseContainer(container) == (SAMPLE_TREE, [])
+    assert ContainerFormat.parseContainer(bytearray(container)) == (SAMPLE_TREE, [])
+
+
+def test_round_trip_of_single_file_and_empty_folder():
+    for tree in ({b'only.txt': b'x'}, {b'': {}}, {b'folder': {b'f': b'1', b'g': {}}}):
+        assert ContainerFormat.parseContainer(ContainerFormat.createContainer(tree)) == (tree, [])
+
+
+def test_version_1_is_still_read():
+    container = packContainer([(FILE, NO_PARENT, 2), (FOLDER, NO_PARENT, 1), (FILE, 1, 3)], [b'a', b'd', b'b'], [b'aa', b'bbb'],
+                              version=1)
+
+    assert ContainerFormat.parseContainer(container) == ({b'a': b'aa', b'd': {b'b': b'bbb'}}, [])
+
+
+def test_hand_packed_container_matches_created_container():
+    container = packContainer([(FILE, NO_PARENT, 2), (FOLDER, NO_PARENT, 1), (FILE, 1, 3)], [b'a', b'd', b'b'], [b'aa', b'bbb'])
+
+    assert container == ContainerFormat.createContainer({b'a': b'aa', b'd': {b'b': b'bbb'}})
+
+
+def test_every_truncation_is_rejected(capsys):
+    container = ContainerFormat.createContainer(SAMPLE_TREE)
+
+    for length in range(len(container)):
+        assertInvalid(container[:length], capsys)
+
+
+def test_trailing_bytes_are_rejected(capsys):
+    assertInvalid(ContainerFormat.createContainer(SAMPLE_TREE) + b'\x00', capsys)
+    assertInvalid(packContainer([(FILE, NO_PARENT, 1)], [b'a'], [b'1'], trailing=b'extra'), capsys)
+
+
+@pytest.mark.parametrize('records', [
+    [(FILE, NO_PARENT, 2 ** 64 - 1)],
+    [(FILE, NO_PARENT, 2 ** 40)],
+    [(FOLDER, NO_PARENT, 2 ** 32)],
+    [(FOLDER, NO_PARENT, 5)],
+])
+def test_oversized_lengths_are_rejected(records, capsys):
+    assertInvalid(packContainer(records, [b'a'] * len(records), [b'1']), capsys)
+
+
+def test_oversized_header_counts_are_rejected(capsys):
+    container = bytearray(packContainer([(FILE, NO_PARENT, 1)], [b'a'], [b'1']))
+    header = ContainerFormat.CONTAINER_HEADER_STRUCT
+
+    for record_count, names_size, top_file_count in ((2 ** 32 - 1, 2, 1), (1, 2 ** 64 - 1, 1), (1, 2, 2 ** 32 - 1), (0, 2, 1)):
+        container[:header.size] = header.pack(ContainerFormat.CONTAINER_MAGIC, ContainerFormat.CONTAINER_VERSION, record_count,
+                                              names_size, top_file_count)
+        assertInvalid(bytes(container), capsys)
+
+
+@pytest.mark.parametrize('name', [b'..', b'.', b'a/b', b'/etc', b'a\\b', b'\xff\xfe', b'bad\xed\xa0\x80'])
+def test_unsafe_names_are_rejected(name, capsys):
+    assertInvalid(packContainer([(FILE, NO_PARENT, 1)], [name], [b'1']), capsys)
+    assertInvalid(packContainer([(FOLDER, NO_PARENT, 0)], [name], []), capsys)
+
+
+def test_empty_names_are_only_allowed_for_one_top_folder(capsys):
+    assertInvalid(packContainer([(FILE, NO_PARENT, 1)], [b''], [b'1']), capsys)
+    assertInvalid(packContainer([(FOLDER, NO_PARENT, 0), (FOLDER, 0, 0)], [b'a', b''], []), capsys)
+    assertInvalid(packContainer([(FOLDER, NO_PARENT, 0), (FOLDER, NO_PARENT, 0)], [b'', b''], []), capsys)
+
+
+def test_duplicate_names_are_rejected(capsys):
+    assertInvalid(packContainer([(FILE, NO_PARENT, 1), (FILE, NO_PARENT, 1)], [b'a', b'a'], [b'1', b'2']), capsys)
+    assertInvalid(packContainer([(FOLDER, NO_PARENT, 0), (FOLDER, NO_PARENT, 0)], [b'd', b'd'], []), capsys)
+    assertInvalid(packContainer([(FOLDER, NO_PARENT, 1), (FILE, 0, 1), (FOLDER, 0, 0)], [b'd', b'x', b'x'], [b'1']), capsys)
+
+
+def test_misplaced_records_are_rejected(capsys):
+    # A folder whose parent comes after it, a folder claiming a file that belongs elsewhere, and a stray file record
+    assertInvalid(packContainer([(FOLDER, 1, 0), (FOLDER, NO_PARENT, 0)], [b'a', b'b'], []), capsys)
+    assertInvalid(packContainer([(FOLDER, NO_PARENT, 1), (FILE, NO_PARENT, 1)], [b'd', b'f'], [b'1'], top_file_count=0), capsys)
+    assertInvalid(packContainer([(FOLDER, NO_PARENT, 0), (FILE, 0, 1)], [b'd', b'f'], [b'1']), capsys)
+    assertInvalid(packContainer([(FILE, NO_PARENT, 1)], [b'f'], [b'1'], top_file_count=0), capsys)
+
+
+def test_names_table_must_match_records(capsys):
+    container = packContainer([(FILE, NO_PARENT, 1), (FILE, NO_PARENT, 1)], [b'a', b'b'], [b'1', b'2'])
+
+    # The separator between the two names replaced, so the table holds one name less than there are records
+    position = container.index(b'a\x00b\x00')
+    assertInvalid(container[:position + 1] + b'x' + container[position + 2:], capsys)
+
+
+def test_bad_magic_and_version_are_rejected(capsys):
+    container = ContainerFormat.createContainer(SAMPLE_TREE)
+
+    assertInvalid(b'XXXX' + container[4:], capsys)
+    assertInvalid(container[:4] + bytes([3]) + container[5:], capsys)
+    assertInvalid(container[:4] + bytes([0]) + container[5:], capsys)
+
+
+def test_damaged_files_are_named():
+    container = bytearray(ContainerFormat.createContainer(SAMPLE_TREE))
+    position = container.index(b'c' * 100)
+    container[position] ^= 1
+
+    byte_data_list, mismatched_files = ContainerFormat.parseContainer(bytes(container))
+
+    assert mismatched_files == ['sub/nested/c.txt']
+    assert byte_data_list[b''][b'sub'][b'b.bin'] == SAMPLE_TREE[b''][b'sub'][b'b.bin']
+
+
+def test_damaged_names_are_rejected(capsys):
+    container = bytearray(ContainerFormat.createContainer(SAMPLE_TREE))
+    container[container.index(b'a.txt')] = ord('b')
+
+    assertInvalid(bytes(container), capsys)
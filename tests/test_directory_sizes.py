@@ -0,0 +1,42 @@
+import os
+import pytest
+
+from Data_Converters import ContainerFormat, DirectoryToByteData
+
+
+def createTree(folder_path):
+    """
+    Creates a small folder tree to be hidden, with names that take more than one byte in utf-8.
+    :param folder_path: The path to the folder holding the tree.
+    """
+    os.makedirs(os.path.join(folder_path, 'sub', 'empty'))
+    for relative_path, contents in (('a.txt', b'hello\n'), ('sub/ß.bin', os.urandom(300)), ('sub/日本.txt', b'')):
+        with open(os.path.join(folder_path, relative_path), 'wb') as file:
+            file.write(contents)
+
+
+def test_sizes_match_created_container(tmp_path):
+    folder_path = str(tmp_path / 'data')
+    createTree(folder_path)
+
+    for path in (folder_path, folder_path + os.sep, os.path.join(folder_path, 'a.txt')):
+        container = ContainerFormat.createContainer(DirectoryToByteData.getByteData(path))
+        assert len(container) == ContainerFormat.getContainerSize(*DirectoryToByteData.getByteDataSizes(path))
+
+
+def test_names_that_are_not_utf8_are_reported_by_both_paths(tmp_path, capsys):
+    folder_path = str(tmp_path / 'data')
+    createTree(folder_path)
+
+    try:
+        with open(os.path.join(os.fsencode(folder_path), b'sub', b'bad\xff.txt'), 'wb') as file:
+            file.write(b'x')
+    except OSError:
+        pytest.skip("the file system doesn't allow names that aren't valid utf-8")
+
+    for function in (DirectoryToByteData.getByteDataSizes, DirectoryToByteData.getByteData):
+        with pytest.raises(SystemExit) as exit_info:
+            function(folder_path)
+
+        assert exit_info.value.code == 1
+        assert capsys.readouterr().out.startswith("Error - The name of '" + os.path.join(folder_path, 'sub', 'bad'))
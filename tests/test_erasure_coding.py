@@ -0,0 +1,56 @@
+import itertools, os
+import pytest
+
+pytest.importorskip('numpy')
+
+from Data_Converters import ErasureCoding
+
+
+@pytest.mark.parametrize('data_shard_count, parity_shard_count, byte_length', [
+    (1, 1, 10), (2, 1, 101), (3, 2, 1000), (4, 3, 4097), (6, 4, 333), (5, 5, 0),
+])
+def test_every_combination_of_up_to_m_lost_shards_is_rebuilt(data_shard_count, parity_shard_count, byte_length):
+    byte_data = os.urandom(byte_length)
+    shards = ErasureCoding.encodeParityShards(byte_data, data_shard_count, parity_shard_count)
+    shard_count = data_shard_count + parity_shard_count
+
+    assert len(shards) == shard_count
+    assert len(set(len(shard) for shard in shards)) == 1
+
+    for lost_count in range(parity_shard_count + 1):
+        for lost_shards in itertools.combinations(range(shard_count), lost_count):
+            intact_shards = {index: shard for index, shard in enumerate(shards) if index not in lost_shards}
+            assert ErasureCoding.decodeParityShards(intact_shards, data_shard_count, parity_shard_count, byte_length) == byte_data
+
+
+@pytest.mark.parametrize('data_shard_count, parity_shard_count', [(1, 1), (3, 2), (4, 3)])
+def test_more_than_m_lost_shards_are_unrecoverable(data_shard_count, parity_shard_count, capsys):
+    shards = ErasureCoding.encodeParityShards(os.urandom(500), data_shard_count, parity_shard_count)
+    shard_count = data_shard_count + parity_shard_count
+
+    for lost_shards in itertools.combinations(range(shard_count), parity_shard_count + 1):
+        intact_shards = {index: shard for index, shard in enumerate(shards) if index not in lost_shards}
+
+        with pytest.raises(SystemExit) as exit_info:
+            ErasureCoding.decodeParityShards(intact_shards, data_shard_count, parity_shard_count, 500)
+
+        assert exit_info.value.code == 1
+        assert capsys.readouterr().out.startswith("Error - Not enough intact photos remain to rebuild the hidden data.")
+
+
+def test_too_many_shards_are_refused(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        ErasureCoding.encodeParityShards(b'data', ErasureCoding.MAX_SHARDS, 1)
+
+    assert exit_info.value.code == 1
+    assert capsys.readouterr().out.startswith("Error - At most " + str(ErasureCoding.MAX_SHARDS) + " photos")
+
+
+def test_every_selection_of_encoding_rows_can_be_inverted():
+    data_shard_count, parity_shard_count = 4, 4
+    encoding_matrix = ErasureCoding.createEncodingMatrix(data_shard_count, parity_shard_count)
+
+    for rows in itertools.combinations(range(data_shard_count + parity_shard_count), data_shard_count):
+        inverse = ErasureCoding.invertMatrix(encoding_matrix[list(rows)])
+        product = ErasureCoding.multiplyMatrixByShards(inverse, encoding_matrix[list(rows)])
+        assert (product == ErasureCoding.createEncodingMatrix(data_shard_count, 0)).all()
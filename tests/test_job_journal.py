@@ -0,0 +1,140 @@
+import filecmp, os
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from Data_Converters import JobJournal, OutputStaging
+from Image_Manipulation import ImageDataExtraction, ImageDataHiding
+
+
+def createPhotos(folder_path, count, size=(160, 120)):
+    """
+    Saves photos of random noise to a folder.
+    :param folder_path: The path to the folder.
+    :param count: The number of photos.
+    :param size: The width and height of every photo.
+    """
+    os.mkdir(folder_path)
+    for photo_num in range(count):
+        Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3)).save(os.path.join(folder_path, 'p' + str(photo_num) + '.png'))
+
+
+def createDataWithJournalFolder(folder_path):
+    """
+    Creates data to hide whose top level holds a folder with the same name as a job journal's files.
+    :param folder_path: The path to the folder holding the data.
+    """
+    os.makedirs(os.path.join(folder_path, '.journal', 'sub'))
+    with open(os.path.join(folder_path, '.journal', JobJournal.JOURNAL_FILE), 'wb') as file:
+        file.write(b'{"job": "not a real journal"}\n')
+    with open(os.path.join(folder_path, '.journal', 'sub', 'p0.png.slice'), 'wb') as file:
+        file.write(os.urandom(3000))
+    with open(os.path.join(folder_path, 'a.txt'), 'wb') as file:
+        file.write(b'hello world\n')
+
+
+def assertFoldersEqual(left_path, right_path):
+    comparison = filecmp.dircmp(left_path, right_path)
+    assert comparison.left_only == [] and comparison.right_only == [] and comparison.funny_files == []
+
+    match, mismatch, errors = filecmp.cmpfiles(left_path, right_path, comparison.common_files, shallow=False)
+    assert mismatch == [] and errors == []
+
+    for folder in comparison.common_dirs:
+        assertFoldersEqual(os.path.join(left_path, folder), os.path.join(right_path, folder))
+
+
+@pytest.mark.parametrize('resume', [False, True])
+def test_data_holding_a_journal_folder_round_trips(tmp_path, monkeypatch, resume):
+    monkeypatch.setattr('builtins.input', lambda: 'y')
+
+    data_path = str(tmp_path / 'data')
+    input_photos = str(tmp_path / 'input')
+    processed_photos = str(tmp_path / 'processed')
+    extracted_data = str(tmp_path / 'extracted')
+
+    createDataWithJournalFolder(data_path)
+    createPhotos(input_photos, 2)
+    os.mkdir(processed_photos)
+    os.mkdir(extracted_data)
+
+    # A trailing separator hides the folder's contents rather than the folder itself, so '.journal' is at the top
+    ImageDataHiding.hideDataInImages(data_path + os.sep, input_photos, processed_photos, resume=resume)
+    ImageDataExtraction.extractDataFromImages(processed_photos, extracted_data, resume=resume)
+
+    assertFoldersEqual(data_path, extracted_data)
+
+    # The journals are removed once the runs are complete
+    for output_path in (processed_photos, extracted_data):
+        assert not os.path.exists(OutputStaging.getSiblingPath(output_path, JobJournal.JOURNAL_SUFFIX))
+        assert not os.path.exists(OutputStaging.getSiblingPath(output_path, OutputStaging.STAGING_SUFFIX))
+
+
+def interruptHiding(monkeypatch, data_path, input_photos, processed_photos):
+    """
+    Hides data in two photos, but is interrupted before the second photo has been written.
+    :param monkeypatch: The monkeypatch fixture of the test.
+    :param data_path: The path to the data to hide.
+    :param input_photos: The path to the folder of input photos.
+    :param processed_photos: The path to the folder of processed photos.
+    """
+    hide_photo = ImageDataHiding.hideDataInPhoto
+    calls = []
+
+    def crashingHideDataInPhoto(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        hide_photo(*args, **kwargs)
+
+    monkeypatch.setattr(ImageDataHiding, 'hideDataInPhoto', crashingHideDataInPhoto)
+    with pytest.raises(KeyboardInterrupt):
+        ImageDataHiding.hideDataInImages(data_path, input_photos, processed_photos, packing_strategy='fewest-images')
+    monkeypatch.setattr(ImageDataHiding, 'hideDataInPhoto', hide_photo)
+
+
+@pytest.mark.parametrize('answers', [['n'], ['y', 'n'], ['y']])
+def test_interrupted_session_is_kept_unless_discarded(tmp_path, monkeypatch, answers):
+    data_path = str(tmp_path / 'data')
+    input_photos = str(tmp_path / 'input')
+    processed_photos = str(tmp_path / 'processed')
+
+    os.mkdir(data_path)
+    with open(os.path.join(data_path, 'b.bin'), 'wb') as file:
+        file.write(os.urandom(12000))
+    createPhotos(input_photos, 2)
+    os.mkdir(processed_photos)
+
+    monkeypatch.setattr('builtins.input', lambda: 'y')
+    interruptHiding(monkeypatch, data_path, input_photos, processed_photos)
+
+    staging_path = OutputStaging.getSiblingPath(processed_photos, OutputStaging.STAGING_SUFFIX)
+    journal_path = OutputStaging.getSiblingPath(processed_photos, JobJournal.JOURNAL_SUFFIX)
+    staged_photos = os.listdir(staging_path)
+    assert len(staged_photos) == 1
+
+    # Hiding again without --resume first asks to continue, and then to discard the interrupted session's progress
+    remaining_answers = list(answers)
+    monkeypatch.setattr('builtins.input', lambda: remaining_answers.pop(0))
+
+    if answers == ['y']:
+        remaining_answers.append('y')
+        ImageDataHiding.hideDataInImages(data_path, input_photos, processed_photos, packing_strategy='fewest-images')
+        assert not os.path.exists(journal_path) and len(os.listdir(processed_photos)) == 2
+        return
+
+    with pytest.raises(SystemExit) as exit_info:
+        ImageDataHiding.hideDataInImages(data_path, input_photos, processed_photos, packing_strategy='fewest-images')
+    assert exit_info.value.code == 0
+
+    assert os.listdir(staging_path) == staged_photos
+    assert os.path.isfile(os.path.join(journal_path, JobJournal.JOURNAL_FILE))
+
+    # The kept progress is still there to be resumed
+    monkeypatch.setattr('builtins.input', lambda: 'y')
+    ImageDataHiding.hideDataInImages(data_path, input_photos, processed_photos, packing_strategy='fewest-images', resume=True)
+
+    extracted_data = str(tmp_path / 'extracted')
+    os.mkdir(extracted_data)
+    ImageDataExtraction.extractDataFromImages(processed_photos, extracted_data)
+    assertFoldersEqual(data_path, os.path.join(extracted_data, 'data'))
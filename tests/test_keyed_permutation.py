@@ -0,0 +1,120 @@
+import os, time
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from Image_Manipulation import ChannelBuffers, KeyedPermutation
+
+
+# Keyed mode has to stay within a small constant factor of sequential mode's throughput, per channel value of a
+# photo that is hidden in and extracted from. Measured on one core, hiding in a photo (decoding it, storing the bits and
+# encoding it again) takes about 1.15 times as long in keyed mode for a 2 megapixel photo and 1.2 times as long for a
+# 50 megapixel one (17.6 s instead of 14.5 s), and hiding plus extracting about 1.3 and 1.45 times as long. Extracting
+# alone takes 2.5 to 3.6 times as long, since reading the bits in order costs next to nothing once the photo is decoded.
+MAX_HIDE_SLOWDOWN = 2
+MAX_ROUND_TRIP_SLOWDOWN = 2
+
+# Channel values of an RGB photo, per megapixel
+CHANNELS_PER_MEGAPIXEL = 3 * 10 ** 6
+HEADER_SIZE = 504
+
+
+def getFastestTimes(functions, runs=3):
+    """
+    Times a few functions a few times, taking turns between them so that a slow moment of the machine affects them
+    alike, since the time taken varies from run to run.
+    :param functions: The functions to time, which take no arguments.
+    :param runs: The number of times every function is run.
+    :return: A list of the fastest time taken by every function, in seconds.
+    """
+    times = [[] for function in functions]
+    for run in range(runs):
+        for function, function_times in zip(functions, times):
+            start_time = time.perf_counter()
+            function()
+            function_times.append(time.perf_counter() - start_time)
+
+    return [min(function_times) for function_times in times]
+
+
+def hidePhoto(photo_path, destination, bits, permutation_key=None):
+    """
+    Stores bits after the header of a photo the way a photo is hidden in, in keyed order if a key is given.
+    :param photo_path: The path to the photo.
+    :param destination: The path the processed photo is saved to.
+    :param bits: The bits to store, as zeroes and ones in a bytearray.
+    :param permutation_key: The permutation key, or None to store the bits in order.
+    """
+    channels, carrier = ChannelBuffers.openChannelBuffer(photo_path)
+
+    if permutation_key is not None:
+        KeyedPermutation.writeKeyedLSBs(channels, permutation_key, 0, HEADER_SIZE, bits)
+    else:
+        ChannelBuffers.writeLSBs(channels, HEADER_SIZE, bits)
+
+    ChannelBuffers.saveChannelBuffer(channels, carrier, destination)
+
+
+def extractPhoto(photo_path, length, permutation_key=None):
+    """
+    Reads the bits stored after the header of a photo the way they are extracted (see hidePhoto).
+    :param photo_path: The path to the processed photo.
+    :param length: The number of bits to read.
+    :param permutation_key: The permutation key, or None if the bits are stored in order.
+    :return: The bits, as zeroes and ones in a bytearray.
+    """
+    channels, carrier = ChannelBuffers.openChannelBuffer(photo_path)
+
+    if permutation_key is not None:
+        return KeyedPermutation.readKeyedLSBs(channels, permutation_key, 0, HEADER_SIZE, length)
+    return ChannelBuffers.readLSBs(channels, HEADER_SIZE, length)
+
+
+@pytest.mark.parametrize('channel_count', [1, 2, 3, 17, 1000, 2 ** 16, 2 ** 16 + 1, 300001])
+def test_keyed_positions_visit_every_channel_once(channel_count):
+    permutation_key = os.urandom(32)
+    positions = np.concatenate([chunk for offset, chunk in KeyedPermutation.getKeyedPositions(permutation_key, 3,
+                                                                                             channel_count, channel_count)])
+
+    assert sorted(positions.tolist()) == list(range(channel_count))
+
+
+def test_keyed_bits_round_trip():
+    permutation_key = os.urandom(32)
+    channels = bytearray(os.urandom(HEADER_SIZE + 200000))
+    bits = bytearray(np.random.randint(0, 2, 150000, dtype=np.uint8).tobytes())
+    header = channels[:HEADER_SIZE]
+
+    KeyedPermutation.writeKeyedLSBs(channels, permutation_key, 1, HEADER_SIZE, bits)
+
+    assert KeyedPermutation.readKeyedLSBs(channels, permutation_key, 1, HEADER_SIZE, len(bits)) == bits
+    assert channels[:HEADER_SIZE] == header
+
+    # Every photo of a set uses a different order
+    assert KeyedPermutation.readKeyedLSBs(channels, permutation_key, 2, HEADER_SIZE, len(bits)) != bits
+
+
+def test_keyed_throughput(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+
+    # A 2 megapixel photo of random noise, which compresses as badly as a real photo's least significant bits
+    width, height = 2000, 1000
+    photo_path = str(tmp_path / 'photo.png')
+    Image.frombytes('RGB', (width, height), os.urandom(width * height * 3)).save(photo_path)
+
+    permutation_key = os.urandom(32)
+    bits = bytearray(np.random.randint(0, 2, 2 * CHANNELS_PER_MEGAPIXEL - HEADER_SIZE, dtype=np.uint8).tobytes())
+    sequential_path = str(tmp_path / 'sequential.png')
+    keyed_path = str(tmp_path / 'keyed.png')
+
+    sequential_hide, keyed_hide = getFastestTimes([lambda: hidePhoto(photo_path, sequential_path, bits),
+                                                   lambda: hidePhoto(photo_path, keyed_path, bits, permutation_key)])
+    sequential_extract, keyed_extract = getFastestTimes([lambda: extractPhoto(sequential_path, len(bits)),
+                                                         lambda: extractPhoto(keyed_path, len(bits), permutation_key)])
+
+    assert extractPhoto(sequential_path, len(bits)) == bits
+    assert extractPhoto(keyed_path, len(bits), permutation_key) == bits
+
+    # Both modes store the same number of channel values, so comparing the times compares the time per channel value
+    assert keyed_hide < MAX_HIDE_SLOWDOWN * sequential_hide
+    assert keyed_hide + keyed_extract < MAX_ROUND_TRIP_SLOWDOWN * (sequential_hide + sequential_extract)
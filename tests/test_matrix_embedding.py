@@ -0,0 +1,93 @@
+import os
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from Image_Manipulation import ImageDataExtraction, ImageDataHiding, MatrixEmbedding
+
+
+MATRIX_BITS = range(MatrixEmbedding.MIN_MATRIX_BITS, MatrixEmbedding.MAX_MATRIX_BITS + 1)
+
+
+@pytest.mark.parametrize('matrix_bits', MATRIX_BITS)
+def test_embedding_round_trips_with_at_most_one_flip_per_block(matrix_bits):
+    random = np.random.default_rng()
+    block_size = (1 << matrix_bits) - 1
+
+    # Enough blocks for the short block sizes to span several chunks, and at least a few of the longest blocks
+    block_count = max(3, 300000 // block_size)
+
+    # The bits fill every block exactly, or leave the last block partly padded
+    for bit_count in (block_count * matrix_bits, block_count * matrix_bits - 1):
+        bits = bytearray(random.integers(0, 2, bit_count, dtype=np.uint8).tobytes())
+        channel_count = MatrixEmbedding.getMatrixChannelCount(bit_count, matrix_bits)
+        cover_bits = bytearray(random.integers(0, 2, channel_count, dtype=np.uint8).tobytes())
+
+        new_bits = MatrixEmbedding.embedMatrixBits(cover_bits, bits, matrix_bits)
+
+        assert len(new_bits) == channel_count
+        assert MatrixEmbedding.extractMatrixBits(new_bits, bit_count, matrix_bits) == bits
+
+        flips = np.frombuffer(new_bits, dtype=np.uint8) != np.frombuffer(cover_bits, dtype=np.uint8)
+        assert flips.reshape(block_count, block_size).sum(axis=1).max() <= 1
+
+        # Blocks that already store the right bits are left alone
+        assert MatrixEmbedding.embedMatrixBits(new_bits, bits, matrix_bits) == new_bits
+
+
+@pytest.mark.parametrize('matrix_bits', MATRIX_BITS)
+def test_reported_capacities_are_exactly_what_fits(matrix_bits):
+    block_size = (1 << matrix_bits) - 1
+    channel_counts = [1, block_size - 1, block_size, block_size + 1, 10 * block_size + 3, 160 * 120 * 3 - 504, 4 * 10 ** 6]
+    capacities = {'p' + str(index) + '.png': channel_count for index, channel_count in enumerate(channel_counts)}
+
+    matrix_capacities = ImageDataHiding.getMatrixCapacities(capacities, matrix_bits)
+
+    for photo, channel_count in capacities.items():
+        capacity = matrix_capacities[photo]
+
+        # The reported number of bits fits in the photo's channel values, and a single bit more doesn't
+        assert capacity % matrix_bits == 0
+        assert MatrixEmbedding.getMatrixChannelCount(capacity, matrix_bits) <= channel_count
+        assert MatrixEmbedding.getMatrixChannelCount(capacity + 1, matrix_bits) > channel_count
+
+
+@pytest.mark.parametrize('matrix_bits', [2, 3, 5, 8])
+def test_data_filling_the_reported_capacity_is_hidden_and_extracted(tmp_path, monkeypatch, capsys, matrix_bits):
+    Image = pytest.importorskip('PIL.Image')
+    monkeypatch.setattr('builtins.input', lambda: 'y')
+
+    input_photos = str(tmp_path / 'input')
+    processed_photos = str(tmp_path / 'processed')
+    extracted_data = str(tmp_path / 'extracted')
+    data_path = str(tmp_path / 'b.bin')
+
+    os.mkdir(input_photos)
+    Image.frombytes('RGB', (160, 120), os.urandom(160 * 120 * 3)).save(os.path.join(input_photos, 'p0.png'))
+    os.mkdir(processed_photos)
+    os.mkdir(extracted_data)
+
+    capacity = ImageDataHiding.getMatrixCapacities(ImageDataHiding.getPhotoCapacities(input_photos), matrix_bits)['p0.png']
+
+    # The largest file whose container still fits in the reported capacity
+    open(data_path, 'wb').close()
+    byte_data = os.urandom(capacity // 8 - ImageDataHiding.getHiddenDataSize(data_path)[1])
+    with open(data_path, 'wb') as file:
+        file.write(byte_data)
+
+    ImageDataHiding.hideDataInImages(data_path, input_photos, processed_photos, matrix_bits=matrix_bits)
+    ImageDataExtraction.extractDataFromImages(processed_photos, extracted_data)
+
+    with open(os.path.join(extracted_data, 'b.bin'), 'rb') as file:
+        assert file.read() == byte_data
+
+    # One byte more no longer fits
+    with open(data_path, 'ab') as file:
+        file.write(b'x')
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exit_info:
+        ImageDataHiding.hideDataInImages(data_path, input_photos, processed_photos, matrix_bits=matrix_bits)
+
+    assert exit_info.value.code == 1
+    assert "Error - Not enough space is available" in capsys.readouterr().out
@@ -0,0 +1,95 @@
+import os
+import pytest
+
+pytest.importorskip('cryptography')
+
+from Data_Converters import PassphraseKeys, PayloadEncryption
+
+
+TAG_SIZE = PayloadEncryption.TAG_SIZE
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Small chunks, so that data of a few hundred bytes already spans several of them
+    monkeypatch.setattr(PayloadEncryption, 'CHUNK_SIZE', 64)
+    return 64
+
+
+def deriveKey(passphrase):
+    """
+    Derives an encryption key from a passphrase, with scrypt parameters that are cheap enough for tests.
+    :param passphrase: The passphrase.
+    :return: The 32 byte encryption key.
+    """
+    key_parameters = {'salt': b'\x01' * PassphraseKeys.SALT_SIZE, 'kdf_log_n': 4, 'kdf_r': 1, 'kdf_p': 1}
+    return PassphraseKeys.deriveSubkey(key_parameters, passphrase, b'encryption')
+
+
+def assertRejected(encrypted_data, key, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        PayloadEncryption.decryptPayload(encrypted_data, key)
+
+    assert exit_info.value.code == 1
+    assert capsys.readouterr().out.startswith("Error - Unable to decrypt the hidden data.")
+
+
+@pytest.mark.parametrize('size', [0, 1, 63, 64, 65, 200, 256])
+def test_round_trip(size, small_chunks):
+    key = os.urandom(32)
+    byte_data = os.urandom(size)
+    encrypted_data = PayloadEncryption.encryptPayload(byte_data, key)
+
+    assert len(encrypted_data) == PayloadEncryption.getEncryptedSize(size)
+    assert PayloadEncryption.decryptPayload(encrypted_data, key) == byte_data
+    assert PayloadEncryption.decryptPayload(bytes(encrypted_data), key) == byte_data
+
+
+def test_round_trip_with_full_size_chunks():
+    key = os.urandom(32)
+    byte_data = os.urandom(2 * PayloadEncryption.CHUNK_SIZE + 5)
+
+    assert PayloadEncryption.decryptPayload(PayloadEncryption.encryptPayload(byte_data, key), key) == byte_data
+
+
+def test_tampered_chunks_are_rejected(small_chunks, capsys):
+    key = os.urandom(32)
+    encrypted_data = PayloadEncryption.encryptPayload(os.urandom(200), key)
+
+    # A flipped bit in every chunk's ciphertext and in every chunk's tag
+    for position in range(0, len(encrypted_data), 7):
+        tampered_data = bytearray(encrypted_data)
+        tampered_data[position] ^= 1
+        assertRejected(tampered_data, key, capsys)
+
+
+def test_reordered_chunks_are_rejected(small_chunks, capsys):
+    key = os.urandom(32)
+    chunk_size = small_chunks + TAG_SIZE
+    encrypted_data = bytes(PayloadEncryption.encryptPayload(os.urandom(4 * small_chunks), key))
+    chunks = [encrypted_data[start:start + chunk_size] for start in range(0, len(encrypted_data), chunk_size)]
+
+    assertRejected(chunks[1] + chunks[0] + b''.join(chunks[2:]), key, capsys)
+    assertRejected(b''.join(chunks[:2]) + chunks[3] + chunks[2], key, capsys)
+    assertRejected(chunks[0] + chunks[0] + b''.join(chunks[2:]), key, capsys)
+
+
+def test_truncated_or_extended_data_is_rejected(small_chunks, capsys):
+    key = os.urandom(32)
+    chunk_size = small_chunks + TAG_SIZE
+    encrypted_data = bytes(PayloadEncryption.encryptPayload(os.urandom(3 * small_chunks + 10), key))
+
+    # The final chunk dropped, cut short or cut down to less than its tag, and a chunk appended after it
+    assertRejected(encrypted_data[:3 * chunk_size], key, capsys)
+    assertRejected(encrypted_data[:-1], key, capsys)
+    assertRejected(encrypted_data[:3 * chunk_size + TAG_SIZE - 1], key, capsys)
+    assertRejected(encrypted_data + encrypted_data[:chunk_size], key, capsys)
+    assertRejected(b'', key, capsys)
+
+
+def test_wrong_passphrase_is_rejected(small_chunks, capsys):
+    byte_data = os.urandom(200)
+    encrypted_data = PayloadEncryption.encryptPayload(byte_data, deriveKey('correct horse'))
+
+    assert PayloadEncryption.decryptPayload(encrypted_data, deriveKey('correct horse')) == byte_data
+    assertRejected(encrypted_data, deriveKey('correct horse '), capsys)
@@ -0,0 +1,52 @@
+import os, subprocess, sys
+import pytest
+
+
+# main.py only imports the modules the chosen subcommand needs, so printing the version or the environment
+# information must never pay for Pillow, numpy, cryptography or the image manipulation modules.
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('PIL', 'numpy', 'cryptography', 'Image_Manipulation')
+
+# Budgets in microseconds for the cumulative import time of every top level import, measured at about 38 ms for
+# '--version' and 66 ms for 'info' (which reads package metadata), with room left for slower machines
+IMPORT_TIME_BUDGETS = {'--version': 150000, 'info': 250000}
+
+
+def getImportTimes(command):
+    """
+    Runs main.py with 'python -X importtime' and parses the import times it reports.
+    :param command: The command line argument given to main.py.
+    :return: A list of tuples (module name, cumulative import time in microseconds, nesting level).
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(PROJECT_DIRECTORY, 'main.py'), command],
+                            cwd=PROJECT_DIRECTORY, capture_output=True, text=True, check=True)
+
+    import_times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_time, cumulative_time, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        import_times.append((name.strip(), int(cumulative_time), level))
+
+    return import_times
+
+
+@pytest.mark.parametrize('command', sorted(IMPORT_TIME_BUDGETS))
+def test_startup_skips_heavy_modules(command):
+    import_times = getImportTimes(command)
+    assert len(import_times) > 0
+
+    for name, cumulative_time, level in import_times:
+        assert name.split('.')[0] not in HEAVY_MODULES, name + " was imported by '" + command + "'"
+
+
+@pytest.mark.parametrize('command', sorted(IMPORT_TIME_BUDGETS))
+def test_startup_import_time_budget(command):
+    # Start up time varies from run to run, so the fastest of a few runs is compared with the budget
+    total_times = []
+    for run in range(3):
+        total_times.append(sum(cumulative_time for name, cumulative_time, level in getImportTimes(command) if level == 0))
+
+    assert min(total_times) < IMPORT_TIME_BUDGETS[command]
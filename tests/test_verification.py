@@ -0,0 +1,91 @@
+import os
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from Data_Converters import OutputStaging
+from Image_Manipulation import ImageDataHiding, ImageDataVerification
+
+
+def hideTestData(tmp_path, monkeypatch, parity_photos=0):
+    """
+    Hides a file in three photos of random noise.
+    :param tmp_path: The temporary folder of the test.
+    :param monkeypatch: The monkeypatch fixture of the test.
+    :param parity_photos: The number of parity photos.
+    :return: The path to the folder of processed photos.
+    """
+    monkeypatch.setattr('builtins.input', lambda: 'y')
+
+    data_path = str(tmp_path / 'data')
+    input_photos = str(tmp_path / 'input')
+    processed_photos = str(tmp_path / 'processed')
+
+    os.mkdir(data_path)
+    with open(os.path.join(data_path, 'b.bin'), 'wb') as file:
+        file.write(os.urandom(12000))
+
+    os.mkdir(input_photos)
+    for photo_num in range(3):
+        Image.frombytes('RGB', (160, 120), os.urandom(160 * 120 * 3)).save(os.path.join(input_photos, 'p' + str(photo_num) + '.png'))
+    os.mkdir(processed_photos)
+
+    ImageDataHiding.hideDataInImages(data_path, input_photos, processed_photos, parity_photos=parity_photos,
+                                     packing_strategy='fewest-images')
+    return processed_photos
+
+
+def getFolderState(folder_path):
+    """
+    Lists every file and folder below a folder.
+    :param folder_path: The path to the folder.
+    :return: A sorted list of the paths of everything below the folder, relative to it.
+    """
+    return sorted(os.path.relpath(os.path.join(root, name), folder_path)
+                  for root, folders, files in os.walk(folder_path) for name in folders + files)
+
+
+def test_verify_changes_nothing_on_disk(tmp_path, monkeypatch, capsys):
+    processed_photos = hideTestData(tmp_path, monkeypatch)
+
+    # A hidden file, and a swap of the processed photos that was interrupted between its two renames
+    with open(os.path.join(processed_photos, '.DS_Store'), 'wb') as file:
+        file.write(b'x')
+    os.rename(processed_photos, OutputStaging.getSiblingPath(processed_photos, OutputStaging.RETIRED_SUFFIX))
+
+    folder_state = getFolderState(str(tmp_path))
+    capsys.readouterr()
+
+    ImageDataVerification.verifyImages(processed_photos)
+
+    assert "Success! All photos are intact." in capsys.readouterr().out
+    assert getFolderState(str(tmp_path)) == folder_state
+
+
+def test_workers_send_back_no_bits(tmp_path, monkeypatch):
+    processed_photos = hideTestData(tmp_path, monkeypatch)
+
+    for photo in sorted(os.listdir(processed_photos)):
+        result = ImageDataVerification.verifyPhoto(os.path.join(processed_photos, photo))
+        assert result['bits'] is None and result['header'] is not None and result['checksum_matches']
+
+
+def test_altered_photo_is_named_and_rebuilt_from_parity(tmp_path, monkeypatch, capsys):
+    processed_photos = hideTestData(tmp_path, monkeypatch, parity_photos=1)
+
+    # Flips the least significant bits of channel values just after the header, which hold part of the hidden data
+    photo_path = os.path.join(processed_photos, sorted(os.listdir(processed_photos))[0])
+    image = Image.open(photo_path)
+    samples = bytearray(image.tobytes())
+    for index in range(1000, 2000):
+        samples[index] ^= 1
+    Image.frombytes(image.mode, image.size, bytes(samples)).save(photo_path)
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit) as exit_info:
+        ImageDataVerification.verifyImages(processed_photos)
+
+    output = capsys.readouterr().out
+    assert exit_info.value.code == 1
+    assert "-> " + os.path.basename(photo_path) + ": FAILED" in output
+    assert "All hidden files can be rebuilt, but the photos listed above should be replaced." in output